@@ -1,50 +1,35 @@
 import sys
 import os
-import re
-import platform
-import requests
+import time
+import argparse
+LAUNCH_TIME = time.perf_counter()   # 启动到首帧的计时起点 (含导入 Qt / libvlc)
 import vlc
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QListWidget, QListWidgetItem, QPushButton, QLabel, QFrame,
-    QFileDialog, QLineEdit, QMessageBox, QSlider, QStatusBar, QStyle
+    QTableView, QHeaderView, QAbstractItemView, QPushButton, QLabel, QFrame,
+    QFileDialog, QLineEdit, QComboBox, QMessageBox, QSlider, QStatusBar, QStyle,
+    QStackedWidget, QShortcut
 )
 from PyQt5.QtCore import Qt, QUrl, QTimer
-from PyQt5.QtGui import QIcon
-
-# --- M3U 解析函数 (保持不变) ---
-def parse_m3u(content):
-    channels = []
-    lines = content.splitlines()
-    current_channel_info = {}
-    extinf_pattern = re.compile(r'#EXTINF:(?P<duration>-?\d+)(?P<attributes>.*),\s*(?P<name>.*)')
-    attribute_pattern = re.compile(r'([a-zA-Z0-9_-]+)=("[^"]*"|\S+)')
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if line.startswith('#EXTINF:'):
-            current_channel_info = {'name': 'Unknown', 'url': None, 'group': 'Default', 'logo': None}
-            match = extinf_pattern.match(line)
-            if match:
-                info = match.groupdict()
-                base_name = info.get('name', 'Unknown').strip()
-                current_channel_info['name'] = base_name
-                attributes_str = info.get('attributes', '').strip()
-                if attributes_str:
-                    attributes = {}
-                    for key, value in attribute_pattern.findall(attributes_str):
-                        attributes[key.lower()] = value.strip('"')
-                    current_channel_info['name'] = attributes.get('tvg-name', base_name)
-                    current_channel_info['group'] = attributes.get('group-title', 'Default')
-                    current_channel_info['logo'] = attributes.get('tvg-logo')
-            if i + 1 < len(lines):
-                 next_line = lines[i+1].strip()
-                 if next_line and not next_line.startswith('#'):
-                      current_channel_info['url'] = next_line
-                      if current_channel_info['url']:
-                          channels.append(current_channel_info.copy())
-                          current_channel_info = {}
-    print(f"解析到 {len(channels)} 个频道。")
-    return channels
+from PyQt5.QtGui import QIcon, QKeySequence
+from m3u_parser import epg_urls
+from playlist_loader import PlaylistLoader, DEFAULT_USER_AGENT
+from stream_profiles import StreamProfiles
+from channel_merge import ChannelMerger
+from channel_table import ChannelTable
+from playlist_cache import PlaylistCache
+from channel_model import ChannelListModel, IndexBuilder, HealthCheckWorker
+from stream_health import STATUS_OK, STATUS_DEAD
+from channel_zapper import ChannelZapper, embed_player
+from vlc_bridge import VlcEventBridge
+from playback_watchdog import PlaybackWatchdog
+from channel_index import normalize_name
+from epg_store import EpgStore
+from epg_loader import EpgUpdater
+from logo_cache import LogoCache, LOGO_SIZE
+from playback_telemetry import PlaybackTelemetry
+from mosaic_view import MosaicView
+from session_state import SessionStore, same_channels
 
 # --- 主播放器窗口 ---
 class M3UPlayerWindow(QMainWindow):
@@ -52,18 +37,51 @@ class M3UPlayerWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("M3U 直播播放器 (列表在右)") # 改下标题提示布局
         self.setGeometry(100, 100, 1000, 700)
-        self.channels = []
-        self.current_playing_item = None
+        self.channel_model = ChannelListModel()
         self.vlc_instance = None
         self.media_player = None
         self.event_manager = None
+        self.playlist_loaders = []     # 正在进行的加载任务, 多个源时并行
+        self.channel_merger = None
+        self._load_summary = None
+        self.playlist_cache = PlaylistCache()
+        self.index_builder = IndexBuilder(self)
+        self.health_worker = None
+        self.vlc_bridge = VlcEventBridge(self)
+        self.watchdog = PlaybackWatchdog(self)
+        self._watched_row = -1
+        self.epg_store = EpgStore()
+        self.channel_model.epg = self.epg_store
+        self.epg_updater = None
+        self.epg_urls = []
+        self.epg_timer = QTimer(self)
+        self.epg_timer.setInterval(60 * 1000)   # 节目切换后刷新列表里的 "正在播出"
+        self.epg_timer.timeout.connect(self.channel_model.refresh_epg)
+        self.epg_timer.start()
+        self.logo_cache = LogoCache(self)
+        self.channel_model.logos = self.logo_cache
+        self.logo_cache.logos_changed.connect(self.channel_model.refresh_logos)
+        self.telemetry = PlaybackTelemetry(self)
+        self.profiles = StreamProfiles(user_agent=DEFAULT_USER_AGENT)
+        self.mosaic = None
+        self.max_decoders = None        # 多画面同时解码的上限, None 为按 CPU 核数
+        self.telemetry.session_ended.connect(self.profiles.record)
+        self.session = SessionStore()
+        self.playlist_sources = []      # 当前列表的来源, 退出时写入会话快照
+        self.revalidate_loaders = []    # 恢复会话后在后台重新校验来源的加载任务
+        self._revalidation = None
+        self._last_row = -1
+        self._launch_pending = False
+        self._ui_state = None
         self._initialize_vlc()
         self._setup_ui() # 使用修改后的 _setup_ui
+        self.zapper = ChannelZapper(self.vlc_instance, self.video_stack, self.media_player, self.video_frame, self)
         self._connect_signals()
         self._embed_vlc()
+        self.index_builder.start()
 
     def _initialize_vlc(self):
-        vlc_options = ["--no-video-title-show", "--network-caching=1500"]
+        vlc_options = ["--no-video-title-show"]     # 网络缓存等按频道设置, 见 _media_options
         try:
             self.vlc_instance = vlc.Instance(vlc_options)
             self.media_player = self.vlc_instance.media_player_new()
@@ -86,7 +104,13 @@ class M3UPlayerWindow(QMainWindow):
         video_panel_layout = QVBoxLayout(video_panel_widget)
         self.video_frame = QFrame()
         self.video_frame.setStyleSheet("background-color: black;")
-        video_panel_layout.addWidget(self.video_frame, 1) # 视频区域占满
+        self.video_stack = QStackedWidget() # 快速换台时每个预热播放器各占一页
+        self.video_stack.addWidget(self.video_frame)
+        video_panel_layout.addWidget(self.video_stack, 1) # 视频区域占满
+        self.stats_label = QLabel()
+        self.stats_label.setStyleSheet("font-family: monospace;")
+        self.stats_label.setVisible(False)
+        video_panel_layout.addWidget(self.stats_label)
         control_layout = QHBoxLayout()
         style = self.style()
         self.play_pause_button = QPushButton()
@@ -107,6 +131,20 @@ class M3UPlayerWindow(QMainWindow):
         self.volume_slider.setToolTip("音量")
         control_layout.addWidget(self.play_pause_button)
         control_layout.addWidget(self.stop_button)
+        self.zap_button = QPushButton("快速换台")
+        self.zap_button.setCheckable(True)
+        self.zap_button.setToolTip("后台预先缓冲相邻频道, 换台 (PgUp/PgDn) 时直接切换")
+        control_layout.addWidget(self.zap_button)
+        self.mosaic_combo = QComboBox()
+        self.mosaic_combo.addItem("单画面", 1)
+        self.mosaic_combo.addItem("2×2", 2)
+        self.mosaic_combo.addItem("3×3", 3)
+        self.mosaic_combo.setToolTip("多画面监看: 点击画面切换焦点 (出声), 双击列表把频道放到焦点画面")
+        control_layout.addWidget(self.mosaic_combo)
+        self.stats_button = QPushButton("统计")
+        self.stats_button.setCheckable(True)
+        self.stats_button.setToolTip("显示启动耗时、卡顿、码率和丢帧")
+        control_layout.addWidget(self.stats_button)
         control_layout.addStretch(1)
         control_layout.addWidget(QLabel("音量:"))
         control_layout.addWidget(self.volume_slider)
@@ -118,15 +156,46 @@ class M3UPlayerWindow(QMainWindow):
         list_panel_widget.setFixedWidth(300) # 固定宽度
         load_layout = QHBoxLayout()
         self.m3u_path_input = QLineEdit()
-        self.m3u_path_input.setPlaceholderText("输入 M3U URL 或点击浏览")
+        self.m3u_path_input.setPlaceholderText("输入 M3U URL (多个用空格分隔) 或点击浏览")
         self.browse_button = QPushButton("浏览")
         self.load_url_button = QPushButton("加载URL")
         load_layout.addWidget(self.m3u_path_input)
         load_layout.addWidget(self.browse_button)
         load_layout.addWidget(self.load_url_button)
         list_panel_layout.addLayout(load_layout)
-        self.channel_list_widget = QListWidget()
-        list_panel_layout.addWidget(self.channel_list_widget)
+        filter_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("搜索频道")
+        self.search_input.setClearButtonEnabled(True)
+        self.group_combo = QComboBox()
+        self.group_combo.addItem("全部分组", None)
+        self.group_combo.setMaximumWidth(110)
+        filter_layout.addWidget(self.search_input, 1)
+        filter_layout.addWidget(self.group_combo)
+        list_panel_layout.addLayout(filter_layout)
+        health_layout = QHBoxLayout()
+        self.check_all_button = QPushButton("检查全部")
+        self.check_all_button.setToolTip("并发检测所有频道地址是否可用")
+        self.sort_latency_button = QPushButton("按延迟排序")
+        self.sort_latency_button.setCheckable(True)
+        health_layout.addWidget(self.check_all_button)
+        health_layout.addWidget(self.sort_latency_button)
+        list_panel_layout.addLayout(health_layout)
+        # 单列 QTableView: 固定行高时不做逐行布局, 插入/滚动开销与列表长度无关 (QListView 每次插入都要遍历全部行)
+        self.channel_list_view = QTableView()
+        self.channel_list_view.setModel(self.channel_model)
+        self.channel_list_view.horizontalHeader().hide()
+        self.channel_list_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.channel_list_view.verticalHeader().hide()
+        self.channel_list_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.channel_list_view.verticalHeader().setDefaultSectionSize(max(self.fontMetrics().height(), LOGO_SIZE.height()) + 6)
+        self.channel_list_view.setIconSize(LOGO_SIZE)
+        self.channel_list_view.setShowGrid(False)
+        self.channel_list_view.setWordWrap(False)
+        self.channel_list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.channel_list_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.channel_list_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        list_panel_layout.addWidget(self.channel_list_view)
 
         # --- 组合主布局 (关键改动！) ---
         main_layout.addWidget(video_panel_widget, 1) # 视频面板在左，占主要空间
@@ -140,130 +209,540 @@ class M3UPlayerWindow(QMainWindow):
     def _connect_signals(self):
         self.browse_button.clicked.connect(self._browse_m3u_file)
         self.load_url_button.clicked.connect(self._load_m3u_from_url)
-        self.channel_list_widget.itemDoubleClicked.connect(self._play_selected_channel)
+        self.m3u_path_input.returnPressed.connect(self._load_m3u_from_url)
+        self.channel_list_view.doubleClicked.connect(self._play_selected_channel)
+        self.search_input.textChanged.connect(self._apply_filter)
+        self.group_combo.currentIndexChanged.connect(self._apply_filter)
+        self.index_builder.indexed.connect(self._on_index_progress)
+        self.check_all_button.clicked.connect(self._check_all_channels)
+        self.sort_latency_button.toggled.connect(self._apply_filter)
         self.play_pause_button.clicked.connect(self._toggle_play_pause)
         self.stop_button.clicked.connect(self._stop_playback)
         self.volume_slider.valueChanged.connect(self._set_volume)
+        self.zap_button.toggled.connect(self._toggle_zap_mode)
+        self.mosaic_combo.currentIndexChanged.connect(lambda i: self._set_mosaic(self.mosaic_combo.itemData(i)))
+        self.zapper.player_created.connect(self._attach_player_events)
+        self.zapper.player_releasing.connect(self.vlc_bridge.forget)
+        self.vlc_bridge.state_changed.connect(self._handle_player_state_change)
+        self.vlc_bridge.buffering.connect(self._handle_player_buffering)
+        self.vlc_bridge.state_changed.connect(self.watchdog.on_state)
+        self.watchdog.failover.connect(self._on_failover)
+        self.watchdog.recovered.connect(self._on_failover_recovered)
+        self.watchdog.gave_up.connect(self._on_failover_gave_up)
+        self.zapper.latency_measured.connect(self._on_zap_latency)
+        self.zapper.latency_measured.connect(self.telemetry.on_first_frame)
+        self.vlc_bridge.state_changed.connect(self.telemetry.on_state)
+        self.vlc_bridge.state_changed.connect(lambda player, state: self.mosaic and self.mosaic.on_state(player, state))
+        self.vlc_bridge.buffering.connect(self.telemetry.on_buffering)
+        self.telemetry.sampled.connect(self._update_stats_panel)
+        self.stats_button.toggled.connect(self.stats_label.setVisible)
+        QShortcut(QKeySequence(Qt.Key_PageUp), self, lambda: self._zap(-1))
+        QShortcut(QKeySequence(Qt.Key_PageDown), self, lambda: self._zap(1))
         if self.event_manager:
-            events_to_handle = [
-                vlc.EventType.MediaPlayerOpening, vlc.EventType.MediaPlayerBuffering,
-                vlc.EventType.MediaPlayerPlaying, vlc.EventType.MediaPlayerPaused,
-                vlc.EventType.MediaPlayerStopped, vlc.EventType.MediaPlayerEncounteredError
-            ]
-            for event_type in events_to_handle:
-                try:
-                    self.event_manager.event_attach(event_type, self._handle_player_state_change)
-                    print(f"成功绑定 VLC 事件: {event_type}")
-                except Exception as e:
-                    print(f"警告: 无法绑定 VLC 事件 {event_type}. 错误: {e}")
+            self._attach_player_events(self.media_player)
         else:
             QMessageBox.critical(self, "严重错误", "VLC 事件管理器未初始化！")
             sys.exit(1)
 
+    def _attach_player_events(self, player):
+        # VLC 回调运行在 libvlc 的事件线程, 经 VlcEventBridge 合并后回到 GUI 线程再更新界面
+        self.vlc_bridge.attach(player)
+
     def _embed_vlc(self):
         if not self.media_player: return
-        try:
-            system = platform.system()
-            win_id = int(self.video_frame.winId())
-            if system == "Linux": self.media_player.set_xwindow(win_id)
-            elif system == "Windows": self.media_player.set_hwnd(win_id)
-            elif system == "Darwin": self.media_player.set_nsobject(win_id)
-            else: print(f"警告：不支持的平台 '{system}' 用于 VLC 嵌入。")
-        except Exception as e: print(f"嵌入 VLC 到窗口时出错: {e}")
+        embed_player(self.media_player, self.video_frame)
 
     def _browse_m3u_file(self):
-        filepath, _ = QFileDialog.getOpenFileName(self, "选择 M3U 文件", "", "M3U Playlist (*.m3u *.m3u8);;All Files (*)")
-        if filepath:
-            self.m3u_path_input.setText(filepath)
-            self.status_bar.showMessage(f"加载中: {os.path.basename(filepath)}...")
-            QApplication.processEvents()
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f: content = f.read()
-                self.channels = parse_m3u(content)
-                self._populate_channel_list()
-                self.status_bar.showMessage(f"加载完成: {len(self.channels)} 频道")
-            except Exception as e:
-                QMessageBox.warning(self, "文件错误", f"无法加载或解析文件: {filepath}\n错误: {e}")
-                self.status_bar.showMessage("加载失败")
+        filepaths, _ = QFileDialog.getOpenFileNames(self, "选择 M3U 文件 (可多选)", "", "M3U Playlist (*.m3u *.m3u8);;All Files (*)")
+        if filepaths:
+            self.m3u_path_input.setText(' '.join(filepaths))
+            self._start_loading(filepaths)
 
     def _load_m3u_from_url(self):
-        url = self.m3u_path_input.text().strip()
-        if not url.startswith(('http://', 'https://')):
+        urls = self.m3u_path_input.text().split()
+        if not urls or not all(url.startswith(('http://', 'https://')) for url in urls):
             QMessageBox.warning(self, "无效 URL", "请输入有效的 HTTP 或 HTTPS URL。")
             return
-        self.status_bar.showMessage(f"加载中: {url}...")
-        QApplication.processEvents()
+        self._start_loading(urls)
+
+    def _start_loading(self, sources):
+        """在后台线程加载播放列表; 若已有加载任务则先取消. 多个源并行加载, 经 ChannelMerger 去重后合并到同一张表"""
+        if isinstance(sources, str): sources = [sources]
+        self._cancel_loading()
+        self._cancel_revalidation()
+        self.playlist_sources = list(sources)
+        self._populate_channel_list()
+        if len(sources) == 1:
+            source = sources[0]
+            self.status_bar.showMessage(f"加载中: {os.path.basename(source) if os.path.exists(source) else source}...")
+        else:
+            self.status_bar.showMessage(f"加载中: {len(sources)} 个播放列表...")
+        self.channel_merger = ChannelMerger(self.channel_model.table) if len(sources) > 1 else None
+        self._load_summary = {'sources': len(sources), 'parsed': 0, 'failed': 0, 'notes': []}
+        self.epg_urls = []
+        for source in sources:
+            loader = PlaylistLoader(source, self.playlist_cache, self, merger=self.channel_merger)
+            loader.batch_ready.connect(self._on_channel_batch)
+            loader.table_ready.connect(self._on_channel_table)
+            loader.progress.connect(self._on_load_progress)
+            loader.loaded.connect(self._on_load_finished)
+            loader.failed.connect(self._on_load_failed)
+            loader.header_ready.connect(self._on_playlist_header)
+            loader.finished.connect(loader.deleteLater)
+            self.playlist_loaders.append(loader)
+            loader.start()
+
+    def _cancel_loading(self):
+        loaders, self.playlist_loaders = self.playlist_loaders, []
+        for loader in loaders:
+            for signal in (loader.batch_ready, loader.table_ready, loader.progress, loader.loaded, loader.failed, loader.header_ready):
+                signal.disconnect()
+            loader.cancel()
+
+    # --- 会话: 退出时保存快照, 启动时先播放上次的频道, 再解码频道表, 最后后台重新校验来源 ---
+    def _save_session(self):
+        table = self.channel_model.table
+        if self.playlist_loaders: table = None     # 没加载完的表不保存, 下次重新加载
+        state = {'sources': self.playlist_sources, 'volume': self.volume_slider.value(), 'scroll_row': -1, 'channel': None}
+        if table:
+            top = self.channel_list_view.rowAt(0)
+            if top >= 0: state['scroll_row'] = self.channel_model.table_row(top)
+            if 0 <= self._last_row < len(table):
+                channel = table.channel(self._last_row)
+                state['channel'] = {'row': self._last_row, 'url': channel['url'], 'name': channel['name'],
+                                    'tvg_id': channel['tvg_id'], 'candidates': self._channel_candidates(self._last_row)}
         try:
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36'}
-            response = requests.get(url, timeout=15, headers=headers, stream=True)
-            response.raise_for_status()
-            content = ""
-            try: content = response.content.decode(response.encoding or 'utf-8', errors='ignore')
-            except Exception as decode_error:
-                 print(f"解码警告: {decode_error}. 尝试备用编码...")
-                 try: content = response.content.decode('iso-8859-1', errors='ignore')
-                 except Exception as final_decode_error: raise ValueError("无法解码服务器响应内容") from final_decode_error
-            self.channels = parse_m3u(content)
-            self._populate_channel_list()
-            self.status_bar.showMessage(f"加载完成: {len(self.channels)} 频道")
-        except requests.exceptions.Timeout:
-             QMessageBox.warning(self, "网络错误", f"加载 URL 超时: {url}")
-             self.status_bar.showMessage("加载超时")
-        except requests.exceptions.RequestException as e:
-            QMessageBox.warning(self, "网络错误", f"无法加载 URL: {url}\n错误: {e}")
-            self.status_bar.showMessage(f"加载失败: 网络错误")
-        except ValueError as e:
-             QMessageBox.warning(self, "内容错误", f"{e}")
-             self.status_bar.showMessage("加载失败：内容解码错误")
-        except Exception as e:
-            QMessageBox.warning(self, "未知错误", f"加载或处理 URL 时发生错误: {e}")
-            self.status_bar.showMessage(f"加载失败：未知错误")
+            self.session.save(state, table)
+            print(f"会话已保存: {self.session.path}")
+        except OSError as e:
+            print(f"保存会话失败: {e}")
+
+    def restore_session(self):
+        state = self.session.load()
+        if state is None: return
+        self.volume_slider.setValue(state.get('volume', self.volume_slider.value()))
+        sources = state.get('sources') or []
+        self.playlist_sources = list(sources)
+        self.m3u_path_input.setText(' '.join(sources))
+        channel = state.get('channel')
+        if channel:
+            url, name = channel['url'], channel['name']
+            print(f"恢复上次播放: {name} - {url}")
+            self._last_row = channel['row']
+            try:
+                self._launch_pending = True
+                self.telemetry.start_session(None, url, name, 'restore')
+                self.zapper.play(url, self._media_options(url, channel=channel))
+                self.media_player = self.zapper.player
+                self.telemetry.player = self.media_player
+                self.watchdog.watch(self.media_player, url, channel.get('candidates') or [url])
+                self._watched_row = self._last_row
+                self.setWindowTitle(f"加载中: {name} - M3U 直播播放器")
+            except Exception as e:
+                print(f"恢复播放失败: {e}")
+                self._launch_pending = False
+                self._stop_playback()
+        QTimer.singleShot(0, lambda: self._restore_table(state))    # 先让播放器开始打开, 再解码频道表
+
+    def _restore_table(self, state):
+        table = self.session.load_table()
+        sources = self.playlist_sources
+        if table is None:
+            if sources: self._start_loading(sources)
+            return
+        self.channel_model.set_table(table)
+        self.index_builder.reset(table)
+        self.index_builder.extend(len(table))
+        self._sync_group_combo()
+        if state.get('scroll_row', -1) >= 0:
+            self.channel_list_view.scrollTo(self.channel_model.index(state['scroll_row']), QAbstractItemView.PositionAtTop)
+        if 0 <= self._last_row < len(table):
+            self.channel_list_view.setCurrentIndex(self.channel_model.index(self._last_row))
+            if self.media_player and self.media_player.get_state() not in (vlc.State.Stopped, vlc.State.Ended, vlc.State.Error):
+                self.channel_model.set_playing_row(self._last_row)
+        self.status_bar.showMessage(f"已恢复上次的列表: {len(table)} 频道")
+        if sources: self._revalidate_sources(sources)
+
+    def _revalidate_sources(self, sources):
+        """后台重新加载来源 (URL 带缓存校验头, 未变化时服务器回 304), 结果和当前表不同时才替换, 不打断正在播放的频道"""
+        table = ChannelTable()
+        merger = ChannelMerger(table) if len(sources) > 1 else None
+        self._revalidation = {'table': table, 'failed': 0, 'epg_urls': []}
+        for source in sources:
+            loader = PlaylistLoader(source, self.playlist_cache, self, merger=merger)
+            loader.batch_ready.connect(self._on_revalidate_batch)
+            loader.table_ready.connect(self._on_revalidate_table)
+            loader.header_ready.connect(self._on_revalidate_header)
+            loader.loaded.connect(self._on_revalidate_done)
+            loader.failed.connect(self._on_revalidate_failed)
+            loader.finished.connect(loader.deleteLater)
+            self.revalidate_loaders.append(loader)
+            loader.start()
+
+    def _cancel_revalidation(self):
+        loaders, self.revalidate_loaders = self.revalidate_loaders, []
+        self._revalidation = None
+        for loader in loaders:
+            for signal in (loader.batch_ready, loader.table_ready, loader.header_ready, loader.loaded, loader.failed):
+                signal.disconnect()
+            loader.cancel()
+
+    def _on_revalidate_batch(self, batch):
+        if self.sender() in self.revalidate_loaders: self._revalidation['table'].extend(batch)
+
+    def _on_revalidate_table(self, table):
+        if self.sender() in self.revalidate_loaders: self._revalidation['table'] = table
+
+    def _on_revalidate_header(self, header):
+        if self.sender() not in self.revalidate_loaders: return
+        for url in epg_urls(header):
+            if url not in self._revalidation['epg_urls']: self._revalidation['epg_urls'].append(url)
+
+    def _on_revalidate_failed(self, title, message, status):
+        if self.sender() not in self.revalidate_loaders: return
+        print(f"后台校验 {title}: {message}")
+        self._revalidation['failed'] += 1
+        self._on_revalidate_done()
+
+    def _on_revalidate_done(self, count=0, note=''):
+        loader = self.sender()
+        if loader not in self.revalidate_loaders: return
+        self.revalidate_loaders.remove(loader)
+        if self.revalidate_loaders: return
+        result, self._revalidation = self._revalidation, None
+        self.epg_urls = result['epg_urls']
+        self._update_epg()
+        table = result['table']
+        if result['failed'] or same_channels(table, self.channel_model.table):
+            print("播放列表未变化" if not result['failed'] else f"后台校验: {result['failed']} 个源失败, 保留上次的列表")
+            return
+        playing_url = self.zapper.active.url if self.channel_model.playing_row >= 0 else None
+        self._cancel_health_check()
+        self.channel_model.set_table(table)
+        self.index_builder.reset(table)
+        self.index_builder.extend(len(table))
+        self.group_combo.blockSignals(True)
+        self.group_combo.clear()
+        self.group_combo.addItem("全部分组", None)
+        self.group_combo.blockSignals(False)
+        self._sync_group_combo()
+        self._apply_filter()
+        self._last_row = self._watched_row = table.urls.index(playing_url) if playing_url in table.urls else -1
+        self.channel_model.set_playing_row(self._last_row)
+        print(f"播放列表已更新: {len(table)} 个频道")
+        self.status_bar.showMessage(f"播放列表已更新: {len(table)} 频道")
+
+    def _on_channel_batch(self, batch):
+        if self.sender() not in self.playlist_loaders: return
+        self.channel_model.append_channels(batch)
+        self.index_builder.extend(len(self.channel_model.table))
+        self._sync_group_combo()
+
+    def _on_channel_table(self, table):
+        if self.sender() not in self.playlist_loaders: return
+        self._cancel_health_check()
+        self.channel_model.set_table(table)
+        self.index_builder.reset(table)
+        self.index_builder.extend(len(table))
+        self._sync_group_combo()
+
+    def _on_load_progress(self, bytes_read, total, count):
+        if self.sender() not in self.playlist_loaders: return
+        if self.channel_merger is not None:
+            self.status_bar.showMessage(f"加载中: 剩余 {len(self.playlist_loaders)} 个源, 已合并 {len(self.channel_model.table)} 频道")
+            return
+        if total > 0: size_text = f"{bytes_read / 2**20:.1f} / {total / 2**20:.1f} MiB"
+        else: size_text = f"{bytes_read / 2**20:.1f} MiB"
+        self.status_bar.showMessage(f"加载中: {size_text}, 已解析 {count} 频道")
+
+    def _on_load_finished(self, count, note):
+        loader = self.sender()
+        if loader not in self.playlist_loaders: return
+        self.playlist_loaders.remove(loader)
+        self._load_summary['parsed'] += count
+        if note: self._load_summary['notes'].append(note)
+        if not self.playlist_loaders: self._finish_loading()
+
+    def _on_load_failed(self, title, message, status):
+        loader = self.sender()
+        if loader not in self.playlist_loaders: return
+        self.playlist_loaders.remove(loader)
+        if self.channel_merger is None:
+            self.channel_model.set_placeholder("列表为空或加载失败")
+            QMessageBox.warning(self, title, message)
+            self.status_bar.showMessage(status)
+            return
+        # 多个源时单个源失败不打断其它源
+        print(f"{title}: {message}")
+        self._load_summary['failed'] += 1
+        if not self.playlist_loaders: self._finish_loading()
+
+    def _on_playlist_header(self, header):
+        if self.sender() not in self.playlist_loaders: return
+        for url in epg_urls(header):
+            if url not in self.epg_urls: self.epg_urls.append(url)
+
+    def _update_epg(self):
+        """后台检查节目单源, 有变化才重新导入; 列表照常用库里已有的数据"""
+        if self.epg_updater is not None:
+            self.epg_updater.updated.disconnect()
+            self.epg_updater.cancel()
+            self.epg_updater = None
+        if not self.epg_urls: return
+        updater = EpgUpdater(list(self.epg_urls), self.epg_store.path, self)
+        updater.updated.connect(self._on_epg_updated)
+        updater.finished.connect(self._on_epg_finished)
+        updater.finished.connect(updater.deleteLater)
+        self.epg_updater = updater
+        updater.start()
+
+    def _on_epg_finished(self):
+        if self.sender() is self.epg_updater: self.epg_updater = None
+
+    def _on_epg_updated(self, count):
+        self.epg_store.invalidate()
+        self.channel_model.refresh_epg()
+        self.status_bar.showMessage(f"节目单已更新: {count} 个节目")
+
+    def _finish_loading(self):
+        summary = self._load_summary
+        count = len(self.channel_model.table)
+        self.channel_model.set_placeholder("列表为空或加载失败")
+        self._update_epg()
+        if self.channel_merger is None:
+            print(f"解析到 {count} 个频道。")
+            note = summary['notes'][0] if summary['notes'] else ''
+            self.status_bar.showMessage(f"加载完成: {count} 频道" + (f" ({note})" if note else ""))
+            return
+        print(f"合并 {summary['sources']} 个源: 共 {summary['parsed']} 条, 去重后 {count} 个频道, "
+              f"其中 {len(self.channel_model.table.alt_urls)} 个有备用地址。")
+        text = f"加载完成: {count} 频道 ({summary['sources']} 个源, 合并重复 {self.channel_merger.duplicates}"
+        if summary['failed']: text += f", {summary['failed']} 个源失败"
+        self.status_bar.showMessage(text + ")")
 
     def _populate_channel_list(self):
         self._stop_playback()
-        self.channel_list_widget.clear()
-        if not self.channels:
-             self.channel_list_widget.addItem("列表为空或加载失败")
-             return
-        default_bg_color = self.channel_list_widget.palette().base()
-        for channel in self.channels:
-            item_text = channel.get('name', '未知频道')
-            group = channel.get('group', 'Default')
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.UserRole, channel)
-            item.setToolTip(f"分组: {group}\nURL: {channel.get('url', 'N/A')}")
-            item.setBackground(default_bg_color)
-            self.channel_list_widget.addItem(item)
-
-    def _play_selected_channel(self, item=None):
-        if item is None: item = self.channel_list_widget.currentItem()
-        if not item: return
-        channel_data = item.data(Qt.UserRole)
-        if channel_data and channel_data.get('url'):
+        self._cancel_health_check()
+        self.channel_model.clear()
+        self._last_row = -1
+        self.index_builder.reset(self.channel_model.table)
+        for widget in (self.search_input, self.group_combo): widget.blockSignals(True)
+        self.search_input.clear()
+        self.group_combo.clear()
+        self.group_combo.addItem("全部分组", None)
+        for widget in (self.search_input, self.group_combo): widget.blockSignals(False)
+
+    def _sync_group_combo(self):
+        group_names = self.channel_model.table.group_names
+        for group_id in range(self.group_combo.count() - 1, len(group_names)):
+            self.group_combo.addItem(group_names[group_id], group_id)
+
+    def _apply_filter(self):
+        """按搜索词和分组从索引取行号, 不扫描整张表"""
+        start = time.perf_counter()
+        rows = self.index_builder.index.search(self.search_input.text(), self.group_combo.currentData())
+        sort_by_latency = self.sort_latency_button.isChecked()
+        if rows is None and self.channel_model.rows is None and not sort_by_latency: return
+        self.channel_model.set_filter(rows, sort_by_latency)
+        elapsed = (time.perf_counter() - start) * 1000
+        if rows is not None: self.status_bar.showMessage(f"筛选: {len(rows)} 个频道 ({elapsed:.1f} ms)")
+        else: self.status_bar.showMessage(f"共 {len(self.channel_model.table)} 频道")
+
+    def _on_index_progress(self, index):
+        # 索引在后台追加了新行: 筛选中的话刷新结果, 把新加载的匹配项带出来
+        if index is self.index_builder.index and self.channel_model.rows is not None: self._apply_filter()
+
+    def _play_selected_channel(self, index=None):
+        if index is None: index = self.channel_list_view.currentIndex()
+        if not index.isValid(): return
+        row = self.channel_model.table_row(index.row())
+        channel_data = self.channel_model.channel(row)
+        if channel_data and channel_data.get('url') and self.mosaic is not None:
+            self.mosaic.play(self.mosaic.focused, channel_data['url'], channel_data['name'],
+                             self._media_options(channel_data['url'], row))
+        elif channel_data and channel_data.get('url'):
             url = channel_data['url']
             name = channel_data.get('name', '未知频道')
             print(f"请求播放: {name} - {url}")
             self.status_bar.showMessage(f"准备加载: {name}...")
             try:
-                if self.media_player.get_state() != vlc.State.Stopped: self.media_player.stop()
-                media = self.vlc_instance.media_new(url)
-                ua = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36"
-                media.add_option(f'http-user-agent={ua}')
-                self.media_player.set_media(media)
-                media.release()
-                play_result = self.media_player.play()
-                if play_result == -1: raise RuntimeError("VLC media_player.play() 返回 -1")
+                self.telemetry.start_session(None, url, name)   # 从点击开始计时, 播放器确定后再关联
+                warm = self.zapper.play(url, self._media_options(url, row))
+                self.media_player = self.zapper.player
+                self.telemetry.player = self.media_player
+                self.watchdog.watch(self.media_player, url, self._channel_candidates(row))
+                self._watched_row = self._last_row = row
                 self.setWindowTitle(f"加载中: {name} - M3U 直播播放器")
-                if self.current_playing_item and self.current_playing_item != item:
-                     self.current_playing_item.setBackground(self.channel_list_widget.palette().base())
-                item.setBackground(Qt.lightGray)
-                self.current_playing_item = item
+                self.channel_model.set_playing_row(row)
+                if warm: self._refresh_player_state() # 预热的播放器已在播放, 不会再有 Opening/Playing 事件
+                if self.zapper.pool: self._prewarm_neighbors(row)
             except Exception as e:
                 QMessageBox.warning(self, "播放启动错误", f"无法开始播放流: {name}\nURL: {url}\n错误: {e}")
                 self.status_bar.showMessage(f"播放失败: {name}")
                 self._stop_playback()
         else: QMessageBox.information(self, "信息", "选中的频道没有有效的播放地址。")
 
+    def _channel_candidates(self, row):
+        """同一频道的全部地址: 本行的主/备用地址, 再加上 tvg-id 相同或名称相同的其它行"""
+        table = self.channel_model.table
+        urls = table.candidate_urls(row)
+        tvg_id = table.tvg_ids[row]
+        others = [r for r, t in enumerate(table.tvg_ids) if t == tvg_id] if tvg_id else []
+        index = self.index_builder.index
+        norm = normalize_name(table.names[row])
+        if norm:
+            rows = index.search(norm)
+            others.extend(r for r in rows if index.norm_names[r] == norm)
+        for other in others:
+            if other != row: urls.extend(table.candidate_urls(other))
+        return urls
+
+    def _on_failover(self, url, reason):
+        row = self._watched_row
+        channel_data = self.channel_model.channel(row)
+        name = channel_data['name'] if channel_data else url
+        print(f"{reason}, 切换备用地址: {name} - {url}")
+        self.status_bar.showMessage(f"{reason}, 切换备用地址: {name}...")
+        try:
+            self.zapper.play(url, self._media_options(url, row))
+        except Exception as e:
+            print(f"备用地址启动失败: {e}")
+        self.media_player = self.zapper.player
+        self.watchdog.follow(self.media_player, url)
+        self.telemetry.start_session(self.media_player, url, name, 'failover')
+        self.channel_model.set_playing_row(row)
+
+    def _on_failover_recovered(self, url, elapsed):
+        print(f"故障切换恢复: {url} ({elapsed:.0f} ms)")
+        self.status_bar.showMessage(f"已切换到备用地址 (恢复用时 {elapsed:.0f} ms)")
+
+    def _on_failover_gave_up(self, reason):
+        print(f"放弃故障切换: {reason}")
+        self.status_bar.showMessage(f"播放错误: {reason}")
+        self.channel_model.set_playing_row(-1)
+
+    def _check_all_channels(self):
+        if self.health_worker is not None:
+            self._cancel_health_check()
+            self.status_bar.showMessage("已停止检测")
+            return
+        table = self.channel_model.table
+        if not table: return
+        worker = HealthCheckWorker(list(range(len(table))), list(table.urls), parent=self)
+        worker.results.connect(self._on_health_results)
+        worker.progress.connect(self._on_health_progress)
+        worker.finished.connect(worker.deleteLater)
+        self.health_worker = worker
+        self.check_all_button.setText("停止检查")
+        self.status_bar.showMessage(f"检测中: 0/{len(table)}")
+        worker.start()
+
+    def _cancel_health_check(self):
+        worker = self.health_worker
+        if worker is None: return
+        self.health_worker = None
+        worker.results.disconnect()
+        worker.progress.disconnect()
+        worker.cancel()
+        self.check_all_button.setText("检查全部")
+
+    def _on_health_results(self, batch):
+        if self.sender() is not self.health_worker: return
+        self.channel_model.update_health(batch)
+
+    def _on_health_progress(self, done, total):
+        if self.sender() is not self.health_worker: return
+        if done < total:
+            self.status_bar.showMessage(f"检测中: {done}/{total}")
+            return
+        self.health_worker = None
+        self.check_all_button.setText("检查全部")
+        statuses = [h[0] for h in self.channel_model.health.values()]
+        self.status_bar.showMessage(f"检测完成: 正常 {statuses.count(STATUS_OK)}, 无法播放 {statuses.count(STATUS_DEAD)}, 共 {total}")
+        if self.sort_latency_button.isChecked(): self._apply_filter()
+
+    def _media_options(self, url, row=-1, channel=None):
+        """按频道 / 主机配置和自适应缓存生成 Media 参数; channel 为空时按表行号取频道"""
+        options = self.profiles.media_options(url, channel or self.channel_model.channel(row))
+        print(f"播放参数: {', '.join(o for o in options if not o.startswith('http-user-agent'))}")
+        return options
+
+    def _prewarm_neighbors(self, row):
+        """后台预热当前视图中的下一个和上一个频道"""
+        view_row = self.channel_model.view_row(row)
+        if view_row < 0: return
+        rows = {}
+        for neighbor in (view_row + 1, view_row - 1):
+            if 0 <= neighbor < self.channel_model.rowCount():
+                table_row = self.channel_model.table_row(neighbor)
+                rows[self.channel_model.table.urls[table_row]] = table_row
+        self.zapper.prewarm(list(rows), lambda url: self._media_options(url, rows[url]))
+
+    def _zap(self, offset):
+        model = self.channel_model
+        if not model.table: return
+        current = model.view_row(model.playing_row)
+        if current < 0: current = max(self.channel_list_view.currentIndex().row(), 0) - offset
+        target = min(max(current + offset, 0), model.rowCount() - 1)
+        index = model.index(target)
+        self.channel_list_view.setCurrentIndex(index)
+        self._play_selected_channel(index)
+
+    def _toggle_zap_mode(self, enabled):
+        self.zapper.set_pool_size(2 if enabled else 0)
+        self.media_player = self.zapper.player
+        self.video_frame = self.zapper.active.frame
+        self.video_stack.setCurrentWidget(self.video_frame)
+        if enabled and self.channel_model.playing_row >= 0: self._prewarm_neighbors(self.channel_model.playing_row)
+
+    def _set_mosaic(self, size):
+        """size 为 1 时回到单画面; 否则停掉主播放器, 从当前选中行起依次填满 size × size 个画面"""
+        if size == 1:
+            if self.mosaic is None: return
+            self.mosaic.release()
+            self.video_stack.removeWidget(self.mosaic)
+            self.mosaic.deleteLater()
+            self.mosaic = None
+            self.video_stack.setCurrentWidget(self.video_frame)
+            self.zap_button.setEnabled(True)
+            return
+        if self.mosaic is None:
+            self._stop_playback()
+            self.zap_button.setChecked(False)
+            self.zap_button.setEnabled(False)
+            self.mosaic = MosaicView(self.vlc_instance, self.vlc_bridge, self, self.max_decoders)
+            self.mosaic.set_volume(self.volume_slider.value())
+            self.video_stack.addWidget(self.mosaic)
+            self.video_stack.setCurrentWidget(self.mosaic)
+        self.mosaic.set_grid(size)
+        model = self.channel_model
+        start = max(self.channel_list_view.currentIndex().row(), 0)
+        for tile, view_row in zip(self.mosaic.tiles, range(start, model.rowCount())):
+            if tile.url: continue
+            row = model.table_row(view_row)
+            url = model.table.urls[row]
+            self.mosaic.play(tile, url, model.table.names[row], self._media_options(url, row))
+        self.status_bar.showMessage(f"多画面 {size}×{size}, 同时解码上限 {self.mosaic.max_decoders}")
+
+    def _on_zap_latency(self, url, elapsed, warm):
+        print(f"换台耗时: {elapsed:.0f} ms ({'预热命中' if warm else '冷启动'}) - {url}")
+        self.status_bar.showMessage(f"首帧耗时 {elapsed:.0f} ms" + (" (预热)" if warm else ""), 3000)
+        if self._launch_pending:
+            self._launch_pending = False
+            launch = (time.perf_counter() - LAUNCH_TIME) * 1000
+            print(f"启动到首帧: {launch:.0f} ms")
+            self.status_bar.showMessage(f"启动到首帧 {launch:.0f} ms", 3000)
+
+    def _update_stats_panel(self, stats):
+        if not self.stats_label.isVisible(): return
+        fmt = lambda value, unit: f"{value:.0f} {unit}" if value is not None else "-"
+        startup = stats['first_frame_ms'] if stats['first_frame_ms'] is not None else stats['to_playing_ms']
+        parts = [f"启动 {fmt(startup, 'ms')}" + (" (预热)" if stats['warm'] else ""),
+                 f"卡顿 {stats['rebuffer_count']} 次 / {stats['rebuffer_ms'] / 1000:.1f} s",
+                 f"码率 {fmt(stats.get('input_bitrate'), 'kb/s')}",
+                 f"丢帧 {stats.get('lost_pictures', '-')}"]
+        self.stats_label.setText(" | ".join(parts))
+
     def _toggle_play_pause(self):
         if not self.media_player: return
         if self.media_player.is_playing(): self.media_player.pause()
@@ -271,23 +750,37 @@ class M3UPlayerWindow(QMainWindow):
 
     def _stop_playback(self):
         print("请求停止播放...")
-        if self.media_player and self.media_player.get_state() != vlc.State.Stopped: self.media_player.stop()
+        self.watchdog.stop()
+        self.telemetry.end_session('stop')
+        if self.mosaic is not None: self.mosaic.stop()
+        self.zapper.stop()
         self.play_pause_button.setEnabled(False)
         self.stop_button.setEnabled(False)
         self._update_play_pause_icon()
         self.status_bar.showMessage("已停止")
         self.setWindowTitle("M3U 直播播放器 (列表在右)")
-        if self.current_playing_item:
-            self.current_playing_item.setBackground(self.channel_list_widget.palette().base())
-            self.current_playing_item = None
+        self.channel_model.set_playing_row(-1)
 
     def _set_volume(self, value):
+        self.zapper.volume = value
+        if self.mosaic is not None: self.mosaic.set_volume(value)
         if self.media_player: self.media_player.audio_set_volume(value)
 
-    def _handle_player_state_change(self, event):
-        if not self.media_player: return
-        new_state = self.media_player.get_state()
-        print(f"VLC 状态改变: {new_state} (来自事件: {event.type})")
+    def _handle_player_state_change(self, player, new_state):
+        if not self.media_player or player is not self.media_player: return # 后台预热的播放器不影响界面
+        print(f"VLC 状态改变: {new_state}")
+        self._refresh_player_state(new_state)
+
+    def _handle_player_buffering(self, player, percent):
+        if player is not self.media_player or percent >= 100: return
+        if self.media_player.get_state() not in (vlc.State.Opening, vlc.State.Buffering, vlc.State.Playing): return
+        channel_data = self.channel_model.channel(self.channel_model.playing_row)
+        name = channel_data['name'] if channel_data else ''
+        self.status_bar.showMessage(f"缓冲中 {percent:.0f}%: {name}" if name else f"缓冲中 {percent:.0f}%")
+        self._ui_state = None
+
+    def _refresh_player_state(self, new_state=None):
+        if new_state is None: new_state = self.media_player.get_state()
         state_map = {
             vlc.State.Opening: "打开中...", vlc.State.Buffering: "缓冲中...",
             vlc.State.Playing: "播放中", vlc.State.Paused: "已暂停",
@@ -296,9 +789,8 @@ class M3UPlayerWindow(QMainWindow):
         }
         status_message = state_map.get(new_state, f"未知状态 ({new_state})")
         channel_name = ""
-        if self.current_playing_item:
-            channel_data = self.current_playing_item.data(Qt.UserRole)
-            if channel_data: channel_name = channel_data.get('name', '')
+        channel_data = self.channel_model.channel(self.channel_model.playing_row)
+        if channel_data: channel_name = channel_data.get('name', '')
         title = "M3U 直播播放器 (列表在右)"
         full_status = status_message
         if channel_name:
@@ -310,17 +802,18 @@ class M3UPlayerWindow(QMainWindow):
                  title = f"已暂停: {channel_name} - M3U 直播播放器"
             elif new_state == vlc.State.Error:
                  full_status = f"播放错误: {channel_name}"
-        self.status_bar.showMessage(full_status)
-        self.setWindowTitle(title)
         can_play_pause = new_state in [vlc.State.Playing, vlc.State.Paused]
         can_stop = new_state in [vlc.State.Playing, vlc.State.Paused, vlc.State.Buffering, vlc.State.Opening]
-        self.play_pause_button.setEnabled(can_play_pause)
-        self.stop_button.setEnabled(can_stop)
-        self._update_play_pause_icon()
+        ui_state = (full_status, title, can_play_pause, can_stop, new_state == vlc.State.Playing)
+        if ui_state != self._ui_state: # 与上次一样就不碰控件
+            self._ui_state = ui_state
+            self.status_bar.showMessage(full_status)
+            self.setWindowTitle(title)
+            self.play_pause_button.setEnabled(can_play_pause)
+            self.stop_button.setEnabled(can_stop)
+            self._update_play_pause_icon()
         if new_state in [vlc.State.Stopped, vlc.State.Ended, vlc.State.Error]:
-            if self.current_playing_item:
-                self.current_playing_item.setBackground(self.channel_list_widget.palette().base())
-                self.current_playing_item = None
+            self.channel_model.set_playing_row(-1)
 
     def _update_play_pause_icon(self):
         style = self.style()
@@ -333,9 +826,25 @@ class M3UPlayerWindow(QMainWindow):
 
     def closeEvent(self, event):
         print("开始关闭窗口和释放资源...")
+        self._save_session()
+        self._cancel_loading()
+        self._cancel_revalidation()
+        for loader in self.findChildren(PlaylistLoader): loader.wait(3000)
+        self.index_builder.stop()
+        self._cancel_health_check()
+        for worker in self.findChildren(HealthCheckWorker): worker.wait(3000)
+        if self.epg_updater is not None: self.epg_updater.cancel()
+        for updater in self.findChildren(EpgUpdater): updater.wait(3000)
+        self.epg_store.close()
+        self.logo_cache.close()
         self._stop_playback()
+        self.telemetry.close()
+        self._set_mosaic(1)
+        self.zapper.release()
+        self.media_player = self.zapper.player
         if self.media_player:
             try:
+                self.vlc_bridge.forget(self.media_player)
                 self.media_player.release()
                 self.media_player = None
                 print("VLC Media Player 已释放。")
@@ -351,7 +860,19 @@ class M3UPlayerWindow(QMainWindow):
 
 # --- 程序入口 ---
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stats-interval', type=float, default=1.0, help="播放统计的采样间隔 (秒)")
+    parser.add_argument('--metrics-jsonl', help="播放统计写入该 JSONL 文件 (按大小轮转)")
+    parser.add_argument('--metrics-port', type=int, help="在 127.0.0.1 该端口提供 Prometheus /metrics")
+    parser.add_argument('--max-decoders', type=int, help="多画面同时解码的上限, 默认按 CPU 核数")
+    parser.add_argument('--no-session', action='store_true', help="不恢复上次的列表和频道")
+    args, qt_args = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
     player_window = M3UPlayerWindow()
+    player_window.telemetry.set_interval(args.stats_interval)
+    player_window.max_decoders = args.max_decoders
+    if args.metrics_jsonl: player_window.telemetry.enable_jsonl(args.metrics_jsonl)
+    if args.metrics_port is not None: player_window.telemetry.enable_prometheus(args.metrics_port)
     player_window.show()
+    if not args.no_session: QTimer.singleShot(0, player_window.restore_session)
     sys.exit(app.exec_())
@@ -0,0 +1,85 @@
+"""合并多个播放列表 (去重 + 备用地址) 的耗时与峰值内存.
+
+源之间按 overlap 比例互相重复, 其中一部分重复项换了地址 (应记为备用地址).
+按源的个数 1..N 依次测量, 每条耗时应大致不变 (线性).
+
+用法: python benchmarks/bench_merge.py [--sources 5] [--entries 50000] [--overlap 0.3]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from m3u_parser import iter_m3u
+from channel_table import ChannelTable
+from channel_merge import ChannelMerger
+
+BATCH = 5000
+
+
+def write_source(path, index, entries, overlap):
+    """第 index 个源: 前 overlap 部分与上一个源重叠, 重叠项里每 4 个有 1 个换了地址"""
+    start = int(index * entries * (1 - overlap))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('#EXTM3U\n')
+        for i in range(start, start + entries):
+            tvg = f' tvg-id="ch{i}.tv"' if i % 2 else ''
+            host = f"HOST{i % 37}.example.com:80" if index % 2 else f"host{i % 37}.example.com"
+            mirror = f"&mirror={index}" if i % 4 == 0 else ''
+            f.write(f'#EXTINF:-1{tvg} group-title="组{i % 40}",频道 {i}\n'
+                    f'http://{host}/live/{i}/index.m3u8?token=abc{mirror}\n')
+
+
+def merge(paths):
+    table = ChannelTable()
+    merger = ChannelMerger(table)
+    parsed = 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            batch = []
+            for channel in iter_m3u(f):
+                batch.append(channel)
+                if len(batch) >= BATCH:
+                    parsed += len(batch)
+                    table.extend(merger.merge(batch))
+                    batch = []
+            parsed += len(batch)
+            table.extend(merger.merge(batch))
+    return table, merger, parsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sources', type=int, default=5)
+    parser.add_argument('--entries', type=int, default=50000)
+    parser.add_argument('--overlap', type=float, default=0.3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.sources):
+            paths.append(os.path.join(tmp, f'source{i}.m3u'))
+            write_source(paths[-1], i, args.entries, args.overlap)
+        print(f"{'源':>4}{'条目':>10}{'频道':>10}{'重复':>10}{'备用':>8}{'耗时 s':>10}{'µs/条':>8}{'峰值 MiB':>10}")
+        for n in range(1, args.sources + 1):
+            tracemalloc.start()
+            start = time.perf_counter()
+            table, merger, parsed = merge(paths[:n])
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{n:>4}{parsed:>10}{len(table):>10}{merger.duplicates:>10}{len(table.alt_urls):>8}"
+                  f"{elapsed:>10.2f}{elapsed / parsed * 1e6:>8.1f}{peak / 2**20:>10.1f}")
+            del table, merger
+        # 不开 tracemalloc 再测一次真实耗时
+        start = time.perf_counter()
+        table, merger, parsed = merge(paths)
+        elapsed = time.perf_counter() - start
+        print(f"\n{args.sources} x {args.entries}: {elapsed:.2f} s ({parsed / elapsed:,.0f} 条/秒), 去重后 {len(table)} 频道")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""对比旧的整块 parse_m3u 与流式 iter_m3u 的峰值内存和首个频道延迟.
+
+用法: python benchmarks/bench_parse.py [--entries 80000]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from m3u_parser import iter_m3u
+
+
+# --- 旧实现 (作为基线原样保留) ---
+def legacy_parse_m3u(content):
+    channels = []
+    lines = content.splitlines()
+    current_channel_info = {}
+    extinf_pattern = re.compile(r'#EXTINF:(?P<duration>-?\d+)(?P<attributes>.*),\s*(?P<name>.*)')
+    attribute_pattern = re.compile(r'([a-zA-Z0-9_-]+)=("[^"]*"|\S+)')
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if line.startswith('#EXTINF:'):
+            current_channel_info = {'name': 'Unknown', 'url': None, 'group': 'Default', 'logo': None}
+            match = extinf_pattern.match(line)
+            if match:
+                info = match.groupdict()
+                base_name = info.get('name', 'Unknown').strip()
+                current_channel_info['name'] = base_name
+                attributes_str = info.get('attributes', '').strip()
+                if attributes_str:
+                    attributes = {}
+                    for key, value in attribute_pattern.findall(attributes_str):
+                        attributes[key.lower()] = value.strip('"')
+                    current_channel_info['name'] = attributes.get('tvg-name', base_name)
+                    current_channel_info['group'] = attributes.get('group-title', 'Default')
+                    current_channel_info['logo'] = attributes.get('tvg-logo')
+            if i + 1 < len(lines):
+                next_line = lines[i + 1].strip()
+                if next_line and not next_line.startswith('#'):
+                    current_channel_info['url'] = next_line
+                    if current_channel_info['url']:
+                        channels.append(current_channel_info.copy())
+                        current_channel_info = {}
+    return channels
+
+
+def write_playlist(path, entries):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('#EXTM3U\n')
+        for i in range(entries):
+            f.write(f'#EXTINF:-1 tvg-id="ch{i}" tvg-name="频道 {i}" tvg-logo="http://logo.example.com/{i}.png" '
+                    f'group-title="分组 {i % 40}",频道 {i}\n')
+            f.write(f'http://stream{i % 17}.example.com/live/{i}/index.m3u8\n')
+
+
+def run(label, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first, count = func(start)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<24} 频道 {count:>8}  首个频道 {first * 1000:9.2f} ms  总耗时 {total * 1000:9.1f} ms  峰值内存 {peak / 2**20:8.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--entries', type=int, default=80000)
+    args = parser.parse_args()
+    fd, path = tempfile.mkstemp(suffix='.m3u')
+    os.close(fd)
+    try:
+        write_playlist(path, args.entries)
+        print(f"播放列表: {args.entries} 条, {os.path.getsize(path) / 2**20:.1f} MiB")
+
+        def legacy(start):
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f: content = f.read()
+            channels = legacy_parse_m3u(content)
+            return time.perf_counter() - start, len(channels)
+
+        def streaming_collect(start):
+            channels, first = [], None
+            with open(path, 'rb') as f:
+                for channel in iter_m3u(f):
+                    if first is None: first = time.perf_counter() - start
+                    channels.append(channel)
+            return first, len(channels)
+
+        def streaming_consume(start):
+            count, first = 0, None
+            with open(path, 'rb') as f:
+                for _ in iter_m3u(f):
+                    if first is None: first = time.perf_counter() - start
+                    count += 1
+            return first, count
+
+        run("legacy parse_m3u", legacy)
+        run("iter_m3u (保留全部)", streaming_collect)
+        run("iter_m3u (逐个消费)", streaming_consume)
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""命令行工具的启动耗时: 新进程里导入模块并处理一个很小的列表, 同时确认没有导入 Qt / VLC / requests.
+
+用法: python benchmarks/bench_startup.py [--runs 10]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('PyQt5', 'vlc', 'requests')
+CHECK = ("import sys, m3u_tool; m3u_tool.main([sys.argv[1], '--dedupe', '-o', sys.argv[2]]); "
+         f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))")
+
+
+def best_of(runs, command):
+    best = float('inf')
+    output = ''
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        best = min(best, time.perf_counter() - start)
+    return best, output.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        playlist = os.path.join(tmp, 'small.m3u')
+        with open(playlist, 'w', encoding='utf-8') as f:
+            f.write('#EXTM3U\n' + ''.join(f'#EXTINF:-1 group-title="g",频道 {i}\nhttp://h/{i}\n' for i in range(100)))
+        baseline, _ = best_of(args.runs, [sys.executable, '-c', 'pass'])
+        elapsed, loaded = best_of(args.runs, [sys.executable, '-c', CHECK, playlist, os.path.join(tmp, 'out.m3u')])
+        gui, _ = best_of(min(args.runs, 3), [sys.executable, '-c', 'import PyQt5.QtWidgets, vlc, requests'])
+    print(f"空解释器          {baseline * 1000:7.1f} ms")
+    print(f"m3u_tool 处理     {elapsed * 1000:7.1f} ms  (额外 {(elapsed - baseline) * 1000:.1f} ms)")
+    print(f"导入 Qt+VLC+requests {gui * 1000:5.1f} ms  (作为对比)")
+    print(f"已导入的重量级模块: {loaded or '无'}")
+    return 1 if loaded else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
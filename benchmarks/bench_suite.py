@@ -0,0 +1,432 @@
+"""基准测试套件: 解析吞吐/峰值内存, 列表填充耗时 (offscreen Qt), 换台往返耗时 (VLC dummy 输出 + 本地文件),
+启动时读到可以播放上次频道 / 列表可用的耗时 (warm_start: 重新解析 vs 播放列表缓存 vs 会话快照),
+本地播放器 (jianyi.py) 播放时 GUI 线程的 CPU 占用 (progress), 队列相邻两项的切换耗时 (gapless).
+结果写成 JSON, 用 --compare 与另一次提交的结果对比.
+
+用法:
+    python benchmarks/bench_suite.py [--sizes 1000,10000,100000,1000000] [--sections parse,warm_start,populate,play,progress,gapless]
+                                     [--media a.ts b.mp4] [--plays 5] [--progress-seconds 4]
+                                     [-o results.json] [--compare old.json]
+没有给 --media 时, 若系统有 ffmpeg 则自动生成几段测试视频, 否则跳过 play / progress / gapless 部分.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+import shutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from m3u_parser import iter_m3u, parse_m3u
+from channel_table import ChannelTable
+from playlist_cache import PlaylistCache
+from session_state import SessionStore
+
+GROUPS = ['央视', '卫视', '地方', '体育', '电影', '少儿', '新闻', 'Music', 'Sports HD', 'Documentary']
+MALFORMED_RATE = 0.02
+
+
+# --- 合成播放列表 ---
+def write_playlist(path, entries, seed=1):
+    """写入 entries 个频道, 其中约 2% 的位置插入各种格式错误的行; 返回预期能解析出的频道数"""
+    rng = random.Random(seed)
+    expected = 0
+    with open(path, 'wb') as f:
+        f.write('\ufeff#EXTM3U x-tvg-url="http://epg.example.com/e.xml.gz"\n'.encode('utf-8'))
+        for i in range(entries):
+            group = GROUPS[i % len(GROUPS)]
+            host = f"cdn{i % 23}.example.com"
+            extinf = (f'#EXTINF:-1 tvg-id="ch{i}.cn" tvg-name="频道{i}" tvg-logo="http://logo.example.com/{i % 5000}.png" '
+                      f'group-title="{group}" catchup="default",{group} 频道 {i} HD\n')
+            url = f'http://{host}/live/{i}/index.m3u8?token={rng.getrandbits(32):08x}\n'
+            if rng.random() >= MALFORMED_RATE:
+                f.write((extinf + url).encode('utf-8'))
+                expected += 1
+                continue
+            kind = rng.randrange(7)
+            if kind == 0:       # 没有逗号, 名称取不到
+                f.write(f'#EXTINF:-1 tvg-id="ch{i}" group-title="{group}"\n{url}'.encode('utf-8'))
+                expected += 1
+            elif kind == 1:     # 没有 #EXTINF 的孤立 URL
+                f.write(url.encode('utf-8'))
+            elif kind == 2:     # #EXTINF 后面缺 URL
+                f.write(extinf.encode('utf-8'))
+            elif kind == 3:     # 非法 UTF-8 字节
+                f.write(extinf.encode('utf-8').replace(b'HD', b'\xff\xfeHD') + url.encode('utf-8'))
+                expected += 1
+            elif kind == 4:     # 引号没闭合 + CRLF
+                f.write((extinf.replace('.png"', '.png') + url).replace('\n', '\r\n').encode('utf-8'))
+                expected += 1
+            elif kind == 5:     # 中间夹着 #EXTVLCOPT 和空行
+                f.write((extinf + '#EXTVLCOPT:http-user-agent=Mozilla/5.0\n\n' + url).encode('utf-8'))
+                expected += 1
+            else:               # 无关的注释和空白
+                f.write(b'#EXTGRP:misc\n   \n\t\n')
+    return expected
+
+
+# --- 解析 ---
+def bench_parse(path, expected):
+    size = os.path.getsize(path)
+    results = {}
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        table = ChannelTable()
+        table.extend(iter_m3u(f))
+    elapsed = time.perf_counter() - start
+    results['iter_m3u_table'] = {'seconds': elapsed, 'channels': len(table), 'expected': expected,
+                                 'entries_per_s': len(table) / elapsed, 'mib_per_s': size / 2**20 / elapsed}
+    del table
+    tracemalloc.start()
+    with open(path, 'rb') as f:
+        table = ChannelTable()
+        table.extend(iter_m3u(f))
+    results['iter_m3u_table']['peak_mib'] = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    del table
+
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f: content = f.read()
+    start = time.perf_counter()
+    channels = parse_m3u(content)
+    elapsed = time.perf_counter() - start
+    results['parse_m3u'] = {'seconds': elapsed, 'channels': len(channels), 'entries_per_s': len(channels) / elapsed,
+                            'mib_per_s': size / 2**20 / elapsed}
+    del channels
+    tracemalloc.start()
+    parse_m3u(content)
+    results['parse_m3u']['peak_mib'] = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return results
+
+
+# --- 启动 (不含导入 Qt / libvlc 和打开媒体; 程序里实际的启动到首帧耗时会打印为 "启动到首帧") ---
+def best_of(runs, func):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_warm_start(directory, path, runs=3):
+    def parse():
+        table = ChannelTable()
+        with open(path, 'rb') as f: table.extend(iter_m3u(f))
+        return table
+    table = parse()
+    url = 'http://example.com/list.m3u'
+    cache = PlaylistCache(os.path.join(directory, 'cache'))
+    body = cache.body_writer(url)
+    with body, open(path, 'rb') as f: body.write(f.read())
+    cache.store(url, table, body)
+    store = SessionStore(os.path.join(directory, 'session.bin'))
+    row = len(table) // 2
+    store.save({'sources': [url], 'volume': 70, 'scroll_row': row, 'channel': dict(table.channel(row), row=row)}, table)
+    return {'reparse_s': best_of(runs, parse), 'playlist_cache_s': best_of(runs, lambda: cache.load_table(url)),
+            'snapshot_state_s': best_of(runs, store.load), 'snapshot_table_s': best_of(runs, store.load_table),
+            'snapshot_bytes': os.path.getsize(store.path)}
+
+
+# --- Qt 部分 (offscreen, VLC 使用 dummy 输出) ---
+def isolate_user_dirs(directory):
+    """缓存 / 配置目录指到 directory 下: 窗口关闭时保存的会话快照、播放列表缓存、节目单库、台标和自适应缓存
+    都写在这里, 不覆盖用户自己的数据. 要在创建窗口之前调用"""
+    for name, sub in (('XDG_CACHE_HOME', 'cache'), ('XDG_CONFIG_HOME', 'config')):
+        os.environ[name] = os.path.join(directory, sub)
+
+
+def use_dummy_output():
+    """之后创建的 vlc.Instance 都用 dummy 音视频输出"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    import vlc
+    if getattr(vlc.Instance, 'dummy_output', False): return
+    original = vlc.Instance
+
+    def dummy_instance(*args):
+        options = list(args[0]) if len(args) == 1 and not isinstance(args[0], str) else list(args)
+        return original(options + ['--vout=dummy', '--aout=dummy'])
+    dummy_instance([]).release()    # 没有 libvlc 时在这里抛出, 而不是在窗口里弹出模态对话框
+    dummy_instance.dummy_output = True
+    vlc.Instance = dummy_instance
+
+
+def make_window(directory):
+    isolate_user_dirs(directory)
+    use_dummy_output()
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    import Version
+    window = Version.M3UPlayerWindow()
+    window.channel_model.logos = None       # 合成列表里的台标/节目单地址都不存在, 不去下载
+    window._update_epg = lambda: None
+    window.show()
+    return app, window
+
+
+def make_local_player(directory):
+    """本地播放器 (jianyi.py) 的窗口, 媒体库和缩略图缓存同样放在 directory 下"""
+    isolate_user_dirs(directory)
+    use_dummy_output()
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    import jianyi
+    player = jianyi.MediaPlayer()
+    player.show()
+    return app, player
+
+
+def run_for(app, seconds):
+    from PyQt5.QtCore import QTimer
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+
+
+def wait_until(app, condition, timeout):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline: return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+
+def bench_populate(app, window, path, timeout=600):
+    """_populate_channel_list 本身 + 从开始加载到首屏可见 / 全部加载完成的耗时"""
+    model = window.channel_model
+    start = time.perf_counter()
+    window._populate_channel_list()
+    populate = time.perf_counter() - start
+    window.playlist_cache = None    # 本地文件不走缓存, 测的是真实解析 + 填充
+    start = time.perf_counter()
+    window._start_loading(path)
+    first_rows = time.perf_counter() - start if wait_until(app, lambda: len(model.table) > 0, timeout) else None
+    done = wait_until(app, lambda: not window.playlist_loaders, timeout)
+    total = time.perf_counter() - start
+    return {'populate_call_s': populate, 'first_rows_s': first_rows, 'loaded_s': total if done else None,
+            'rows': model.rowCount()}
+
+
+def bench_play(app, window, media, rounds, timeout=15):
+    """本地文件: 从 _play_selected_channel 到首帧 (ChannelZapper.latency_measured) 的往返耗时"""
+    fd, playlist = tempfile.mkstemp(suffix='.m3u')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write('#EXTM3U\n' + ''.join(f'#EXTINF:-1,本地 {i}\n{os.path.abspath(p)}\n' for i, p in enumerate(media)))
+    try:
+        window._start_loading(playlist)
+        wait_until(app, lambda: not window.playlist_loaders, timeout)
+        measured = []
+        window.zapper.latency_measured.connect(lambda url, ms, warm: measured.append(ms))
+        samples, failures = [], 0
+        for n in range(rounds * len(media)):
+            before = len(measured)
+            window._play_selected_channel(window.channel_model.index(n % len(media)))
+            if wait_until(app, lambda: len(measured) > before, timeout): samples.append(measured[-1])
+            else: failures += 1
+        window._stop_playback()
+    finally:
+        os.remove(playlist)
+    samples.sort()
+    return {'samples_ms': samples, 'failures': failures,
+            'median_ms': samples[len(samples) // 2] if samples else None,
+            'p90_ms': samples[int(len(samples) * 0.9)] if samples else None}
+
+
+def legacy_update(player):
+    """改动前的 update_ui: 每 100 ms 无条件读取时长、设置范围和位置、格式化标签"""
+    if player.mediaplayer.is_playing():
+        length = player.mediaplayer.get_length()
+        position = player.mediaplayer.get_time()
+        player.time_slider.setRange(0, length)
+        player.time_slider.setValue(position)
+        player.time_label.setText(player.format_time(position) + " / " + player.format_time(length))
+
+
+def measure_gui_cpu(app, player, seconds):
+    """播放 seconds 秒, 返回主线程 CPU 毫秒数和标签刷新次数; 事件循环空闲时阻塞, 不占 CPU.
+    只统计主线程 (time.thread_time), 解码线程的开销两种方式相同, 不计入"""
+    updates = [0]
+    player.time_label.setText = lambda text, original=player.time_label.setText: (updates.__setitem__(0, updates[0] + 1), original(text))
+    player.play()
+    run_for(app, 1)     # 跳过启动阶段
+    updates[0] = 0
+    start_cpu = time.thread_time()
+    run_for(app, seconds)
+    cpu = time.thread_time() - start_cpu
+    player.stop()
+    del player.time_label.setText
+    return {'gui_cpu_ms': cpu * 1000, 'cpu_percent': cpu / seconds * 100, 'label_updates': updates[0]}
+
+
+def bench_progress(app, player, media, seconds):
+    """播放进度: 原来的 100 ms 定时轮询 vs 事件驱动 (VlcEventBridge.time_changed); 片段应长于 seconds + 1 秒"""
+    from PyQt5.QtCore import QTimer
+    player.media = player.instance.media_new(media)
+    player.mediaplayer.set_media(player.media)
+    player.preview.open(media)
+    player.events.time_changed.disconnect(player.on_time_changed)
+    poll = QTimer()
+    poll.setInterval(100)
+    poll.timeout.connect(lambda: legacy_update(player))
+    poll.start()
+    polling = measure_gui_cpu(app, player, seconds)
+    poll.stop()
+    player.events.time_changed.connect(player.on_time_changed)
+    events = measure_gui_cpu(app, player, seconds)
+    return {'polling_100ms': polling, 'events': events}
+
+
+def play_queue(app, player, media, gapless, timeout=60):
+    """按顺序播放 media, 返回每次切换的 (毫秒数, 是否命中预加载)"""
+    from PyQt5.QtCore import QTimer
+    measured = []
+
+    def on_transition(ms, preloaded):
+        measured.append((ms, preloaded))
+        if len(measured) >= len(media) - 1: app.quit()
+    player.transition_measured.connect(on_transition)
+    player.gapless = gapless
+    player.play_files(media)
+    QTimer.singleShot(timeout * 1000, app.quit)
+    app.exec_()
+    player.transition_measured.disconnect(on_transition)
+    player.stop()
+    return measured
+
+
+def bench_gapless(app, player, media):
+    """从上一项 EndReached 到下一项进入 Playing: 预加载 (后台播放器停在第一帧) vs 结束后再打开下一项"""
+    results = {}
+    for name, gapless in (('preloaded', True), ('cold', False)):
+        measured = play_queue(app, player, media, gapless)
+        samples = sorted(ms for ms, _ in measured)
+        results[name] = {'samples_ms': samples, 'preloaded': sum(1 for _, hit in measured if hit),
+                         'median_ms': samples[len(samples) // 2] if samples else None,
+                         'max_ms': samples[-1] if samples else None}
+    return results
+
+
+def generate_media(directory, count=3, duration=5):
+    if not shutil.which('ffmpeg'): return []
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f'test{i}.ts')
+        subprocess.run(['ffmpeg', '-loglevel', 'error', '-y', '-f', 'lavfi', '-i', f'testsrc=duration={duration}:size=640x360:rate=25',
+                        '-f', 'lavfi', '-i', f'sine=frequency={440 + i * 110}:duration={duration}', '-shortest', path], check=True)
+        paths.append(path)
+    return paths
+
+
+# --- 结果对比 ---
+def flatten(data, prefix=''):
+    items = {}
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict): items.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool): items[name] = value
+    return items
+
+
+def compare(old, new):
+    old_items, new_items = flatten(old['results']), flatten(new['results'])
+    print(f"\n对比 {old.get('commit', '?')[:10]} -> {new.get('commit', '?')[:10]}")
+    for name in sorted(new_items.keys() & old_items.keys()):
+        before, after = old_items[name], new_items[name]
+        if not before: continue
+        change = (after - before) / before * 100
+        flag = '  <--' if abs(change) >= 10 else ''
+        print(f"{name:<60}{before:>14.4g}{after:>14.4g}{change:>+9.1f}%{flag}")
+
+
+def git_commit():
+    try: return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError: return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000')
+    parser.add_argument('--sections', default='parse,warm_start,populate,play,progress,gapless')
+    parser.add_argument('--media', nargs='*', default=[])
+    parser.add_argument('--plays', type=int, default=5, help="每个本地文件播放的轮数")
+    parser.add_argument('--progress-seconds', type=float, default=4, help="progress 部分每种方式测量的秒数")
+    parser.add_argument('-o', '--output', default='bench_results.json')
+    parser.add_argument('--compare', help="上一次的结果 JSON")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(',')]
+    sections = set(args.sections.split(','))
+    report = {'commit': git_commit(), 'time': time.time(), 'python': sys.version.split()[0],
+              'platform': platform.platform(), 'results': {}}
+    results = report['results']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        playlists = {}
+        for size in sizes:
+            path = os.path.join(tmp, f'{size}.m3u')
+            start = time.perf_counter()
+            playlists[size] = (path, write_playlist(path, size))
+            print(f"生成 {size} 条: {os.path.getsize(path) / 2**20:.1f} MiB ({time.perf_counter() - start:.1f} s)", file=sys.stderr)
+
+        if 'parse' in sections:
+            for size, (path, expected) in playlists.items():
+                results.setdefault('parse', {})[str(size)] = bench_parse(path, expected)
+                print(f"parse {size}: {json.dumps(results['parse'][str(size)], ensure_ascii=False)}", file=sys.stderr)
+
+        if 'warm_start' in sections:
+            for size, (path, _) in playlists.items():
+                directory = os.path.join(tmp, f'warm{size}')
+                os.makedirs(directory)
+                results.setdefault('warm_start', {})[str(size)] = bench_warm_start(directory, path)
+                print(f"warm_start {size}: {results['warm_start'][str(size)]}", file=sys.stderr)
+
+        if sections & {'populate', 'play'}:
+            try: app, window = make_window(tmp)
+            except Exception as e:      # 没有 libvlc / Qt 时记录原因, 其它部分照常输出
+                results['qt_skipped'] = f"{type(e).__name__}: {e}"
+                app = window = None
+            if window is not None:
+                if 'populate' in sections:
+                    for size, (path, _) in playlists.items():
+                        results.setdefault('populate', {})[str(size)] = bench_populate(app, window, path)
+                        print(f"populate {size}: {results['populate'][str(size)]}", file=sys.stderr)
+                if 'play' in sections:
+                    media = args.media or generate_media(tmp)
+                    if media: results['play'] = bench_play(app, window, media, args.plays)
+                    else: results['play'] = {'skipped': "没有 --media 且找不到 ffmpeg"}
+                    print(f"play: {results['play']}", file=sys.stderr)
+                window.close()
+
+        if sections & {'progress', 'gapless'}:
+            try: app, player = make_local_player(tmp)
+            except Exception as e:
+                results['local_skipped'] = f"{type(e).__name__}: {e}"
+                player = None
+            if player is not None:
+                if 'progress' in sections:
+                    media = args.media[:1] or generate_media(os.path.join(tmp, 'long'), 1, int(args.progress_seconds) + 3)
+                    if media: results['progress'] = bench_progress(app, player, media[0], args.progress_seconds)
+                    else: results['progress'] = {'skipped': "没有 --media 且找不到 ffmpeg"}
+                    print(f"progress: {results['progress']}", file=sys.stderr)
+                if 'gapless' in sections:
+                    media = args.media or generate_media(os.path.join(tmp, 'queue'), 4)
+                    if len(media) >= 2: results['gapless'] = bench_gapless(app, player, media)
+                    else: results['gapless'] = {'skipped': "至少需要两个文件 (--media 或 ffmpeg)"}
+                    print(f"gapless: {results['gapless']}", file=sys.stderr)
+                player.preview.close()
+                player.close()
+
+    with open(args.output, 'w', encoding='utf-8') as f: json.dump(report, f, ensure_ascii=False, indent=1)
+    print(f"结果已写入 {args.output}", file=sys.stderr)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f: compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""故障切换的自动检查: 用 stall_server 的两路 HLS 流驱动 PlaybackWatchdog, 确认卡住的一路在时间预算内被检测到,
+并切换到同一频道的备用地址且恢复播放; 再确认开始看护时已经在播放的播放器 (预热换台) 不会被误判为打开超时.
+不需要 libvlc: 用一个按 HLS 清单真实下载分片的假播放器代替,
+播放时间只能走到已下载的分片为止, 分片下载挂起时播放时间就停住.
+
+用法: python benchmarks/check_failover.py [--stall-timeout 2] [--budget 15]
+成功时退出码为 0, 否则为 1.
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+from urllib.request import urlopen
+from http.server import ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import vlc
+from PyQt5.QtCore import QCoreApplication, QObject, QTimer, pyqtSignal
+from playback_watchdog import PlaybackWatchdog
+from stall_server import StallHandler, TARGET_DURATION
+
+
+class QuietHandler(StallHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+# --- 假播放器: 后台线程轮询清单并顺序下载分片, get_time() 不超过已下载的时长 ---
+class HlsStubPlayer(QObject):
+    state_changed = pyqtSignal(object, object)     # 播放器, vlc.State (工作线程 -> GUI 线程)
+
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+        self.buffered_ms = 0
+        self.started = None
+        self._stopped = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def get_state(self):
+        return vlc.State.Opening if self.started is None else vlc.State.Playing
+
+    def get_time(self):
+        if self.started is None: return 0
+        return int(min((time.monotonic() - self.started) * 1000, self.buffered_ms))
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        base = self.url.rsplit('/', 1)[0]
+        done = set()
+        self.state_changed.emit(self, vlc.State.Opening)
+        while not self._stopped.is_set():
+            try:
+                with urlopen(self.url, timeout=5) as response: lines = response.read().decode('ascii').splitlines()
+                for name in [line for line in lines if line.endswith('.ts') and line not in done]:
+                    with urlopen(f"{base}/{name}", timeout=60) as response: response.read()   # 卡住的分片挂在这里
+                    if self._stopped.is_set(): return
+                    done.add(name)
+                    self.buffered_ms += TARGET_DURATION * 1000
+                    if self.started is None:
+                        self.started = time.monotonic()
+                        self.state_changed.emit(self, vlc.State.Playing)
+            except OSError:
+                pass
+            self._stopped.wait(0.5)
+
+
+def check_stall(app, args, stall_url, ok_url):
+    """卡住的一路应在预算内切换到备用地址并恢复"""
+    watchdog = PlaybackWatchdog(stall_timeout=args.stall_timeout, open_timeout=args.stall_timeout * 2,
+                                budget=args.budget, interval=200)
+    result = {'failover': [], 'recovered': None, 'gave_up': None}
+    players = []
+
+    def start(url):
+        player = HlsStubPlayer(url)
+        player.state_changed.connect(watchdog.on_state)
+        players.append(player)
+        return player
+
+    def on_failover(url, reason):
+        result['failover'].append((url, reason))
+        players[-1].stop()
+        watchdog.follow(start(url), url)
+
+    def finish(key, value):
+        result[key] = value
+        app.quit()
+    watchdog.failover.connect(on_failover)
+    watchdog.recovered.connect(lambda url, ms: finish('recovered', (url, ms)))
+    watchdog.gave_up.connect(lambda reason: finish('gave_up', reason))
+    watchdog.watch(start(stall_url), stall_url, [stall_url, ok_url])
+    QTimer.singleShot(int((args.budget + 20) * 1000), app.quit)
+    app.exec_()
+    for player in players: player.stop()
+    watchdog.stop()
+
+    print(f"切换: {result['failover']}")
+    recovered = result['recovered']
+    if recovered is None:
+        print(f"失败: 没有恢复 ({result['gave_up'] or '超时'})")
+        return False
+    url, elapsed = recovered
+    if url != ok_url or elapsed > args.budget * 1000:
+        print(f"失败: 恢复到 {url}, 用时 {elapsed:.0f} ms (预算 {args.budget:.0f} s)")
+        return False
+    print(f"通过: 检测到卡顿后 {elapsed:.0f} ms 恢复到备用地址")
+    return True
+
+
+def check_warm(app, args, stall_url, ok_url):
+    """开始看护前就已进入 Playing 的播放器不会再收到状态事件, 看护超过打开超时也不应切换"""
+    watchdog = PlaybackWatchdog(stall_timeout=args.stall_timeout, open_timeout=args.stall_timeout * 2,
+                                budget=args.budget, interval=200)
+    result = {'failover': [], 'gave_up': None}
+    player = HlsStubPlayer(ok_url)
+    player.state_changed.connect(watchdog.on_state)
+
+    def on_state(_, state):
+        if state != vlc.State.Playing or watchdog.player is not None: return
+        watchdog.watch(player, ok_url, [ok_url, stall_url])
+        QTimer.singleShot(int(watchdog.open_timeout * 2 * 1000), app.quit)
+    player.state_changed.connect(on_state)
+    watchdog.failover.connect(lambda url, reason: (result['failover'].append((url, reason)), app.quit()))
+    watchdog.gave_up.connect(lambda reason: (result.update(gave_up=reason), app.quit()))
+    QTimer.singleShot(int((args.budget + 20) * 1000), app.quit)
+    app.exec_()
+    player.stop()
+    watched = watchdog.player is not None or result['failover'] or result['gave_up']
+    watchdog.stop()
+
+    if not watched:
+        print("失败: 预热的播放器没有进入播放")
+        return False
+    if result['failover'] or result['gave_up']:
+        print(f"失败: 正在播放的流被误判 ({result['failover'] or result['gave_up']})")
+        return False
+    print(f"通过: 已在播放的流看护 {watchdog.open_timeout * 2:.0f} 秒没有切换")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stall-timeout', type=float, default=2.0)
+    parser.add_argument('--budget', type=float, default=15.0)
+    args = parser.parse_args()
+    app = QCoreApplication.instance() or QCoreApplication([])
+    QuietHandler.segment = b'\x47' * 188 * 64
+    QuietHandler.stall_after = 1
+    QuietHandler.started = time.monotonic()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), QuietHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_port}"
+    stall_url, ok_url = f"{host}/stall/index.m3u8", f"{host}/ok/index.m3u8"
+
+    passed = check_stall(app, args, stall_url, ok_url)
+    passed = check_warm(app, args, stall_url, ok_url) and passed
+    QuietHandler.closing.set()
+    server.shutdown()
+    server.server_close()
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
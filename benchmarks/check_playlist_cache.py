@@ -0,0 +1,114 @@
+"""播放列表缓存的自动检查: 本地 HTTP 服务器按 ETag 返回 200 / 304, 用 PlaylistLoader 依次确认
+首次下载写入缓存 (200)、再次加载走条件请求命中缓存 (304)、同一 URL 的多个加载任务同时写缓存不出错、
+总大小超过上限时按最近使用淘汰. 不需要 libvlc.
+
+用法: python benchmarks/check_playlist_cache.py
+成功时退出码为 0, 否则为 1.
+"""
+import os
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from PyQt5.QtCore import QCoreApplication
+from playlist_cache import PlaylistCache
+from playlist_loader import PlaylistLoader
+
+CHANNELS = 2000
+
+
+class PlaylistHandler(BaseHTTPRequestHandler):
+    statuses = []       # (路径, 状态码), 按请求顺序
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        name = self.path.strip('/')
+        etag = f'"{name}-1"'
+        if self.headers.get('If-None-Match') == etag:
+            self.statuses.append((name, 304))
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        body = ['#EXTM3U']
+        for n in range(CHANNELS):
+            body.append(f'#EXTINF:-1 tvg-id="{name}.{n}" group-title="{name}",{name} 频道 {n}\nhttp://127.0.0.1/{name}/{n}.ts')
+        body = ('\n'.join(body) + '\n').encode('utf-8')
+        self.statuses.append((name, 200))
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/x-mpegurl; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def load(app, urls, cache):
+    """同时启动每个 URL 的加载任务, 全部结束后返回 [(频道数, 说明) 或 ('失败', 内容)]"""
+    results = [None] * len(urls)
+    loaders = []
+    for i, url in enumerate(urls):
+        loader = PlaylistLoader(url, cache)
+        loader.loaded.connect(lambda count, note, i=i: results.__setitem__(i, (count, note)))
+        loader.table_ready.connect(lambda table, i=i: results.__setitem__(i, (len(table), '')))
+        loader.failed.connect(lambda title, text, status, i=i: results.__setitem__(i, ('失败', text)))
+        loaders.append(loader)
+    for loader in loaders: loader.start()
+    for loader in loaders: loader.wait()
+    app.processEvents()
+    return results
+
+
+def main():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PlaylistHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_port}"
+    url_a, url_b, url_c = f"{host}/a", f"{host}/b", f"{host}/c"
+    statuses = PlaylistHandler.statuses
+    failures = []
+
+    def expect(ok, message):
+        print(f"{'通过' if ok else '失败'}: {message}")
+        if not ok: failures.append(message)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PlaylistCache(tmp)
+        result = load(app, [url_a], cache)[0]
+        expect(statuses[-1] == ('a', 200) and result == (CHANNELS, '') and cache.lookup(url_a) is not None,
+               f"首次加载下载并写入缓存 {statuses[-1]} {result}")
+        entry_size = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp))
+
+        result = load(app, [url_a], cache)[0]
+        expect(statuses[-1] == ('a', 304) and result and result[0] == CHANNELS and result[1] == '缓存未变化',
+               f"再次加载命中缓存 {statuses[-1]} {result}")
+
+        results = []
+        for _ in range(10): results += load(app, [url_a] * 4, cache)
+        errors = [r for r in results if not r or r[0] != CHANNELS]
+        expect(not errors, f"同一 URL 的 4 个加载任务同时写缓存, 40 次中出错 {len(errors)} 次 {errors[:1]}")
+
+        # 上限放得下两份: 加载 b 后再用一次 a, 加载 c 时最久未用的是 b
+        cache.max_bytes = int(entry_size * 2.5)
+        load(app, [url_b], cache)
+        load(app, [url_a], cache)
+        load(app, [url_c], cache)
+        kept = [url[-1] for url in (url_a, url_b, url_c) if cache.lookup(url) is not None]
+        expect(kept == ['a', 'c'], f"超出上限时淘汰最久未用的 b, 保留 {kept}")
+
+        leftovers = [name for name in os.listdir(tmp) if name.endswith(PlaylistCache.PART_SUFFIX)]
+        expect(not leftovers, f"没有遗留的临时文件 {leftovers[:3]}")
+
+    server.shutdown()
+    server.server_close()
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""播放统计的自动检查: 用假播放器驱动 PlaybackTelemetry, 确认冷启动时启动阶段的缓冲不算卡顿,
+而预热换台 (不会再有 Playing 事件, 只有首帧) 之后的缓冲会计入卡顿次数和时长. 不需要 libvlc.
+
+用法: python benchmarks/check_telemetry.py
+成功时退出码为 0, 否则为 1.
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import vlc
+from PyQt5.QtCore import QCoreApplication
+from playback_telemetry import PlaybackTelemetry
+
+
+class StubPlayer:
+    def get_media(self):
+        return None
+
+
+def rebuffer(telemetry, player, seconds=0.05):
+    telemetry.on_buffering(player, 20.0)
+    time.sleep(seconds)
+    telemetry.on_buffering(player, 100.0)
+
+
+def run_session(telemetry, warm):
+    """返回会话结束时的汇总"""
+    url = 'http://127.0.0.1/warm.m3u8' if warm else 'http://127.0.0.1/cold.m3u8'
+    player = StubPlayer()
+    ended = []
+    telemetry.session_ended.connect(ended.append)
+    telemetry.start_session(None, url, url)     # 和窗口一样: 先开始计时, 播放器确定后再关联
+    telemetry.player = player
+    if warm:
+        telemetry.on_first_frame(url, 12.0, True)
+    else:
+        telemetry.on_state(player, vlc.State.Opening)
+        rebuffer(telemetry, player)             # 启动阶段
+        telemetry.on_state(player, vlc.State.Playing)
+        telemetry.on_first_frame(url, 300.0, False)
+    rebuffer(telemetry, player)
+    rebuffer(telemetry, player)
+    telemetry.end_session('check')
+    telemetry.session_ended.disconnect(ended.append)
+    return ended[0]
+
+
+def main():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    telemetry = PlaybackTelemetry()
+    passed = True
+    for warm in (False, True):
+        label = '预热换台' if warm else '冷启动'
+        record = run_session(telemetry, warm)
+        if record['rebuffer_count'] != 2 or not record['rebuffer_ms'] or record['to_playing_ms'] is None:
+            print(f"失败: {label} 卡顿 {record['rebuffer_count']} 次 / {record['rebuffer_ms']} ms,"
+                  f" 到播放 {record['to_playing_ms']} ms (应为 2 次)")
+            passed = False
+        else:
+            print(f"通过: {label} 卡顿 {record['rebuffer_count']} 次 / {record['rebuffer_ms']:.0f} ms")
+    metrics = telemetry.prometheus_text()
+    if 'm3u_player_rebuffers_total 4' not in metrics:
+        print("失败: Prometheus 卡顿总数不是 4")
+        passed = False
+    telemetry.close()
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
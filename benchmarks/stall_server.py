@@ -0,0 +1,86 @@
+"""本地 HLS 测试服务器: 一路正常的直播流和一路会卡住的直播流, 用来验证播放器的故障切换.
+
+/ok/index.m3u8      滑动窗口的直播清单, 每个分片都返回 --segment 指定的 TS 文件
+/stall/index.m3u8   前 --stall-after 个分片正常, 之后清单不再前进, 新分片的请求一直挂起不返回
+/playlist.m3u       两路流使用相同 tvg-id 的播放列表 (卡住的一路在前)
+
+用法: python benchmarks/stall_server.py --segment sample.ts [--port 8089] [--stall-after 3]
+然后在播放器里加载 http://127.0.0.1:8089/playlist.m3u, 播放第一个频道, 观察看门狗切换与恢复耗时.
+"""
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+TARGET_DURATION = 2     # 每个分片按 2 秒计
+WINDOW = 3              # 清单里同时列出的分片数
+
+
+class StallHandler(BaseHTTPRequestHandler):
+    segment = b''
+    stall_after = 3
+    started = time.monotonic()
+    closing = threading.Event()
+
+    def log_message(self, format, *args):
+        print(f"{self.address_string()} {format % args}")
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _live_sequence(self, stream):
+        sequence = int((time.monotonic() - self.started) / TARGET_DURATION)
+        if stream == 'stall': sequence = min(sequence, self.stall_after)
+        return sequence
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        host = self.headers.get('Host', '127.0.0.1')
+        if parts == ['playlist.m3u']:
+            body = ('#EXTM3U\n'
+                    f'#EXTINF:-1 tvg-id="test.tv" group-title="测试",测试频道\nhttp://{host}/stall/index.m3u8\n'
+                    f'#EXTINF:-1 tvg-id="test.tv" group-title="测试",测试频道 (备用)\nhttp://{host}/ok/index.m3u8\n')
+            self._send(body.encode('utf-8'), 'audio/x-mpegurl; charset=utf-8')
+        elif len(parts) == 2 and parts[0] in ('ok', 'stall') and parts[1] == 'index.m3u8':
+            last = self._live_sequence(parts[0])
+            first = max(last - WINDOW + 1, 0)
+            lines = ['#EXTM3U', '#EXT-X-VERSION:3', f'#EXT-X-TARGETDURATION:{TARGET_DURATION}',
+                     f'#EXT-X-MEDIA-SEQUENCE:{first}']
+            for n in range(first, last + 1):
+                lines += [f'#EXTINF:{TARGET_DURATION}.0,', f'{n}.ts']
+            self._send(('\n'.join(lines) + '\n').encode('ascii'), 'application/vnd.apple.mpegurl')
+        elif len(parts) == 2 and parts[0] in ('ok', 'stall') and parts[1].endswith('.ts'):
+            if parts[0] == 'stall' and int(parts[1][:-3]) >= self.stall_after:
+                # 卡住: 不返回任何数据, 直到客户端断开或服务器退出
+                self.closing.wait()
+                return
+            self._send(self.segment, 'video/mp2t')
+        else:
+            self.send_error(404)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="提供一路正常、一路会卡住的本地 HLS 直播流")
+    parser.add_argument('--segment', required=True, help="作为每个分片返回的 MPEG-TS 文件 (约 2 秒)")
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--stall-after', type=int, default=3, help="卡住的一路在第几个分片之后停止")
+    args = parser.parse_args()
+    with open(args.segment, 'rb') as f: StallHandler.segment = f.read()
+    StallHandler.stall_after = args.stall_after
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), StallHandler)
+    server.daemon_threads = True
+    print(f"播放列表: http://127.0.0.1:{args.port}/playlist.m3u")
+    try: server.serve_forever()
+    except KeyboardInterrupt: pass
+    finally:
+        StallHandler.closing.set()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import threading
+import unicodedata
+from array import array
+
+GRAM_SIZES = (1, 2, 3)
+
+
+def normalize_name(text):
+    """NFKC + casefold, 只保留字母数字 (含中文), 忽略空格和标点"""
+    return ''.join(ch for ch in unicodedata.normalize('NFKC', text).casefold() if ch.isalnum())
+
+
+# --- 频道搜索索引: 分组 -> 行号, 名称 1~3 字 n-gram -> 行号 (不依赖 Qt) ---
+class ChannelIndex:
+    """倒排表里的行号都是升序追加的, 查询结果天然有序, 不需要排序也不需要扫描全表.
+    可以在后台线程里用 build() 增量建立, 查询时持锁读取已建好的部分."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.abandoned = False
+        self.size = 0
+        self.norm_names = []
+        self.group_ids = array('I')
+        self.group_rows = {}
+        self.postings = {}
+
+    def build(self, table, end, step=2000):
+        """把 table 中 [size, end) 行加入索引, 每 step 行释放一次锁"""
+        while self.size < end and not self.abandoned:
+            stop = min(self.size + step, end)
+            names = table.names[self.size:stop]
+            gids = table.group_ids[self.size:stop]
+            with self.lock:
+                postings = self.postings
+                group_rows = self.group_rows
+                for row, name, gid in zip(range(self.size, stop), names, gids):
+                    norm = normalize_name(name)
+                    self.norm_names.append(norm)
+                    self.group_ids.append(gid)
+                    rows = group_rows.get(gid)
+                    if rows is None: rows = group_rows[gid] = array('I')
+                    rows.append(row)
+                    length = len(norm)
+                    for gram in {norm[i:i + n] for n in GRAM_SIZES for i in range(length - n + 1)}:
+                        rows = postings.get(gram)
+                        if rows is None: rows = postings[gram] = array('I')
+                        rows.append(row)
+                self.size = stop
+
+    def search(self, text, group_id=None):
+        """返回匹配的行号 (升序); 没有任何条件时返回 None 表示全部"""
+        query = normalize_name(text)
+        with self.lock:
+            if not query:
+                if group_id is None: return None
+                return array('I', self.group_rows.get(group_id, ()))
+            if len(query) <= GRAM_SIZES[-1]:
+                candidates = self.postings.get(query, ())
+                verify = False
+            else:
+                # 取最短的 3-gram 倒排表作为候选, 再用子串确认
+                grams = {query[i:i + 3] for i in range(len(query) - 2)}
+                candidates = min((self.postings.get(g, ()) for g in grams), key=len)
+                verify = True
+            norm_names = self.norm_names
+            if group_id is not None:
+                group_rows = self.group_rows.get(group_id, ())
+                if len(group_rows) < len(candidates):
+                    return array('I', [r for r in group_rows if query in norm_names[r]])
+                gids = self.group_ids
+                return array('I', [r for r in candidates if gids[r] == group_id and (not verify or query in norm_names[r])])
+            if verify: return array('I', [r for r in candidates if query in norm_names[r]])
+            return array('I', candidates)
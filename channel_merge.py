@@ -0,0 +1,80 @@
+import threading
+from channel_index import normalize_name
+
+DEFAULT_PORTS = {'http': ':80', 'https': ':443', 'rtsp': ':554'}
+UNNAMED = ('', 'unknown', '未知频道')
+
+
+def normalize_url(url):
+    """协议和主机名转小写, 去掉默认端口和 #片段; 路径和查询参数区分大小写, 原样保留"""
+    url = url.strip()
+    scheme, sep, rest = url.partition('://')
+    if not sep: return url
+    scheme = scheme.lower()
+    host, slash, path = rest.partition('/')
+    host = host.lower()
+    port = DEFAULT_PORTS.get(scheme)
+    if port and host.endswith(port): host = host[:-len(port)]
+    path = path.partition('#')[0]
+    return f"{scheme}://{host}{slash}{path}"
+
+
+def identity_key(channel):
+    """同一频道的判定: 有 tvg-id 用 tvg-id, 否则用规范化后的名称; 无名频道不参与按名合并"""
+    tvg_id = (channel.get('tvg_id') or '').strip().casefold()
+    if tvg_id: return hash(('id', tvg_id))
+    name = normalize_name(channel.get('name') or '')
+    if name in UNNAMED: return None
+    return hash(('name', name))
+
+
+# --- 多个播放列表合并到一张频道表 (不依赖 Qt) ---
+class ChannelMerger:
+    """按到达顺序给新频道分配表行号; 重复的地址直接丢弃, 同一频道的新地址记为该行的备用地址.
+    只保存键的哈希值 (int -> 行号), 不另存字符串副本, 内存随频道数线性增长且与源的个数无关.
+    可以被多个加载线程共用: merge() 持锁分配行号并在锁内送出新频道, 保证界面追加顺序与行号一致."""
+
+    def __init__(self, table, keep_alternates=True):
+        self.table = table
+        self.keep_alternates = keep_alternates
+        self.lock = threading.Lock()
+        self.size = 0
+        self.duplicates = 0
+        self._url_rows = {}     # hash(规范化 URL) -> 行号
+        self._key_rows = {}     # hash(tvg-id 或名称) -> 行号
+        for row in range(len(table)):
+            self._remember(row, table.channel(row))
+
+    def _remember(self, row, channel):
+        self.size = max(self.size, row + 1)
+        for url in [channel['url']] + channel.get('alt_urls', []):
+            self._url_rows.setdefault(hash(normalize_url(url)), row)
+        key = identity_key(channel)
+        if key is not None: self._key_rows.setdefault(key, row)
+
+    def merge(self, channels, emit=None):
+        """返回 channels 中真正新增的频道 (需要追加到表尾); emit 不为空时在锁内以它们调用 emit"""
+        url_rows = self._url_rows
+        key_rows = self._key_rows
+        alt_urls = self.table.alt_urls
+        fresh = []
+        with self.lock:
+            for channel in channels:
+                url_key = hash(normalize_url(channel['url']))
+                if url_key in url_rows:
+                    self.duplicates += 1
+                    continue
+                key = identity_key(channel)
+                row = key_rows.get(key) if key is not None else None
+                if row is not None:
+                    url_rows[url_key] = row
+                    if self.keep_alternates: alt_urls.setdefault(row, []).append(channel['url'])
+                    self.duplicates += 1
+                    continue
+                row = self.size
+                self.size += 1
+                url_rows[url_key] = row
+                if key is not None: key_rows[key] = row
+                fresh.append(channel)
+            if fresh and emit is not None: emit(fresh)
+        return fresh
@@ -0,0 +1,252 @@
+import time
+import threading
+from datetime import datetime
+from bisect import bisect_left
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QThread, pyqtSignal
+from PyQt5.QtGui import QBrush
+from channel_table import ChannelTable
+from channel_index import ChannelIndex
+from stream_health import HealthChecker, STATUS_OK, STATUS_DEAD
+
+PLAYING_BRUSH = QBrush(Qt.lightGray)
+DEAD_BRUSH = QBrush(Qt.gray)
+HEALTH_TEXT = {STATUS_OK: "正常", STATUS_DEAD: "无法播放"}
+
+
+def programme_text(programme):
+    start, stop, title = programme
+    return f"{datetime.fromtimestamp(start):%H:%M}-{datetime.fromtimestamp(stop):%H:%M} {title or ''}"
+
+
+# --- 频道列表模型 (配合视图只渲染可见行) ---
+class ChannelListModel(QAbstractListModel):
+    """视图行号与表行号分开: rows 为 None 时一一对应, 否则 rows 是筛选/排序后的表行号.
+    rows 未排序时 (按延迟排序) 反查用字典, 否则二分."""
+    ChannelRole = Qt.UserRole
+
+    def __init__(self, table=None, parent=None):
+        super().__init__(parent)
+        self.table = table if table is not None else ChannelTable()
+        self.rows = None
+        self.rows_sorted = True
+        self._positions = None
+        self.health = {}            # 表行号 -> (状态, 延迟毫秒, 说明)
+        self.playing_row = -1
+        self.placeholder = None
+        self.epg = None             # EpgStore, 只为正在绘制的行查询当前/下一个节目
+        self.logos = None           # LogoCache, 同样只为正在绘制的行取台标
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid(): return 0
+        if self.rows is not None: return len(self.rows)
+        if not self.table and self.placeholder: return 1
+        return len(self.table)
+
+    def flags(self, index):
+        if not self.table: return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        table = self.table
+        if not table:
+            return self.placeholder if role == Qt.DisplayRole else None
+        row = index.row() if self.rows is None else self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            if self.epg is not None:
+                current = self.epg.now_next(table.tvg_ids[row], table.names[row])[0]
+                if current and current[2]: return f"{table.names[row]}  —  {current[2]}"
+            return table.names[row]
+        if role == Qt.ToolTipRole:
+            tooltip = f"分组: {table.group(row)}\nURL: {table.urls[row]}"
+            if self.epg is not None:
+                current, upcoming = self.epg.now_next(table.tvg_ids[row], table.names[row])
+                if current: tooltip += f"\n正在播出: {programme_text(current)}"
+                if upcoming: tooltip += f"\n下一个: {programme_text(upcoming)}"
+            health = self.health.get(row)
+            if health:
+                status, latency, detail = health
+                tooltip += f"\n状态: {HEALTH_TEXT.get(status, '未知')}"
+                if latency is not None: tooltip += f" {latency:.0f} ms"
+                if detail: tooltip += f" ({detail})"
+            return tooltip
+        if role == Qt.DecorationRole:
+            url = table.logos[row]
+            return self.logos.pixmap(url) if url and self.logos is not None else None
+        if role == Qt.BackgroundRole:
+            return PLAYING_BRUSH if row == self.playing_row else None
+        if role == Qt.ForegroundRole:
+            health = self.health.get(row)
+            return DEAD_BRUSH if health and health[0] == STATUS_DEAD else None
+        if role == self.ChannelRole:
+            return table.channel(row)
+        return None
+
+    def table_row(self, view_row):
+        return view_row if self.rows is None else self.rows[view_row]
+
+    def view_row(self, table_row):
+        """表行号 -> 视图行号, 当前筛选下不可见时返回 -1"""
+        if self.rows is None: return table_row if 0 <= table_row < len(self.table) else -1
+        if not self.rows_sorted:
+            if self._positions is None: self._positions = {r: i for i, r in enumerate(self.rows)}
+            return self._positions.get(table_row, -1)
+        i = bisect_left(self.rows, table_row)
+        return i if i < len(self.rows) and self.rows[i] == table_row else -1
+
+    def channel(self, row):
+        if 0 <= row < len(self.table): return self.table.channel(row)
+        return None
+
+    def clear(self, placeholder=None):
+        self.beginResetModel()
+        self.table = ChannelTable()
+        self.rows = None
+        self.health = {}
+        self.playing_row = -1
+        self.placeholder = placeholder
+        self.endResetModel()
+
+    def set_table(self, table):
+        """整表替换 (例如从缓存直接加载)"""
+        self.beginResetModel()
+        self.table = table
+        self.rows = None
+        self.health = {}
+        self.playing_row = -1
+        self.endResetModel()
+
+    def set_filter(self, rows, sort_by_latency=False):
+        """rows 为 None 时显示全部; 按延迟排序时未检测/不可用的排在最后"""
+        if sort_by_latency:
+            if rows is None: rows = range(len(self.table))
+            health = self.health
+            def latency_key(row):
+                status, latency, _ = health.get(row, (None, None, None))
+                return latency if status == STATUS_OK and latency is not None else float('inf')
+            rows = sorted(rows, key=latency_key)
+        self.beginResetModel()
+        self.rows = rows
+        self.rows_sorted = not sort_by_latency
+        self._positions = None
+        self.endResetModel()
+
+    def update_health(self, results):
+        """results: [(表行号, 状态, 延迟, 说明)], 只通知视图重绘"""
+        for row, status, latency, detail in results:
+            self.health[row] = (status, latency, detail)
+        if self.rowCount():
+            self.dataChanged.emit(self.index(0), self.index(self.rowCount() - 1), [Qt.ForegroundRole, Qt.ToolTipRole])
+
+    def refresh_epg(self):
+        """节目单更新或整点换节目后, 让视图重新取可见行的文字"""
+        if self.table and self.rowCount():
+            self.dataChanged.emit(self.index(0), self.index(self.rowCount() - 1), [Qt.DisplayRole, Qt.ToolTipRole])
+
+    def refresh_logos(self):
+        if self.table and self.rowCount():
+            self.dataChanged.emit(self.index(0), self.index(self.rowCount() - 1), [Qt.DecorationRole])
+
+    def set_placeholder(self, text):
+        """列表为空时显示一行提示文字"""
+        if self.table: return
+        self.beginResetModel()
+        self.placeholder = text
+        self.endResetModel()
+
+    def append_channels(self, channels):
+        if not channels: return
+        if self.rows is not None:
+            # 筛选中: 新行等索引建好后由重新筛选带出
+            self.table.extend(channels)
+            return
+        if not self.table and self.placeholder: self.set_placeholder(None)
+        first = len(self.table)
+        self.beginInsertRows(QModelIndex(), first, first + len(channels) - 1)
+        self.table.extend(channels)
+        self.endInsertRows()
+
+    def set_playing_row(self, row):
+        """正在播放的标记只是一个 (表) 行号, 只刷新新旧两行"""
+        old, self.playing_row = self.playing_row, row
+        for r in (old, row):
+            view_row = self.view_row(r)
+            if view_row >= 0:
+                index = self.index(view_row)
+                self.dataChanged.emit(index, index, [Qt.BackgroundRole])
+
+
+# --- 后台建立搜索索引, 随频道表增长增量追加 ---
+class IndexBuilder(QThread):
+    indexed = pyqtSignal(object)    # 已建好一部分的 ChannelIndex
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.index = ChannelIndex()
+        self._table = None
+        self._target = 0
+        self._stopped = False
+        self._cond = threading.Condition()
+
+    def reset(self, table):
+        """换表时换一个新索引, 旧索引上未完成的工作直接作废"""
+        with self._cond:
+            self.index.abandoned = True
+            self.index = ChannelIndex()
+            self._table = table
+            self._target = 0
+        return self.index
+
+    def extend(self, end):
+        with self._cond:
+            self._target = end
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self.index.abandoned = True
+            self._cond.notify()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and self.index.size >= self._target:
+                    self._cond.wait()
+                if self._stopped: return
+                index, table, target = self.index, self._table, self._target
+            index.build(table, target)
+            if not index.abandoned: self.indexed.emit(index)
+
+
+# --- 后台并发检测频道可用性 ---
+class HealthCheckWorker(QThread):
+    results = pyqtSignal(list)          # [(表行号, 状态, 延迟毫秒, 说明)]
+    progress = pyqtSignal(int, int)     # 已完成, 总数
+
+    BATCH_INTERVAL = 0.2    # 秒
+
+    def __init__(self, rows, urls, workers=64, per_host=4, timeout=8.0, parent=None):
+        super().__init__(parent)
+        self.rows = rows
+        self.urls = urls
+        self.checker = HealthChecker(workers, per_host, timeout)
+
+    def cancel(self):
+        self.checker.cancel()
+
+    def run(self):
+        batch = []
+        last_emit = time.monotonic()
+        try:
+            for done, (i, url, result) in enumerate(self.checker.check(self.urls), 1):
+                batch.append((self.rows[i], result['status'], result['latency_ms'], result['error']))
+                if time.monotonic() - last_emit >= self.BATCH_INTERVAL:
+                    self.results.emit(batch)
+                    self.progress.emit(done, len(self.urls))
+                    batch = []
+                    last_emit = time.monotonic()
+            if batch: self.results.emit(batch)
+            self.progress.emit(len(self.urls), len(self.urls))
+        finally:
+            self.checker.close()
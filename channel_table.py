@@ -0,0 +1,91 @@
+import sys
+import zlib
+import struct
+from array import array
+
+TABLE_MAGIC = b'CHT2'
+TABLE_HEADER = struct.Struct('<4sII6I')
+
+
+# --- 紧凑的列式频道表 (不依赖 Qt) ---
+class ChannelTable:
+    """按列存储频道: 每列一个 list, 分组名去重后只存编号.
+    比每个频道一个 dict 省内存, 行号即频道 id.
+    合并多个源时重复频道的其它地址放在稀疏的 alt_urls (行号 -> 备用地址列表) 里."""
+    __slots__ = ('names', 'urls', 'logos', 'tvg_ids', 'group_ids', 'group_names', '_group_lookup', 'alt_urls')
+
+    def __init__(self):
+        self.names = []
+        self.urls = []
+        self.logos = []
+        self.tvg_ids = []
+        self.group_ids = array('I')
+        self.group_names = []
+        self._group_lookup = {}
+        self.alt_urls = {}
+
+    def __len__(self):
+        return len(self.urls)
+
+    def clear(self):
+        self.__init__()
+
+    def group_id(self, group):
+        gid = self._group_lookup.get(group)
+        if gid is None:
+            gid = self._group_lookup[group] = len(self.group_names)
+            self.group_names.append(group)
+        return gid
+
+    def append(self, channel):
+        self.names.append(channel.get('name') or '未知频道')
+        self.urls.append(channel['url'])
+        self.logos.append(channel.get('logo'))
+        self.tvg_ids.append(channel.get('tvg_id'))
+        self.group_ids.append(self.group_id(channel.get('group') or 'Default'))
+
+    def extend(self, channels):
+        for channel in channels: self.append(channel)
+
+    def group(self, row):
+        return self.group_names[self.group_ids[row]]
+
+    def channel(self, row):
+        """按需生成与旧接口兼容的频道字典"""
+        return {'name': self.names[row], 'url': self.urls[row], 'group': self.group(row), 'logo': self.logos[row],
+                'tvg_id': self.tvg_ids[row], 'alt_urls': list(self.alt_urls.get(row, ()))}
+
+    def candidate_urls(self, row):
+        """主地址在前, 之后是合并进来的备用地址"""
+        return [self.urls[row]] + self.alt_urls.get(row, [])
+
+    # --- 紧凑二进制格式: 头部 + 分组编号数组 + 若干 zlib 压缩的 '\0' 分隔字符串列 ---
+    def to_bytes(self):
+        ids = array('I', self.group_ids)
+        if sys.byteorder != 'little': ids.byteswap()
+        blocks = [ids.tobytes()]
+        for column in (self.names, self.urls, self.logos, self.tvg_ids, self.group_names):
+            blocks.append(zlib.compress('\0'.join(v or '' for v in column).encode('utf-8'), 1))
+        header = TABLE_HEADER.pack(TABLE_MAGIC, len(self), len(self.group_names), *(len(b) for b in blocks))
+        return header + b''.join(blocks)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, rows, group_count, *sizes = TABLE_HEADER.unpack_from(data)
+        if magic != TABLE_MAGIC: raise ValueError("频道表格式不匹配")
+        offset = TABLE_HEADER.size
+        blocks = []
+        for size in sizes:
+            blocks.append(data[offset:offset + size])
+            offset += size
+        table = cls()
+        table.group_ids.frombytes(blocks[0])
+        if sys.byteorder != 'little': table.group_ids.byteswap()
+        columns = [zlib.decompress(b).decode('utf-8').split('\0') if rows else [] for b in blocks[1:5]]
+        table.names, table.urls, logos, tvg_ids = columns
+        table.logos = [v or None for v in logos]
+        table.tvg_ids = [v or None for v in tvg_ids]
+        table.group_names = zlib.decompress(blocks[5]).decode('utf-8').split('\0') if group_count else []
+        table._group_lookup = {g: i for i, g in enumerate(table.group_names)}
+        if not (len(table.names) == len(table.urls) == len(table.group_ids) == rows): raise ValueError("频道表数据损坏")
+        return table
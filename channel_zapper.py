@@ -0,0 +1,171 @@
+import time
+import platform
+from collections import OrderedDict
+import vlc
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QFrame
+
+
+def embed_player(player, frame):
+    """把 VLC 画面绑定到指定的 QFrame (每个播放器只需绑定一次)"""
+    try:
+        system = platform.system()
+        win_id = int(frame.winId())
+        if system == "Linux": player.set_xwindow(win_id)
+        elif system == "Windows": player.set_hwnd(win_id)
+        elif system == "Darwin": player.set_nsobject(win_id)
+        else: print(f"警告：不支持的平台 '{system}' 用于 VLC 嵌入。")
+    except Exception as e: print(f"嵌入 VLC 到窗口时出错: {e}")
+
+
+class _Slot:
+    __slots__ = ('player', 'frame', 'url', 'events')
+
+    def __init__(self, player, frame, events):
+        self.player = player
+        self.frame = frame
+        self.url = None
+        self.events = events    # 绑定首帧事件用的 EventManager, 解绑必须用同一个对象
+
+
+# --- 快速换台: 前台播放器 + 若干静音预热的后台播放器, 各自绑定在 QStackedWidget 的一页上 ---
+class ChannelZapper(QObject):
+    """换台时如果目标已经在某个后台播放器里缓冲好, 只切换堆叠页并取消静音;
+    否则在前台播放器上冷启动. 每次换台从点击到首帧 (MediaPlayerVout) 的耗时通过 latency_measured 报告."""
+    latency_measured = pyqtSignal(str, float, bool)   # url, 毫秒, 是否命中预热
+    player_created = pyqtSignal(object)               # 新建的后台播放器, 供窗口绑定事件
+    player_releasing = pyqtSignal(object)             # 后台播放器已停止、即将释放, 供窗口解绑事件 (直接连接)
+
+    MEDIA_CACHE_SIZE = 16
+
+    def __init__(self, instance, stack, player, frame, parent=None):
+        super().__init__(parent)
+        self.instance = instance
+        self.stack = stack
+        self.active = _Slot(player, frame, self._attach_latency_events(player))
+        self.pool = []
+        self.pool_size = 0
+        self.volume = 70
+        self.latency_hook = None    # 可选回调 (url, ms, warm), 例如写日志或统计
+        self._media_cache = OrderedDict()
+        self._pending = None        # (player, url, 点击时刻, 是否命中预热)
+
+    @property
+    def player(self):
+        return self.active.player
+
+    def set_pool_size(self, size):
+        """size 为 0 时关闭预热, 释放所有后台播放器"""
+        self.pool_size = size
+        while len(self.pool) > size: self._release_slot(self.pool.pop())
+        while len(self.pool) < size:
+            player = self.instance.media_player_new()
+            frame = QFrame()
+            frame.setStyleSheet("background-color: black;")
+            self.stack.addWidget(frame)
+            embed_player(player, frame)
+            player.audio_set_mute(True)
+            events = self._attach_latency_events(player)
+            self.player_created.emit(player)
+            self.pool.append(_Slot(player, frame, events))
+
+    def media_for(self, url, options=()):
+        """最近用过的 Media 对象复用, 不必每次 media_new + add_option; 参数变了 (例如自适应缓存) 则重新创建"""
+        key = (url, tuple(options))
+        media = self._media_cache.pop(key, None)
+        if media is None:
+            media = self.instance.media_new(url)
+            for option in options: media.add_option(option)
+        self._media_cache[key] = media
+        while len(self._media_cache) > self.MEDIA_CACHE_SIZE:
+            self._media_cache.popitem(last=False)[1].release()
+        return media
+
+    def play(self, url, options=()):
+        """切到 url, 返回是否命中预热的播放器"""
+        clicked = time.perf_counter()
+        warm_states = (vlc.State.Opening, vlc.State.Buffering, vlc.State.Playing)
+        warm = next((s for s in self.pool if s.url == url and s.player.get_state() in warm_states), None)
+        if warm is not None:
+            old = self.active
+            self.pool[self.pool.index(warm)] = old
+            self.active = warm
+            self.stack.setCurrentWidget(warm.frame)
+            warm.player.audio_set_volume(self.volume)
+            warm.player.audio_set_mute(False)
+            old.player.audio_set_mute(True)
+            if warm.player.get_state() == vlc.State.Playing:
+                self._report(url, clicked, True)
+            else:
+                self._pending = (warm.player, url, clicked, True)
+            return True
+        player = self.active.player
+        if player.get_state() != vlc.State.Stopped: player.stop()
+        player.set_media(self.media_for(url, options))
+        self.active.url = url
+        self._pending = (player, url, clicked, False)
+        if player.play() == -1:
+            self._pending = None
+            raise RuntimeError("VLC media_player.play() 返回 -1")
+        return False
+
+    def prewarm(self, urls, options_for=lambda url: ()):
+        """让后台播放器预先打开 urls (按优先级排序), 已经在预热的保持不动"""
+        wanted = [u for u in urls if u and u != self.active.url][:len(self.pool)]
+        idle = [s for s in self.pool if s.url not in wanted]
+        for url in wanted:
+            if any(s.url == url for s in self.pool) or not idle: continue
+            slot = idle.pop()
+            slot.player.stop()
+            slot.player.set_media(self.media_for(url, options_for(url)))
+            slot.player.audio_set_mute(True)
+            slot.url = url
+            slot.player.play()
+
+    def stop(self):
+        self._pending = None
+        for slot in [self.active] + self.pool:
+            if slot.player.get_state() != vlc.State.Stopped: slot.player.stop()
+            slot.url = None
+
+    def release(self):
+        """释放后台播放器; 前台播放器只解绑首帧事件, 由窗口释放"""
+        self.stop()
+        self.set_pool_size(0)
+        self._detach_latency_events(self.active)
+        for media in self._media_cache.values(): media.release()
+        self._media_cache.clear()
+
+    def _release_slot(self, slot):
+        slot.player.stop()
+        self._detach_latency_events(slot)
+        self.player_releasing.emit(slot.player)
+        slot.player.release()
+        self.stack.removeWidget(slot.frame)
+        slot.frame.deleteLater()
+
+    def _attach_latency_events(self, player):
+        manager = player.event_manager()
+        for event_type in (vlc.EventType.MediaPlayerVout, vlc.EventType.MediaPlayerPlaying):
+            manager.event_attach(event_type, self._on_first_frame, player)
+        return manager
+
+    def _detach_latency_events(self, slot):
+        if slot.events is None: return
+        for event_type in (vlc.EventType.MediaPlayerVout, vlc.EventType.MediaPlayerPlaying):
+            try: slot.events.event_detach(event_type)
+            except Exception as e: print(f"警告: 无法解绑 VLC 事件 {event_type}. 错误: {e}")
+        slot.events = None
+
+    def _on_first_frame(self, event, player):
+        # 运行在 libvlc 事件线程; 只记时间, 通过信号回到 GUI 线程
+        pending = self._pending
+        if pending is None or pending[0] is not player: return
+        if event.type == vlc.EventType.MediaPlayerPlaying and player.video_get_track_count() > 0: return
+        self._pending = None
+        self._report(*pending[1:])
+
+    def _report(self, url, clicked, warm):
+        elapsed = (time.perf_counter() - clicked) * 1000
+        if self.latency_hook: self.latency_hook(url, elapsed, warm)
+        self.latency_measured.emit(url, elapsed, warm)
@@ -0,0 +1,47 @@
+import time
+import requests
+from PyQt5.QtCore import QThread, pyqtSignal
+from epg_store import EpgStore, fetch_source, ingest
+
+
+# --- 后台更新节目单: 源没有变化 (304 / 文件未改) 时什么都不做 ---
+class EpgUpdater(QThread):
+    updated = pyqtSignal(int)           # 有源更新后送出, 写入的节目总数
+    failed = pyqtSignal(str, str)       # url, 错误说明
+
+    def __init__(self, urls, path, parent=None):
+        super().__init__(parent)
+        self.urls = urls
+        self.path = path
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        db = EpgStore.connect(self.path)
+        total = 0
+        changed = False
+        try:
+            for url in self.urls:
+                if self._cancelled: return
+                start = time.perf_counter()
+                try:
+                    stream, validators = fetch_source(db, url)
+                    if stream is None:
+                        print(f"节目单未变化: {url}")
+                        continue
+                    with stream: count = ingest(db, url, stream, validators, lambda: self._cancelled)
+                except InterruptedError:
+                    return
+                except (requests.exceptions.RequestException, OSError, SyntaxError, ValueError) as e:
+                    # ET.ParseError 是 SyntaxError 的子类
+                    print(f"节目单更新失败: {url} ({e})")
+                    self.failed.emit(url, str(e))
+                    continue
+                print(f"节目单已更新: {url}, {count} 个节目, 用时 {time.perf_counter() - start:.1f} s")
+                total += count
+                changed = True
+            if changed and not self._cancelled: self.updated.emit(total)
+        finally:
+            db.close()
@@ -0,0 +1,166 @@
+import io
+import os
+import gzip
+import time
+import sqlite3
+import calendar
+import xml.etree.ElementTree as ET
+import requests
+from m3u_parser import DEFAULT_USER_AGENT
+from channel_index import normalize_name
+from playlist_cache import default_cache_dir, PlaylistCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS source (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, signature TEXT, fetched REAL);
+CREATE TABLE IF NOT EXISTS channel (source TEXT, id TEXT, name TEXT);
+CREATE TABLE IF NOT EXISTS programme (source TEXT, channel TEXT, start INTEGER, stop INTEGER, title TEXT, desc TEXT);
+CREATE INDEX IF NOT EXISTS programme_channel_stop ON programme (channel, stop);
+CREATE INDEX IF NOT EXISTS programme_source ON programme (source);
+CREATE INDEX IF NOT EXISTS channel_source ON channel (source);
+"""
+INSERT_BATCH = 5000
+KEEP_PAST = 6 * 3600        # 入库时丢弃已经结束超过 6 小时的节目
+REFRESH_WITHOUT_VALIDATOR = 6 * 3600    # 服务器不给 ETag/Last-Modified 时, 至少间隔这么久才重新下载
+
+
+def parse_xmltv_time(text):
+    """'20240101120000 +0800' -> UTC 时间戳 (秒); 没有时区时按 UTC"""
+    text = text.strip()
+    d = text[:14].ljust(14, '0')
+    t = calendar.timegm((int(d[0:4]), int(d[4:6]), int(d[6:8]), int(d[8:10]), int(d[10:12]), int(d[12:14]), 0, 0, 0))
+    zone = text[14:].strip()
+    if len(zone) >= 5 and zone[0] in '+-':
+        offset = int(zone[1:3]) * 3600 + int(zone[3:5]) * 60
+        t += -offset if zone[0] == '+' else offset
+    return t
+
+
+def open_xmltv(stream):
+    """按开头的魔数判断是否 gzip, 返回可以交给 iterparse 的文件对象"""
+    stream = stream if isinstance(stream, io.BufferedReader) else io.BufferedReader(stream)
+    return gzip.GzipFile(fileobj=stream) if stream.peek(2)[:2] == b'\x1f\x8b' else stream
+
+
+def iter_xmltv(stream):
+    """流式解析 XMLTV: yield ('channel', id, 名称列表) 或 ('programme', 频道, 开始, 结束, 标题, 简介).
+    每处理完一个顶层元素就清空根节点, 内存占用与文件大小无关."""
+    context = ET.iterparse(open_xmltv(stream), events=('start', 'end'))
+    _, root = next(context)
+    for event, elem in context:
+        if event != 'end': continue
+        if elem.tag == 'programme':
+            try:
+                start = parse_xmltv_time(elem.get('start', ''))
+                stop = parse_xmltv_time(elem.get('stop')) if elem.get('stop') else start
+            except ValueError:
+                root.clear()
+                continue
+            yield ('programme', elem.get('channel'), start, stop, elem.findtext('title'), elem.findtext('desc'))
+            root.clear()
+        elif elem.tag == 'channel':
+            yield ('channel', elem.get('id'), [e.text for e in elem.iter('display-name') if e.text])
+            root.clear()
+
+
+# --- 节目单存储: SQLite (WAL), 按 (频道, 结束时间) 建索引 ---
+class EpgStore:
+    """GUI 线程用一个连接只读查询, 后台线程用 ingest() 另开连接按源整体替换 (单个事务, 读方看到的始终是完整快照).
+    now_next() 的结果缓存到当前节目结束, 绘制可见行时多数查询只是一次字典命中."""
+    MISS_TTL = 60   # 没有节目信息的频道, 隔多久再查一次库
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(default_cache_dir('epg'), 'epg.sqlite')
+        self.db = self.connect(self.path)
+        self._cache = {}
+        self._names = None
+
+    @staticmethod
+    def connect(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        db = sqlite3.connect(path)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.executescript(SCHEMA)
+        return db
+
+    def invalidate(self):
+        """后台更新完成后调用"""
+        self._cache.clear()
+        self._names = None
+
+    def close(self):
+        self.db.close()
+
+    def resolve(self, tvg_id, name):
+        """频道 -> XMLTV 频道 id: 优先 tvg-id, 其次按显示名称 (规范化后) 匹配"""
+        if self._names is None:
+            self._names = {}
+            for channel_id, display in self.db.execute('SELECT id, name FROM channel'):
+                self._names.setdefault(channel_id, channel_id)
+                self._names.setdefault(normalize_name(display), channel_id)
+        if tvg_id and tvg_id in self._names: return self._names[tvg_id]
+        return self._names.get(normalize_name(name or '')) or tvg_id
+
+    def now_next(self, tvg_id, name, now=None):
+        """返回 (当前节目, 下一个节目), 每项为 (开始, 结束, 标题) 或 None"""
+        now = time.time() if now is None else now
+        key = (tvg_id, name)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > now and cached[1] <= now: return cached[2]
+        channel_id = self.resolve(tvg_id, name)
+        rows = self.db.execute('SELECT start, stop, title FROM programme WHERE channel = ? AND stop > ? ORDER BY stop LIMIT 2',
+                               (channel_id, now)).fetchall() if channel_id else []
+        current = rows[0] if rows and rows[0][0] <= now else None
+        upcoming = [r for r in rows if r is not current]
+        result = (current, upcoming[0] if upcoming else None)
+        if current: expires = current[1]
+        elif upcoming: expires = upcoming[0][0]
+        else: expires = now + self.MISS_TTL
+        self._cache[key] = (expires, now, result)
+        return result
+
+
+def fetch_source(db, url, timeout=30):
+    """检查 url 是否有更新: 返回 (流, 校验信息), 没有变化时返回 (None, None)"""
+    row = db.execute('SELECT etag, last_modified, signature, fetched FROM source WHERE url = ?', (url,)).fetchone()
+    if not url.startswith(('http://', 'https://')):
+        st = os.stat(url)
+        signature = f"{st.st_mtime_ns}:{st.st_size}"
+        if row and row[2] == signature: return None, None
+        return open(url, 'rb'), {'signature': signature}
+    meta = {'etag': row[0], 'last_modified': row[1]} if row else None
+    if row and not row[0] and not row[1] and time.time() - (row[3] or 0) < REFRESH_WITHOUT_VALIDATOR: return None, None
+    headers = {'User-Agent': DEFAULT_USER_AGENT}
+    headers.update(PlaylistCache.conditional_headers(meta))
+    response = requests.get(url, timeout=timeout, headers=headers, stream=True)
+    if response.status_code == 304:
+        response.close()
+        return None, None
+    response.raise_for_status()
+    response.raw.decode_content = True     # 传输层的 Content-Encoding 由 urllib3 解开, 文件本身的 gzip 由 open_xmltv 处理
+    return response.raw, {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+
+
+def ingest(db, url, stream, validators, cancelled=lambda: False):
+    """把一个 XMLTV 源整体替换进库 (单个事务), 返回写入的节目数"""
+    keep_after = time.time() - KEEP_PAST
+    count = 0
+    with db:
+        db.execute('DELETE FROM programme WHERE source = ?', (url,))
+        db.execute('DELETE FROM channel WHERE source = ?', (url,))
+        channels, programmes = [], []
+        for record in iter_xmltv(stream):
+            if record[0] == 'channel':
+                channels.extend((url, record[1], name) for name in record[2] or [record[1]])
+            elif record[3] >= keep_after and record[1]:
+                programmes.append((url,) + record[1:])
+                if len(programmes) >= INSERT_BATCH:
+                    if cancelled(): raise InterruptedError()
+                    db.executemany('INSERT INTO programme VALUES (?, ?, ?, ?, ?, ?)', programmes)
+                    count += len(programmes)
+                    programmes = []
+        db.executemany('INSERT INTO programme VALUES (?, ?, ?, ?, ?, ?)', programmes)
+        db.executemany('INSERT INTO channel VALUES (?, ?, ?)', channels)
+        count += len(programmes)
+        db.execute('INSERT OR REPLACE INTO source VALUES (?, ?, ?, ?, ?)',
+                   (url, validators.get('etag'), validators.get('last_modified'), validators.get('signature'), time.time()))
+    return count
@@ -2,12 +2,24 @@ import sys
 import vlc
 from PyQt5.QtWidgets import (QApplication, QWidget, QPushButton, QVBoxLayout,
                              QHBoxLayout, QSlider, QLabel, QFileDialog, QFrame,
-                             QMessageBox)
-from PyQt5.QtCore import Qt, QTimer, QDir, pyqtSlot
-from PyQt5.QtGui import QIcon, QPalette, QColor
+                             QMessageBox, QStyle, QTableView, QHeaderView, QComboBox,
+                             QAbstractItemView, QStackedWidget)
+from PyQt5.QtCore import Qt, QDir, QPoint, pyqtSlot, pyqtSignal
+from PyQt5.QtGui import QIcon, QPalette, QColor, QPixmap
 import os
+import time
+from vlc_bridge import VlcEventBridge, STATE_EVENTS, TIME_EVENTS
+from seek_preview import SeekPreview
+from media_library import MediaLibrary, PlayQueue
+from library_model import LibraryModel, LibraryScanner
+from channel_zapper import embed_player
+
+PRELOAD_BEFORE_END = 10000  # 距结束这么多毫秒时在后台播放器里预先打开下一项
 
 class MediaPlayer(QWidget):
+    transition_measured = pyqtSignal(float, bool)   # 上一项结束到下一项开始播放的毫秒数, 是否命中预加载
+    _ended = pyqtSignal(object)                     # libvlc 事件线程 -> GUI 线程, 不经过事件合并的延迟
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("简易媒体播放器")
@@ -20,22 +32,53 @@ class MediaPlayer(QWidget):
 
         self.instance = vlc.Instance()
         self.media = None
+        # 两个播放器各绑定一个画面 (只绑定一次): 一个在前台播放, 另一个在后台预先打开队列里的下一项
         self.mediaplayer = self.instance.media_player_new()
+        self.standby = self.instance.media_player_new()
+        self.gapless = True
+        self._standby_path = None
+        self._next_media = None     # (路径, 已开始预解析的 Media)
+        self._ended_at = None
+        self._resumed_at = None
+        self._start_paused = False  # 当前 Media 是否是预加载时带了 :start-paused 的
 
         self.is_playing = False
+        self.path = None
+        self.length = 0
+        self._shown_seconds = None
         self.init_ui()
-        self.timer = QTimer(self)
-        self.timer.setInterval(100)
-        self.timer.timeout.connect(self.update_ui)
+        # 进度由 libvlc 的 TimeChanged/LengthChanged 事件驱动 (最多每 0.25 秒刷新一次), 不再定时轮询
+        self.events = VlcEventBridge(self, time_interval=0.25)
+        for player, frame in ((self.mediaplayer, self.video_frames[0]), (self.standby, self.video_frames[1])):
+            self.events.attach(player, STATE_EVENTS + TIME_EVENTS)
+            embed_player(player, frame)
+            manager = player.event_manager()
+            manager.event_attach(vlc.EventType.MediaPlayerEndReached, self._on_end_reached, player)
+            manager.event_attach(vlc.EventType.MediaPlayerPlaying, self._on_playing, player)
+        self._ended.connect(self.on_media_ended)
+        self.events.time_changed.connect(self.on_time_changed)
+        self.events.length_changed.connect(self.on_length_changed)
+        self.preview = SeekPreview(self)
+        self.preview.ready.connect(self.on_preview_ready)
+        self.events.state_changed.connect(self.on_state_changed)
+        self.queue = PlayQueue()
+        self.playlist = None        # 一次打开多个文件时的临时队列 (路径列表), 否则队列来自媒体库
+        self.scanner = None
 
     def init_ui(self):
-        # 视频显示区域
-        self.video_frame = QFrame()
-        self.video_frame.setStyleSheet("background-color: black;")
-        self.palette = self.video_frame.palette()
-        self.palette.setColor(QPalette.Window, QColor(0, 0, 0))
-        self.video_frame.setPalette(self.palette)
-        self.video_frame.setAutoFillBackground(True)
+        # 视频显示区域 (前台/后台播放器各一页)
+        self.video_stack = QStackedWidget()
+        self.video_frames = []
+        for _ in range(2):
+            frame = QFrame()
+            frame.setStyleSheet("background-color: black;")
+            self.palette = frame.palette()
+            self.palette.setColor(QPalette.Window, QColor(0, 0, 0))
+            frame.setPalette(self.palette)
+            frame.setAutoFillBackground(True)
+            self.video_stack.addWidget(frame)
+            self.video_frames.append(frame)
+        self.video_frame = self.video_frames[0]
 
         # 按钮
         self.open_button = QPushButton("打开文件")
@@ -54,6 +97,12 @@ class MediaPlayer(QWidget):
         self.time_slider = QSlider(Qt.Horizontal)
         self.time_slider.setRange(0, 0)
         self.time_slider.sliderReleased.connect(self.preview_play)  # 松开滑块时触发
+        self.time_slider.sliderMoved.connect(self.scrub)
+
+        # 拖动时在滑块上方显示的预览缩略图
+        self.preview_label = QLabel(self, Qt.ToolTip)
+        self.preview_label.setAlignment(Qt.AlignCenter)
+        self.preview_label.setStyleSheet("background-color: black; color: white;")
 
         # 标签
         self.time_label = QLabel("00:00 / 00:00")
@@ -71,7 +120,9 @@ class MediaPlayer(QWidget):
 
         # 顶部横条浅蓝色
         main_layout = QVBoxLayout()
-        main_layout.addWidget(self.video_frame, 4)
+        video_layout = QHBoxLayout()
+        video_layout.addWidget(self.video_stack, 3)
+        main_layout.addLayout(video_layout, 4)
 
         # 创建一个QWidget作为横条的背景
         toolbar_widget = QWidget()
@@ -86,7 +137,48 @@ class MediaPlayer(QWidget):
 
         self.setLayout(main_layout)
 
+        # 媒体库 (右侧, 默认隐藏; 第一次打开时才读索引)
+        self.library = None
+        self.library_button = QPushButton("媒体库")
+        self.library_button.setCheckable(True)
+        self.prev_button = QPushButton("上一个")
+        self.next_button = QPushButton("下一个")
+        for button in (self.library_button, self.prev_button, self.next_button):
+            button.setStyleSheet(button_style)
+            control_layout.addWidget(button)
+        self.library_panel = QWidget()
+        self.library_panel.setVisible(False)
+        library_layout = QVBoxLayout(self.library_panel)
+        library_layout.setContentsMargins(0, 0, 0, 0)
+        library_buttons = QHBoxLayout()
+        self.add_folder_button = QPushButton("添加目录")
+        self.rescan_button = QPushButton("重新扫描")
+        self.order_combo = QComboBox()
+        self.order_combo.addItems(["顺序播放", "随机播放"])
+        library_buttons.addWidget(self.add_folder_button)
+        library_buttons.addWidget(self.rescan_button)
+        library_buttons.addWidget(self.order_combo)
+        library_layout.addLayout(library_buttons)
+        self.library_view = QTableView()
+        self.library_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.library_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.library_view.verticalHeader().setVisible(False)
+        self.library_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)     # 固定行高, 不逐行测量
+        self.library_view.verticalHeader().setDefaultSectionSize(22)
+        self.library_view.horizontalHeader().setStretchLastSection(True)
+        library_layout.addWidget(self.library_view)
+        self.library_status = QLabel()
+        library_layout.addWidget(self.library_status)
+        video_layout.addWidget(self.library_panel, 2)
+
         # 信号
+        self.library_button.toggled.connect(self.toggle_library)
+        self.add_folder_button.clicked.connect(self.add_library_folder)
+        self.rescan_button.clicked.connect(self.rescan_library)
+        self.order_combo.currentIndexChanged.connect(lambda i: self.queue.set_shuffle(i == 1))
+        self.library_view.doubleClicked.connect(lambda index: self.play_library_row(index.row()))
+        self.prev_button.clicked.connect(lambda: self.play_next(-1))
+        self.next_button.clicked.connect(lambda: self.play_next(1))
         self.open_button.clicked.connect(self.open_file)
         self.play_button.clicked.connect(self.play)
         self.pause_button.clicked.connect(self.pause)
@@ -98,64 +190,249 @@ class MediaPlayer(QWidget):
             event.ignore()
         else:
             self.stop()
+            self.preview.close()
+            if self.scanner is not None:
+                self.scanner.cancel()
+                self.scanner.wait(3000)
+            if self.library is not None: self.library.close()
             event.accept()
 
     def open_file(self):
-        filename, _ = QFileDialog.getOpenFileName(self, "选择媒体文件", "",
-                                                  "媒体文件 (*.mp4 *.avi *.mp3 *.wav *.ogg)")
-        if filename != "":
-            try:
-                self.media = self.instance.media_new(filename)
-                self.mediaplayer.set_media(self.media)
-
-                # 设置视频输出窗口
-                if sys.platform.startswith('linux'):
-                    self.mediaplayer.set_xwindow(self.video_frame.winId())
-                elif sys.platform == "win32":
-                    self.mediaplayer.set_hwnd(self.video_frame.winId())
-                elif sys.platform == "darwin":
-                    self.mediaplayer.set_nsobject(int(self.video_frame.winId()))
-
-                self.play()
-            except Exception as e:
-                QMessageBox.critical(self, "错误", f"无法打开文件: {e}")
+        filenames, _ = QFileDialog.getOpenFileNames(self, "选择媒体文件", "",
+                                                    "媒体文件 (*.mp4 *.avi *.mp3 *.wav *.ogg)")
+        if filenames: self.play_files(filenames)
+
+    def play_files(self, filenames):
+        """选中的文件按顺序组成队列, 从第一个开始播放"""
+        self.playlist = list(filenames)
+        self.queue.reset(len(self.playlist))
+        self.queue.jump(0)
+        self.play_path(self.playlist[self.queue.current()])
+
+    def play_path(self, filename):
+        try:
+            self.media = self.instance.media_new(filename)
+            self.mediaplayer.set_media(self.media)
+            self.is_playing = False     # set_media 会停止当前播放
+            self._start_paused = False
+            self.path = filename
+            self.length = 0
+            self._shown_seconds = None
+            self.time_slider.setRange(0, 0)
+            self.preview.open(filename)
+            self.play()
+            self._prepare_next()
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"无法打开文件: {e}")
 
     def play(self):
         if self.media:
             if not self.is_playing:
+                if self._start_paused and self.mediaplayer.get_state() in (vlc.State.Stopped, vlc.State.Ended):
+                    # 预加载的 Media 带着 :start-paused, 停止后重新播放要换一个不带的
+                    self.media = self.instance.media_new(self.path)
+                    self.mediaplayer.set_media(self.media)
+                    self._start_paused = False
                 self.mediaplayer.play()
                 self.is_playing = True
                 self.play_button.setText("暂停")
-                self.timer.start()
             else:
                 self.mediaplayer.pause()
                 self.is_playing = False
                 self.play_button.setText("播放")
-                self.timer.stop()
 
     def pause(self):
         if self.media and self.is_playing:
             self.mediaplayer.pause()
             self.is_playing = False
             self.play_button.setText("播放")
-            self.timer.stop()
 
     def stop(self):
+        self._drop_standby()
         if self.media:
             self.mediaplayer.stop()
             self.is_playing = False
             self.play_button.setText("播放")
-            self.timer.stop()
             self.time_slider.setValue(0)
-            self.time_label.setText("00:00 / 00:00")
+            self._shown_seconds = None
+            self.time_label.setText("00:00 / " + self.format_time(self.length))
 
-    def update_ui(self):
-        if self.mediaplayer.is_playing():
-            length = self.mediaplayer.get_length()
-            time = self.mediaplayer.get_time()
-            self.time_slider.setRange(0, length)
-            self.time_slider.setValue(time)
-            self.time_label.setText(self.format_time(time) + " / " + self.format_time(length))
+    # --- 媒体库和播放队列 ---
+    def toggle_library(self, visible):
+        if visible and self.library is None:
+            self.library = MediaLibrary()
+            self.library_model = LibraryModel(self.library, self)
+            self.library_view.setModel(self.library_model)
+            self.reload_library()
+        self.library_panel.setVisible(visible)
+
+    def reload_library(self):
+        """重新扫描后行号会变: 按路径找回当前项的新行号, 队列从它接着往下播"""
+        current = self._queue_path(self.queue.current()) if self.playlist is None else None
+        self.library_model.reload()
+        if self.playlist is None:
+            self.queue.reset(self.library_model.rowCount(), self.library_model.row_of(current))
+            if current is not None: self._prepare_next()
+        self.library_status.setText(f"{self.library_model.rowCount()} 个文件")
+
+    def add_library_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "添加到媒体库")
+        if folder:
+            self.library.add_root(folder)
+            self.rescan_library()
+
+    def rescan_library(self):
+        if self.scanner is not None: return
+        roots = self.library.roots()
+        if not roots:
+            self.library_status.setText("还没有添加目录")
+            return
+        self.scanner = LibraryScanner(self.library.path, roots, parent=self)
+        self.scanner.progress.connect(lambda done, total: self.library_status.setText(f"解析中 {done}/{total}"))
+        self.scanner.scanned.connect(self.on_library_scanned)
+        self.scanner.finished.connect(self.on_scanner_finished)
+        self.library_status.setText("扫描中...")
+        self.scanner.start()
+
+    def on_library_scanned(self, stats):
+        self.reload_library()
+        self.library_status.setText(f"{stats['seen']} 个文件, 新解析 {stats['parsed']}, 移除 {stats['removed']}")
+
+    def on_scanner_finished(self):
+        self.scanner.deleteLater()
+        self.scanner = None
+
+    def play_library_row(self, row):
+        path = self.library_model.path(row) if self.library is not None else None
+        if path is None: return
+        if self.playlist is not None:
+            self.playlist = None
+            self.queue.reset(self.library_model.rowCount())
+        self.queue.jump(row)
+        self.library_view.selectRow(row)
+        self.play_path(path)
+
+    def play_next(self, step=1):
+        row = self.queue.peek(step)
+        path = self._queue_path(row)
+        if path is None: return
+        self.queue.advance(step)
+        if self.playlist is None: self.library_view.selectRow(row)
+        self.play_path(path)
+
+    def _queue_path(self, row):
+        if row is None: return None
+        if self.playlist is not None: return self.playlist[row]
+        return self.library_model.path(row) if self.library is not None else None
+
+    # --- 无缝切换: 下一项提前预解析, 快结束时在后台播放器里打开并停在第一帧, 结束时直接切换 ---
+    def _prepare_next(self):
+        """开始播放新的一项时预解析下一项 (只读容器信息, 不解码)"""
+        self._drop_standby()
+        path = self._queue_path(self.queue.peek(1)) if self.gapless else None
+        if path is None: return
+        media = self.instance.media_new(path)
+        media.parse_with_options(vlc.MediaParseFlag.local, 0)
+        self._next_media = (path, media)
+
+    def _preload_next(self):
+        if self._next_media is None or self._standby_path is not None: return
+        path, media = self._next_media
+        media.add_option(':start-paused')      # 打开、缓冲并显示第一帧后暂停, 直到被切换到前台
+        self.standby.set_media(media)
+        self.standby.play()
+        self._standby_path = path
+
+    def _drop_standby(self):
+        if self._standby_path is not None: self.standby.stop()
+        self._standby_path = None
+        if self._next_media is not None: self._next_media[1].release()
+        self._next_media = None
+
+    def _on_end_reached(self, event, player):
+        # libvlc 事件线程: 只记时间, 切换在 GUI 线程做
+        if player is self.mediaplayer:
+            self._ended_at = time.perf_counter()
+            self._ended.emit(player)
+
+    def _on_playing(self, event, player):
+        if player is self.mediaplayer and self._resumed_at is not None and self._ended_at is not None:
+            self.transition_measured.emit((time.perf_counter() - self._ended_at) * 1000, self._resumed_at is True)
+            self._resumed_at = None
+
+    def on_media_ended(self, player):
+        if player is not self.mediaplayer: return
+        self.is_playing = False
+        self.play_button.setText("播放")
+        row = self.queue.peek(1)
+        if row is None: return
+        path = self._queue_path(row)
+        if path is not None and path == self._standby_path and self.standby.get_state() not in (vlc.State.Error, vlc.State.Ended):
+            self.queue.advance(1)
+            self._next_media = None     # 已交给后台播放器
+            self._standby_path = None
+            self.mediaplayer, self.standby = self.standby, self.mediaplayer
+            self.video_frames.reverse()
+            self.video_frame = self.video_frames[0]
+            self.video_stack.setCurrentWidget(self.video_frame)
+            self._resumed_at = True
+            self.mediaplayer.set_pause(0)
+            self.standby.stop()
+            if self.library is not None and self.playlist is None: self.library_view.selectRow(row)
+            self.media = self.mediaplayer.get_media()
+            self._start_paused = True
+            self.path = path
+            self.is_playing = True
+            self.play_button.setText("暂停")
+            self.length = self.mediaplayer.get_length()
+            self.time_slider.setRange(0, max(self.length, 0))
+            self._shown_seconds = None
+            self.preview.open(path, self.length)
+            self._prepare_next()
+        else:
+            self._resumed_at = False
+            self.play_next()
+
+    def on_state_changed(self, player, state):
+        if player is self.mediaplayer and state in (vlc.State.Stopped, vlc.State.Error):
+            self.is_playing = False
+            self.play_button.setText("播放")
+
+    def on_length_changed(self, player, length):
+        # 每个媒体只在时长确定时设一次范围
+        if player is not self.mediaplayer: return
+        self.length = length
+        self.time_slider.setRange(0, length)
+        self.preview.set_length(length)
+        self.show_time(self.time_slider.value())
+
+    def on_time_changed(self, player, position):
+        if player is not self.mediaplayer: return
+        if self.gapless and self.length and self.length - position <= PRELOAD_BEFORE_END: self._preload_next()
+        if self.time_slider.isSliderDown(): return  # 拖动中不跟着播放进度跳
+        self.time_slider.setValue(position)
+        self.show_time(position)
+
+    def show_time(self, time):
+        seconds = time // 1000
+        if seconds == self._shown_seconds: return   # 标签只有秒数变了才重新格式化
+        self._shown_seconds = seconds
+        self.time_label.setText(self.format_time(time) + " / " + self.format_time(self.length))
+
+    def scrub(self, position):
+        self.show_time(position)
+        image = self.preview.image(position)
+        if image is not None: self.preview_label.setPixmap(QPixmap.fromImage(image))
+        else: self.preview_label.setText(self.format_time(position))
+        self.preview_label.adjustSize()
+        slider = self.time_slider
+        x = QStyle.sliderPositionFromValue(slider.minimum(), slider.maximum(), position, slider.width())
+        self.preview_label.move(slider.mapToGlobal(QPoint(x - self.preview_label.width() // 2, -self.preview_label.height() - 4)))
+        self.preview_label.show()
+
+    def on_preview_ready(self, slot):
+        if self.time_slider.isSliderDown() and self.preview.slot(self.time_slider.value()) == slot:
+            self.scrub(self.time_slider.value())
 
     def format_time(self, milliseconds):
         seconds = (milliseconds // 1000) % 60
@@ -163,6 +440,7 @@ class MediaPlayer(QWidget):
         return "{:02d}:{:02d}".format(minutes, seconds)
 
     def preview_play(self):
+        self.preview_label.hide()
         if self.media:
             length = self.mediaplayer.get_length()
             position = self.time_slider.value()
@@ -171,7 +449,6 @@ class MediaPlayer(QWidget):
             self.mediaplayer.play()  # 从新的位置播放
             self.is_playing = True
             self.play_button.setText("暂停")
-            self.timer.start()
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
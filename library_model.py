@@ -0,0 +1,107 @@
+from collections import OrderedDict
+import vlc
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QThread, pyqtSignal
+from media_library import MediaLibrary, scan
+
+
+def format_duration(ms):
+    if not ms: return ''
+    seconds = ms // 1000
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}" if seconds >= 3600 else f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+# --- 媒体库视图: 只持有排序后的 rowid 列表, 行内容按页从 SQLite 取, 少量页做 LRU 缓存 ---
+class LibraryModel(QAbstractTableModel):
+    HEADERS = ('名称', '时长', '视频', '分辨率', '音频')
+    PAGE = 256
+    MAX_PAGES = 64
+
+    def __init__(self, library, parent=None):
+        super().__init__(parent)
+        self.library = library
+        self.ids = []
+        self._pages = OrderedDict()
+
+    def reload(self):
+        self.beginResetModel()
+        self.ids = self.library.rowids()
+        self._pages.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def record(self, row):
+        """(路径, 名称, 时长, 视频编码, 音频编码, 宽, 高); 文件在扫描中被删掉时为 None"""
+        if not 0 <= row < len(self.ids): return None
+        page = row // self.PAGE
+        records = self._pages.get(page)
+        if records is None:
+            ids = self.ids[page * self.PAGE:(page + 1) * self.PAGE]
+            rows = self.library.rows(ids)
+            records = self._pages[page] = [rows.get(i) for i in ids]
+            while len(self._pages) > self.MAX_PAGES: self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        return records[row % self.PAGE]
+
+    def row_of(self, path):
+        """路径 -> 行号, 不在库里时返回 None"""
+        rowid = self.library.rowid(path) if path else None
+        try: return self.ids.index(rowid) if rowid is not None else None
+        except ValueError: return None
+
+    def path(self, row):
+        record = self.record(row)
+        return record[0] if record else None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid(): return None
+        record = self.record(index.row())
+        if record is None: return None
+        path, name, duration, vcodec, acodec, width, height = record
+        if role == Qt.DisplayRole:
+            column = index.column()
+            if column == 0: return name
+            if column == 1: return format_duration(duration)
+            if column == 2: return vcodec or ''
+            if column == 3: return f"{width}×{height}" if width else ''
+            if column == 4: return acodec or ''
+        elif role == Qt.ToolTipRole:
+            return path
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal: return self.HEADERS[section]
+        return None
+
+
+# --- 后台扫描媒体库目录: 线程池里用 libvlc 解析新的/改过的文件 ---
+class LibraryScanner(QThread):
+    progress = pyqtSignal(int, int)     # 已解析, 需要解析的总数
+    scanned = pyqtSignal(dict)          # {'seen', 'parsed', 'removed'}
+
+    def __init__(self, path, roots, workers=4, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.roots = roots
+        self.workers = workers
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        db = MediaLibrary.connect(self.path)
+        instance = vlc.Instance(['--quiet', '--no-video-title-show'])
+        try:
+            stats = scan(db, self.roots, instance, self.workers, lambda: self._cancelled, self.progress.emit)
+            self.scanned.emit(stats)
+        except InterruptedError:
+            pass
+        finally:
+            db.close()
+            instance.release()
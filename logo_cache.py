@@ -0,0 +1,170 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict, deque
+import requests
+from requests.adapters import HTTPAdapter
+from PyQt5.QtCore import Qt, QObject, QSize, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+from playlist_cache import default_cache_dir
+from m3u_parser import DEFAULT_USER_AGENT
+
+LOGO_SIZE = QSize(40, 24)
+
+
+# --- 频道台标: 只为可见行按需下载, 内存 LRU (按字节计) + 磁盘缩略图缓存 ---
+class LogoCache(QObject):
+    """pixmap(url) 只查内存, 未命中时排队后台加载并返回 None; 加载好后 logos_changed 通知视图重绘.
+    等待队列有上限且后进先出: 快速滚动时滚过去的行会被挤出队列, 不会真的去下载."""
+    logos_changed = pyqtSignal()
+
+    _loaded = pyqtSignal(str, object)   # url, QImage 或 None (工作线程 -> GUI 线程)
+
+    MAX_QUEUE = 64
+    MAX_DOWNLOAD = 2 * 2**20
+    RETRY_AFTER = 60.0          # 加载失败后多久 (秒) 再试, 每失败一次加倍, 最长 MAX_RETRY_AFTER
+    MAX_RETRY_AFTER = 3600.0
+    MAX_FAILED = 10000          # 记住的失败地址数上限, 超出时丢掉最早的
+
+    def __init__(self, parent=None, directory=None, memory_bytes=16 * 2**20, disk_bytes=64 * 2**20, workers=4, timeout=10.0):
+        super().__init__(parent)
+        self.directory = directory or default_cache_dir('logos')
+        os.makedirs(self.directory, exist_ok=True)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.timeout = timeout
+        self._pixmaps = OrderedDict()   # url -> QPixmap
+        self._used = 0
+        self._pending = set()           # 排队中或正在加载
+        self._failed = OrderedDict()    # url -> (可以重试的时刻, 连续失败次数)
+        self._disk_used = 0             # 磁盘缩略图的大致总字节数, 写入时累加, 超过上限就清理
+        self._prune_lock = threading.Lock()
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = DEFAULT_USER_AGENT
+        self._notify = QTimer(self)
+        self._notify.setSingleShot(True)
+        self._notify.setInterval(50)    # 合并一批加载完成的台标, 只重绘一次
+        self._notify.timeout.connect(self.logos_changed)
+        self._loaded.connect(self._on_loaded, Qt.QueuedConnection)
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for thread in self._threads: thread.start()
+        threading.Thread(target=self._prune_disk, daemon=True).start()
+
+    def pixmap(self, url):
+        pixmap = self._pixmaps.get(url)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(url)
+            return pixmap
+        if url in self._pending: return None
+        failed = self._failed.get(url)
+        if failed is not None and time.monotonic() < failed[0]: return None
+        self._request(url)
+        return None
+
+    def close(self):
+        with self._cond:
+            self._stopped = True
+            self._queue.clear()
+            self._cond.notify_all()
+        for thread in self._threads: thread.join(self.timeout)
+        self.session.close()
+
+    def _request(self, url):
+        with self._cond:
+            self._pending.add(url)
+            self._queue.append(url)
+            while len(self._queue) > self.MAX_QUEUE:
+                self._pending.discard(self._queue.popleft())   # 早就滚出屏幕了, 下次可见时再排队
+            self._cond.notify()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._stopped and not self._queue: self._cond.wait()
+                if self._stopped: return
+                url = self._queue.pop()
+            try: image = self._load(url)
+            except Exception as e:
+                print(f"台标加载失败: {url} ({e})")
+                image = None
+            if self._stopped: return
+            self._loaded.emit(url, image)
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.png')
+
+    def _load(self, url):
+        """工作线程: 磁盘缩略图 -> 下载 + 解码 + 缩放 + 写缩略图. QImage 可以在非 GUI 线程使用, QPixmap 不行"""
+        path = self._path(url)
+        image = QImage()
+        if image.load(path):
+            try: os.utime(path)
+            except OSError: pass
+            return image
+        if not url.startswith(('http://', 'https://')):
+            return self._save(image, path) if image.load(url) else None
+        with self.session.get(url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            data = b''
+            for chunk in response.iter_content(64 * 1024):
+                data += chunk
+                if len(data) > self.MAX_DOWNLOAD: raise ValueError("台标文件过大")
+        if not image.loadFromData(data): return None
+        return self._save(image, path)
+
+    def _save(self, image, path):
+        image = image.scaled(LOGO_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        image.save(path + '.tmp', 'PNG')
+        os.replace(path + '.tmp', path)
+        try: self._disk_used += os.path.getsize(path)
+        except OSError: pass
+        if self._disk_used > self.disk_bytes: self._prune_disk()
+        return image
+
+    def _on_loaded(self, url, image):
+        self._pending.discard(url)
+        if image is None or image.isNull():
+            attempts = self._failed.pop(url, (0, 0))[1] + 1
+            delay = min(self.RETRY_AFTER * 2 ** (attempts - 1), self.MAX_RETRY_AFTER)
+            self._failed[url] = (time.monotonic() + delay, attempts)
+            while len(self._failed) > self.MAX_FAILED: self._failed.popitem(last=False)
+            return
+        self._failed.pop(url, None)
+        pixmap = QPixmap.fromImage(image)
+        self._pixmaps[url] = pixmap
+        self._used += pixmap.width() * pixmap.height() * 4
+        while self._used > self.memory_bytes and len(self._pixmaps) > 1:
+            _, old = self._pixmaps.popitem(last=False)
+            self._used -= old.width() * old.height() * 4
+        if not self._notify.isActive(): self._notify.start()
+
+    def _prune_disk(self):
+        """磁盘缩略图超过上限时按最近使用 (mtime, 命中时会 touch) 删除最旧的, 删到上限的 90%.
+        启动时和写入缩略图后总量超限时调用; 已经有线程在清理时直接返回"""
+        if not self._prune_lock.acquire(blocking=False): return
+        try:
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith('.png'): continue
+                    try: st = entry.stat()
+                    except OSError: continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+            entries.sort()
+            for mtime, size, path in entries:
+                if total <= self.disk_bytes * 0.9: break
+                try: os.remove(path)
+                except OSError: pass
+                total -= size
+            self._disk_used = total
+        finally:
+            self._prune_lock.release()
@@ -0,0 +1,145 @@
+import io
+import re
+import sys
+import codecs
+
+# --- 流式 M3U 解析与输出 (不依赖 Qt / VLC, 命令行工具 m3u_tool.py 也直接使用) ---
+EXTINF_PATTERN = re.compile(r'#EXTINF:(?P<duration>-?\d+)(?P<attributes>.*),\s*(?P<name>.*)')
+ATTRIBUTE_PATTERN = re.compile(r'([a-zA-Z0-9_-]+)=("[^"]*"|\S+)')
+READ_CHUNK_SIZE = 64 * 1024
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36'   # 播放列表、节目单、台标下载和地址检测都用这一个
+LINE_BREAK = re.compile(r'\r\n|\r|\n')      # 与 str.splitlines() 一样兼容只用 CR 换行的列表
+
+
+def iter_lines(source, encoding='utf-8'):
+    """逐行读取 source: str/bytes 全文、文本或二进制文件对象、或 bytes/str 分块迭代器; CRLF / CR / LF 都算换行"""
+    if isinstance(source, str):
+        yield from io.StringIO(source, newline=None)
+        return
+    if isinstance(source, (bytes, bytearray)):
+        source = (source,)
+    elif hasattr(source, 'read'):
+        if isinstance(source, io.TextIOBase):
+            yield from source
+            return
+        read = source.read
+        source = iter(lambda: read(READ_CHUNK_SIZE), b'')
+    decoder = codecs.getincrementaldecoder(encoding)(errors='ignore')
+    tail = ''
+    for chunk in source:
+        text = decoder.decode(chunk) if isinstance(chunk, (bytes, bytearray)) else chunk
+        if not text: continue
+        text = tail + text
+        carry = text.endswith('\r')     # 块末尾的 CR 可能和下一块开头的 LF 是同一个换行, 留到下一块再切
+        if carry: text = text[:-1]
+        lines = LINE_BREAK.split(text) if '\r' in text else text.split('\n')   # 常见的纯 LF 走更快的 str.split
+        tail = lines.pop() + ('\r' if carry else '')
+        yield from lines
+    lines = LINE_BREAK.split(tail + decoder.decode(b'', final=True))
+    tail = lines.pop()
+    yield from lines
+    if tail: yield tail
+
+
+def parse_extinf(line):
+    """解析一行 #EXTINF, 返回不含 url 的频道字典"""
+    channel = {'name': 'Unknown', 'url': None, 'group': 'Default', 'logo': None, 'tvg_id': None}
+    match = EXTINF_PATTERN.match(line)
+    if match:
+        base_name = match.group('name').strip()
+        channel['name'] = base_name
+        attributes_str = match.group('attributes').strip()
+        if attributes_str:
+            attributes = {}
+            for key, value in ATTRIBUTE_PATTERN.findall(attributes_str):
+                attributes[key.lower()] = value.strip('"')
+            channel['name'] = attributes.get('tvg-name', base_name)
+            channel['group'] = attributes.get('group-title', 'Default')
+            channel['logo'] = attributes.get('tvg-logo')
+            channel['tvg_id'] = attributes.get('tvg-id') or None
+    return channel
+
+
+def parse_header(line):
+    """解析 #EXTM3U 行上的属性 (x-tvg-url 等), 键名转小写"""
+    return {key.lower(): value.strip('"') for key, value in ATTRIBUTE_PATTERN.findall(line[len('#EXTM3U'):])}
+
+
+def epg_urls(header):
+    """头部声明的 XMLTV 节目单地址, x-tvg-url / url-tvg 都可能是逗号分隔的多个地址"""
+    value = header.get('x-tvg-url') or header.get('url-tvg') or ''
+    return [url.strip() for url in value.split(',') if url.strip()]
+
+
+def iter_m3u(source, encoding='utf-8', header=None):
+    """边读边解析, 每得到一个完整频道就 yield 一次.
+    #EXTINF 与 URL 之间允许出现空行或其它注释行 (#EXTVLCOPT 等).
+    header 为字典时, #EXTM3U 行上的属性会写进去."""
+    pending = None
+    first = True
+    for line in iter_lines(source, encoding):
+        if first:
+            line = line.lstrip('\ufeff')
+            first = False
+        line = line.strip()
+        if not line: continue
+        if line[0] == '#':
+            if line.startswith('#EXTINF:'): pending = parse_extinf(line)
+            elif header is not None and line.startswith('#EXTM3U'): header.update(parse_header(line))
+            continue
+        if pending is not None:
+            pending['url'] = line
+            yield pending
+            pending = None
+
+
+def _read_chunks(f):
+    with f:
+        read = f.read
+        yield from iter(lambda: read(READ_CHUNK_SIZE), b'')
+
+
+def _response_chunks(response):
+    with response:
+        yield from response.iter_content(chunk_size=READ_CHUNK_SIZE)
+
+
+def open_source(source, timeout=15):
+    """返回 (分块迭代器, 编码); source 可以是本地路径、http(s) URL 或 '-' (标准输入).
+    文件和网络连接在迭代器读完 (或被关闭、回收) 时关闭.
+    requests 只在真的要下载时才导入, 处理本地文件的命令行启动更快"""
+    if source == '-':
+        read = sys.stdin.buffer.read
+        return iter(lambda: read(READ_CHUNK_SIZE), b''), 'utf-8'
+    if source.startswith(('http://', 'https://')):
+        import requests
+        response = requests.get(source, timeout=timeout, headers={'User-Agent': DEFAULT_USER_AGENT}, stream=True)
+        try: response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        return _response_chunks(response), response.encoding or 'utf-8'
+    return _read_chunks(open(source, 'rb')), 'utf-8'
+
+
+def _attribute(key, value):
+    return f' {key}="{value.replace(chr(34), chr(39))}"' if value else ''
+
+
+def format_header(header):
+    return '#EXTM3U' + ''.join(_attribute(key, value) for key, value in header.items())
+
+
+def format_channel(channel):
+    """频道字典 -> #EXTINF 行 + URL 行 (不含结尾换行)"""
+    attributes = (_attribute('tvg-id', channel.get('tvg_id')) + _attribute('tvg-logo', channel.get('logo'))
+                  + _attribute('group-title', channel.get('group')))
+    name = (channel.get('name') or '').replace('\n', ' ')
+    return f"#EXTINF:-1{attributes},{name}\n{channel['url']}"
+
+
+def parse_m3u(content):
+    """兼容旧接口: 一次性解析全部内容并返回频道列表"""
+    channels = list(iter_m3u(content))
+    print(f"解析到 {len(channels)} 个频道。")
+    return channels
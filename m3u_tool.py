@@ -0,0 +1,128 @@
+"""无界面的播放列表处理工具: 解析、按分组/正则筛选、去重、检测可用性, 输出 M3U 或 JSON Lines.
+全程流式处理, 可以在没有显示器的服务器上用管道处理几百 MB 的列表. 不导入 Qt / VLC.
+
+用法:
+    python m3u_tool.py a.m3u http://host/b.m3u [-o out.m3u] [--format m3u|json]
+                       [--group 央视 --group 卫视] [--match 'CCTV|卫视'] [--exclude '购物']
+                       [--dedupe] [--validate [--keep-dead]] [--epg URL]
+    cat big.m3u | python m3u_tool.py - --dedupe --format json > channels.jsonl
+"""
+import re
+import sys
+import json
+import time
+import argparse
+from itertools import chain
+from m3u_parser import iter_m3u, open_source, epg_urls, format_header, format_channel
+
+VALIDATE_CHUNK = 500
+
+
+def iter_sources(sources, header):
+    """依次流式读取每个源; 第一个源的 #EXTM3U 属性写入 header"""
+    for i, source in enumerate(sources):
+        chunks, encoding = open_source(source)
+        yield from iter_m3u(chunks, encoding, header if i == 0 else None)
+
+
+def filter_channels(channels, groups=None, match=None, exclude=None):
+    groups = {g.casefold() for g in groups} if groups else None
+    match = re.compile(match, re.IGNORECASE) if match else None
+    exclude = re.compile(exclude, re.IGNORECASE) if exclude else None
+    for channel in channels:
+        if groups is not None and (channel.get('group') or '').casefold() not in groups: continue
+        if match is not None and not match.search(channel['name']): continue
+        if exclude is not None and exclude.search(channel['name']): continue
+        yield channel
+
+
+def dedupe_channels(channels, stats):
+    """按规范化 URL 和 tvg-id/名称去重, 只保留第一次出现的; 内存只存键的哈希"""
+    from channel_table import ChannelTable
+    from channel_merge import ChannelMerger
+    merger = ChannelMerger(ChannelTable(), keep_alternates=False)    # 流式输出时不再回头补备用地址
+    for channel in channels:
+        if merger.merge((channel,)): yield channel
+    stats['duplicates'] = merger.duplicates
+
+
+def validate_channels(channels, stats, keep_dead=False, workers=64, per_host=4, timeout=8.0):
+    """分块并发检测, 按原顺序输出; 频道字典里加上检测结果字段"""
+    from stream_health import HealthChecker, STATUS_DEAD
+    checker = HealthChecker(workers, per_host, timeout)
+    stats['dead'] = 0
+    try:
+        chunk = []
+        for channel in channels:
+            chunk.append(channel)
+            if len(chunk) >= VALIDATE_CHUNK:
+                yield from _validate_chunk(checker, chunk, stats, keep_dead, STATUS_DEAD)
+                chunk = []
+        yield from _validate_chunk(checker, chunk, stats, keep_dead, STATUS_DEAD)
+    finally:
+        checker.close()
+
+
+def _validate_chunk(checker, chunk, stats, keep_dead, dead):
+    results = [None] * len(chunk)
+    for i, url, result in checker.check([c['url'] for c in chunk]): results[i] = result
+    for channel, result in zip(chunk, results):
+        if result is None: continue
+        if result['status'] == dead:
+            stats['dead'] += 1
+            if not keep_dead: continue
+        channel.update(result)
+        yield channel
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="流式处理 M3U 播放列表 (不需要图形界面)")
+    parser.add_argument('sources', nargs='+', help="本地 M3U 文件、http(s) URL 或 '-' (标准输入)")
+    parser.add_argument('-o', '--output', help="输出文件, 默认标准输出")
+    parser.add_argument('--format', choices=('m3u', 'json'), default='m3u', help="json 为每行一个频道 (JSON Lines)")
+    parser.add_argument('--group', action='append', help="只保留这些分组 (可重复, 不区分大小写)")
+    parser.add_argument('--match', help="只保留名称匹配该正则的频道")
+    parser.add_argument('--exclude', help="去掉名称匹配该正则的频道")
+    parser.add_argument('--dedupe', action='store_true', help="按 URL 和 tvg-id/名称去重")
+    parser.add_argument('--validate', action='store_true', help="检测地址是否可用, 默认去掉无法播放的")
+    parser.add_argument('--keep-dead', action='store_true', help="与 --validate 一起使用: 保留无法播放的频道")
+    parser.add_argument('--workers', type=int, default=64)
+    parser.add_argument('--timeout', type=float, default=8.0)
+    parser.add_argument('--epg', help="输出 M3U 时写入的 x-tvg-url, 默认沿用第一个源的")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    header = {}
+    stats = {'read': 0, 'written': 0}
+
+    def counted(channels):
+        for channel in channels:
+            stats['read'] += 1
+            yield channel
+
+    channels = filter_channels(counted(iter_sources(args.sources, header)), args.group, args.match, args.exclude)
+    if args.dedupe: channels = dedupe_channels(channels, stats)
+    if args.validate: channels = validate_channels(channels, stats, args.keep_dead, args.workers, timeout=args.timeout)
+
+    out = open(args.output, 'w', encoding='utf-8', newline='\n') if args.output else sys.stdout
+    try:
+        first = next(channels, None)   # 先读到第一个频道, 这时第一个源的头部已经解析过了
+        if args.format == 'm3u':
+            epg = [args.epg] if args.epg else epg_urls(header)
+            out.write(format_header({'x-tvg-url': ','.join(epg)} if epg else {}) + '\n')
+        if first is not None:
+            for channel in chain((first,), channels):
+                if args.format == 'json': out.write(json.dumps(channel, ensure_ascii=False) + '\n')
+                else: out.write(format_channel(channel) + '\n')
+                stats['written'] += 1
+    except BrokenPipeError:
+        pass    # 例如管道到 head
+    finally:
+        if out is not sys.stdout: out.close()
+    print(' '.join(f"{key}={value}" for key, value in stats.items()) + f" 用时 {time.perf_counter() - start:.2f} s",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
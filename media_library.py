@@ -0,0 +1,188 @@
+import os
+import time
+import random
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import vlc
+from playlist_cache import default_cache_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS root (path TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS file (path TEXT PRIMARY KEY, name TEXT, mtime INTEGER, size INTEGER, duration INTEGER,
+                                 vcodec TEXT, acodec TEXT, width INTEGER, height INTEGER, scanned REAL);
+"""
+MEDIA_EXTENSIONS = ('.mp4', '.m4v', '.mkv', '.avi', '.mov', '.wmv', '.flv', '.webm', '.ts', '.mpg', '.mpeg',
+                    '.mp3', '.wav', '.ogg', '.flac', '.m4a', '.aac', '.opus', '.wma')
+COLUMNS = ('path', 'name', 'duration', 'vcodec', 'acodec', 'width', 'height')
+WRITE_BATCH = 500
+
+
+def iter_media_files(root):
+    """递归列出媒体文件: yield (路径, mtime_ns, 大小); 没有权限的目录跳过"""
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False): stack.append(entry.path)
+                        elif entry.name.lower().endswith(MEDIA_EXTENSIONS):
+                            st = entry.stat()
+                            yield entry.path, st.st_mtime_ns, st.st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def fourcc(code):
+    return code.to_bytes(4, 'little').decode('ascii', 'replace').strip() if code else None
+
+
+def probe(instance, path, timeout=5000):
+    """libvlc 只解析本地文件的容器信息 (不解码): 返回时长 (毫秒)、音视频编码和分辨率, 失败时返回 None"""
+    media = instance.media_new_path(path)
+    parsed = threading.Event()
+    media.event_manager().event_attach(vlc.EventType.MediaParsedChanged, lambda event: parsed.set())
+    try:
+        if media.parse_with_options(vlc.MediaParseFlag.local, timeout) == -1: return None
+        parsed.wait(timeout / 1000 + 1)
+        if media.get_parsed_status() != vlc.MediaParsedStatus.done: return None
+        info = {'duration': max(media.get_duration(), 0), 'vcodec': None, 'acodec': None, 'width': None, 'height': None}
+        for track in media.tracks_get() or ():
+            if track.type == vlc.TrackType.video and info['vcodec'] is None:
+                info['vcodec'] = fourcc(track.codec)
+                info['width'], info['height'] = track.video.contents.width, track.video.contents.height
+            elif track.type == vlc.TrackType.audio and info['acodec'] is None:
+                info['acodec'] = fourcc(track.codec)
+        return info
+    finally:
+        media.release()
+
+
+def scan(db, roots, instance, workers=4, cancelled=lambda: False, progress=None):
+    """增量扫描: 路径/mtime/大小都没变的文件不再解析; 新的和改过的交给线程池解析, 分批写入; 消失的文件删除.
+    返回 {'seen', 'parsed', 'removed'}"""
+    known = {path: (mtime, size) for path, mtime, size in db.execute('SELECT path, mtime, size FROM file')}
+    seen = set()
+    changed = []
+    for root in roots:
+        for path, mtime, size in iter_media_files(root):
+            if cancelled(): raise InterruptedError
+            seen.add(path)
+            if known.get(path) != (mtime, size): changed.append((path, mtime, size))
+    removed = [(path,) for path in known if path not in seen and any(path.startswith(os.path.join(r, '')) for r in roots)]
+    db.executemany('DELETE FROM file WHERE path = ?', removed)
+    db.commit()
+
+    def parse(item):
+        if cancelled(): return item, None
+        try: return item, probe(instance, item[0])
+        except Exception as e:
+            print(f"解析失败: {item[0]} ({e})")
+            return item, None
+
+    rows = []
+    done = 0
+    with ThreadPoolExecutor(workers) as pool:
+        for (path, mtime, size), info in pool.map(parse, changed):
+            if cancelled(): raise InterruptedError
+            info = info or {}
+            rows.append((path, os.path.basename(path), mtime, size, info.get('duration'), info.get('vcodec'),
+                         info.get('acodec'), info.get('width'), info.get('height'), time.time()))
+            done += 1
+            if len(rows) >= WRITE_BATCH:
+                _write(db, rows)
+                rows = []
+                if progress: progress(done, len(changed))
+    _write(db, rows)
+    if progress: progress(done, len(changed))
+    return {'seen': len(seen), 'parsed': len(changed), 'removed': len(removed)}
+
+
+def _write(db, rows):
+    db.executemany('INSERT OR REPLACE INTO file VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+    db.commit()
+
+
+# --- 本地媒体库索引: SQLite (WAL), 以路径为键, 记录 mtime/大小用于增量扫描 ---
+class MediaLibrary:
+    """GUI 线程用这个连接只读查询; 扫描在后台线程另开连接 (见 LibraryScanner).
+    视图按需取数据: rowids() 一次取出排序后的全部 rowid (十万行约几十毫秒), rows() 再按页取可见行的内容."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(default_cache_dir('library'), 'library.sqlite')
+        self.db = self.connect(self.path)
+
+    @staticmethod
+    def connect(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        db = sqlite3.connect(path)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.executescript(SCHEMA)
+        return db
+
+    def close(self):
+        self.db.close()
+
+    def roots(self):
+        return [path for path, in self.db.execute('SELECT path FROM root ORDER BY path')]
+
+    def add_root(self, path):
+        self.db.execute('INSERT OR IGNORE INTO root VALUES (?)', (os.path.abspath(path),))
+        self.db.commit()
+
+    def rowids(self, order='path'):
+        return [rowid for rowid, in self.db.execute(f'SELECT rowid FROM file ORDER BY {order}')]
+
+    def rowid(self, path):
+        row = self.db.execute('SELECT rowid FROM file WHERE path = ?', (path,)).fetchone()
+        return row[0] if row else None
+
+    def rows(self, rowids):
+        """rowid -> (路径, 名称, 时长, 视频编码, 音频编码, 宽, 高)"""
+        marks = ','.join('?' * len(rowids))
+        query = f"SELECT rowid, {', '.join(COLUMNS)} FROM file WHERE rowid IN ({marks})"
+        return {row[0]: row[1:] for row in self.db.execute(query, rowids)}
+
+
+# --- 播放队列: 顺序或随机 (随机顺序在开始时打乱一次, 每首都会播到, 不重复) ---
+class PlayQueue:
+    def __init__(self, size=0, shuffle=False, repeat=False):
+        self.shuffle = shuffle
+        self.repeat = repeat
+        self.reset(size)
+
+    def reset(self, size, current=None):
+        self.order = list(range(size))
+        if self.shuffle:
+            random.shuffle(self.order)
+            if current is not None and current in self.order:     # 当前项放在最前, 后面的随机
+                self.order.remove(current)
+                self.order.insert(0, current)
+        self.position = self.order.index(current) if current is not None and current in self.order else -1
+
+    def set_shuffle(self, shuffle):
+        self.shuffle = shuffle
+        self.reset(len(self.order), self.current())
+
+    def current(self):
+        return self.order[self.position] if 0 <= self.position < len(self.order) else None
+
+    def jump(self, item):
+        """用户直接选中了某一项"""
+        if self.shuffle: self.reset(len(self.order), item)
+        else: self.position = item
+
+    def peek(self, step=1):
+        """下一项 (不移动), 没有时返回 None"""
+        if not self.order: return None
+        position = self.position + step
+        if 0 <= position < len(self.order): return self.order[position]
+        return self.order[position % len(self.order)] if self.repeat else None
+
+    def advance(self, step=1):
+        item = self.peek(step)
+        if item is not None: self.position = (self.position + step) % len(self.order)
+        return item
@@ -0,0 +1,180 @@
+import os
+import vlc
+from PyQt5.QtCore import QTimer, pyqtSignal
+from PyQt5.QtWidgets import QWidget, QFrame, QGridLayout, QVBoxLayout, QLabel
+from channel_zapper import embed_player
+
+# 非焦点画面: 跳过非参考帧和环路滤波, 只用一个解码线程; HLS/DASH 有多档码率时选不超过 640x360 的一档
+LOW_COST_OPTIONS = ('avcodec-skip-frame=1', 'avcodec-skiploopfilter=4', 'avcodec-hurry-up', 'avcodec-threads=1',
+                    'adaptive-maxwidth=640', 'adaptive-maxheight=360')
+STATE_TEXT = {vlc.State.Opening: "打开中", vlc.State.Buffering: "缓冲中", vlc.State.Playing: "播放中",
+              vlc.State.Paused: "已暂停", vlc.State.Stopped: "已停止", vlc.State.Ended: "已结束", vlc.State.Error: "错误"}
+
+
+def default_decoder_cap():
+    return max(4, os.cpu_count() or 4)
+
+
+class _Tile(QFrame):
+    clicked = pyqtSignal(object)
+
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.player = None
+        self.url = None
+        self.name = ''
+        self.options = ()           # 频道本身的参数 (配置文件), 不含 LOW_COST_OPTIONS
+        self.low_cost = None        # 当前媒体是否以低开销方式打开; None 表示没有在解码
+        self.video = QFrame()
+        self.video.setStyleSheet("background-color: black;")
+        self.label = QLabel()
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.setSpacing(0)
+        layout.addWidget(self.video, 1)
+        layout.addWidget(self.label)
+        self.set_focused(False)
+
+    def set_focused(self, focused):
+        self.setStyleSheet("_Tile { border: 2px solid %s; }" % ('#2a82da' if focused else 'transparent'))
+
+    def mousePressEvent(self, event):
+        self.clicked.emit(self)
+        super().mousePressEvent(event)
+
+
+# --- 多画面: 共用一个 vlc.Instance 的 N 个播放器, 只有焦点画面出声并以完整质量解码 ---
+class MosaicView(QWidget):
+    """同时解码的画面数不超过 max_decoders; 超出的画面先停着, 获得焦点时顶替最久没有焦点的画面.
+    焦点切换立即转移声音, 稍后 (requalify_ms) 再把新焦点按完整质量重开、旧焦点改为低开销, 避免快速点击时反复重连."""
+    focus_changed = pyqtSignal(int)
+
+    def __init__(self, instance, bridge=None, parent=None, max_decoders=None, requalify_ms=800):
+        super().__init__(parent)
+        self.instance = instance
+        self.bridge = bridge            # VlcEventBridge, 用来在画面下方显示状态
+        self.max_decoders = max_decoders or default_decoder_cap()
+        self.volume = 70
+        self.tiles = []
+        self.focused = None
+        self._recent = []               # 最近获得焦点的画面在后
+        self._grid = QGridLayout(self)
+        self._grid.setContentsMargins(0, 0, 0, 0)
+        self._grid.setSpacing(2)
+        self._requalify_timer = QTimer(self)
+        self._requalify_timer.setSingleShot(True)
+        self._requalify_timer.setInterval(requalify_ms)
+        self._requalify_timer.timeout.connect(self._requalify)
+
+    def set_grid(self, size):
+        """size × size 个画面; 缩小时多出的画面释放播放器"""
+        while len(self.tiles) > size * size: self._release_tile(self.tiles.pop())
+        for tile in self.tiles: self._grid.removeWidget(tile)
+        while len(self.tiles) < size * size:
+            tile = _Tile(len(self.tiles), self)
+            tile.clicked.connect(self.focus)
+            self.tiles.append(tile)
+        for tile in self.tiles: self._grid.addWidget(tile, tile.index // size, tile.index % size)
+        if self.focused not in self.tiles: self.focus(self.tiles[0])
+        self._resume()
+
+    def decoding(self):
+        return [t for t in self.tiles if t.low_cost is not None]
+
+    def play(self, tile, url, name='', options=()):
+        if isinstance(tile, int): tile = self.tiles[tile]
+        tile.url, tile.name, tile.options = url, name, tuple(options)
+        if tile.low_cost is None and len(self.decoding()) >= self.max_decoders:
+            if tile is not self.focused:
+                tile.label.setText(f"{name} · 等待解码资源 (上限 {self.max_decoders})")
+                return
+            self._park(self._least_recent())
+        self._open(tile, tile is not self.focused)
+
+    def focus(self, tile):
+        if isinstance(tile, int): tile = self.tiles[tile]
+        previous = self.focused
+        if tile is previous: return
+        self.focused = tile
+        if tile in self._recent: self._recent.remove(tile)
+        self._recent.append(tile)
+        for t in self.tiles:
+            t.set_focused(t is tile)
+            if t.player is not None: t.player.audio_set_mute(t is not tile)
+        if tile.player is not None: tile.player.audio_set_volume(self.volume)
+        if tile.url and tile.low_cost is None:      # 停着的画面: 顶替最久没有焦点的画面
+            if len(self.decoding()) >= self.max_decoders: self._park(self._least_recent())
+            self._open(tile, False)
+        self._requalify_timer.start()
+        self.focus_changed.emit(tile.index)
+
+    def set_volume(self, value):
+        self.volume = value
+        if self.focused is not None and self.focused.player is not None: self.focused.player.audio_set_volume(value)
+
+    def stop(self):
+        self._requalify_timer.stop()
+        for tile in self.tiles:
+            self._park(tile)
+            tile.url = None
+            tile.label.clear()
+
+    def release(self):
+        self.stop()
+        for tile in self.tiles: self._release_tile(tile)
+
+    def on_state(self, player, state):
+        tile = next((t for t in self.tiles if t.player is player), None)
+        if tile is None or tile.low_cost is None: return
+        tile.label.setText(f"{tile.name} · {STATE_TEXT.get(state, state)}" + (" · 低开销" if tile.low_cost else ""))
+
+    def _open(self, tile, low_cost):
+        if tile.player is None:
+            tile.player = self.instance.media_player_new()
+            embed_player(tile.player, tile.video)
+            tile.player.video_set_mouse_input(False)    # 点击交给画面控件, 用来切换焦点
+            tile.player.video_set_key_input(False)
+            if self.bridge is not None: self.bridge.attach(tile.player)
+        elif tile.player.get_state() != vlc.State.Stopped:
+            tile.player.stop()
+        media = self.instance.media_new(tile.url)
+        for option in tile.options + (LOW_COST_OPTIONS if low_cost else ()): media.add_option(option)
+        tile.player.set_media(media)
+        media.release()
+        tile.player.audio_set_mute(tile is not self.focused)
+        tile.player.audio_set_volume(self.volume)
+        tile.low_cost = low_cost
+        tile.player.play()
+
+    def _park(self, tile):
+        if tile is None: return
+        if tile.player is not None and tile.player.get_state() != vlc.State.Stopped: tile.player.stop()
+        tile.low_cost = None
+        if tile.url: tile.label.setText(f"{tile.name} · 等待解码资源 (上限 {self.max_decoders})")
+
+    def _resume(self):
+        """有空出来的解码名额时, 依次启动停着的画面"""
+        for tile in self.tiles:
+            if len(self.decoding()) >= self.max_decoders: break
+            if tile.url and tile.low_cost is None: self._open(tile, tile is not self.focused)
+
+    def _least_recent(self):
+        decoding = [t for t in self.decoding() if t is not self.focused]
+        if not decoding: return None
+        return min(decoding, key=lambda t: self._recent.index(t) if t in self._recent else -1)
+
+    def _requalify(self):
+        for tile in self.decoding():
+            if tile.low_cost != (tile is not self.focused): self._open(tile, tile is not self.focused)
+
+    def _release_tile(self, tile):
+        self._park(tile)
+        if tile.player is not None:
+            if self.bridge is not None: self.bridge.forget(tile.player)
+            tile.player.release()
+            tile.player = None
+        if tile in self._recent: self._recent.remove(tile)
+        if self.focused is tile: self.focused = None
+        self._grid.removeWidget(tile)
+        tile.deleteLater()
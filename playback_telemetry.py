@@ -0,0 +1,212 @@
+import json
+import time
+import queue
+import logging
+import threading
+import logging.handlers
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import vlc
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+STAT_FIELDS = ('read_bytes', 'input_bitrate', 'demux_read_bytes', 'demux_bitrate', 'demux_corrupted', 'demux_discontinuity',
+               'decoded_video', 'decoded_audio', 'displayed_pictures', 'lost_pictures', 'played_abuffers', 'lost_abuffers')
+
+
+def media_stats(player):
+    """libvlc 的输入/解码统计; 码率换算成 kb/s (libvlc 给的是字节/毫秒)"""
+    media = player.get_media() if player else None
+    if media is None: return None
+    stats = vlc.MediaStats()
+    if not media.get_stats(stats): return None
+    sample = {name: getattr(stats, name) for name in STAT_FIELDS if hasattr(stats, name)}
+    for name in ('input_bitrate', 'demux_bitrate'):
+        if name in sample: sample[name] = round(sample[name] * 8000, 1)
+    return sample
+
+
+class _Session:
+    __slots__ = ('url', 'name', 'started', 'opening', 'buffering', 'playing', 'first_frame', 'warm', 'rebuffers',
+                 'rebuffer_time', 'rebuffer_since', 'last_stats')
+
+    def __init__(self, url, name):
+        self.url = url
+        self.name = name
+        self.started = time.monotonic()
+        self.opening = self.buffering = self.playing = None     # 距点击的秒数
+        self.first_frame = None
+        self.warm = False
+        self.rebuffers = 0
+        self.rebuffer_time = 0.0
+        self.rebuffer_since = None
+        self.last_stats = None
+
+    def summary(self, now):
+        ms = lambda t: round(t * 1000, 1) if t is not None else None
+        rebuffer_time = self.rebuffer_time + (now - self.rebuffer_since if self.rebuffer_since is not None else 0)
+        record = {'url': self.url, 'name': self.name, 'duration_s': round(now - self.started, 3),
+                  'to_opening_ms': ms(self.opening), 'to_buffering_ms': ms(self.buffering), 'to_playing_ms': ms(self.playing),
+                  'first_frame_ms': self.first_frame, 'warm': self.warm,
+                  'rebuffer_count': self.rebuffers, 'rebuffer_ms': ms(rebuffer_time)}
+        if self.last_stats: record.update(self.last_stats)
+        return record
+
+
+# --- 播放统计: 每次换台一个会话, 记录启动各阶段耗时、卡顿、libvlc 媒体统计 ---
+class PlaybackTelemetry(QObject):
+    """状态和缓冲进度来自 VlcEventBridge 的信号; 媒体统计由 GUI 线程的定时器按 interval 采样 (get_stats 只是读计数器).
+    导出: JSONL 由后台线程写入并按大小轮转; Prometheus 文本格式由本机 HTTP 端点提供. 都是可选的."""
+    sampled = pyqtSignal(dict)      # 当前会话的最新汇总, 供统计面板显示
+    session_ended = pyqtSignal(dict)    # 会话结束时的汇总 (含结束原因 'end')
+
+    def __init__(self, parent=None, interval=1.0):
+        super().__init__(parent)
+        self.player = None
+        self.session = None
+        self.totals = {'sessions': 0, 'rebuffers': 0, 'rebuffer_seconds': 0.0}
+        self._lock = threading.Lock()       # 保护给 HTTP 线程读的快照
+        self._snapshot = {}
+        self._logger = None
+        self._listener = None
+        self._server = None
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._sample)
+        self.set_interval(interval)
+
+    def set_interval(self, seconds):
+        self._timer.setInterval(max(int(seconds * 1000), 100))
+
+    def enable_jsonl(self, path, max_bytes=10 * 2**20, backups=5):
+        """会话汇总和采样写入 JSONL, 超过 max_bytes 轮转; 写文件在 QueueListener 的线程里, 不占用 GUI 线程"""
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        records = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(records, handler)
+        self._listener.start()
+        self._logger = logging.getLogger(f'm3u_player.telemetry.{id(self)}')
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(logging.handlers.QueueHandler(records))
+
+    def enable_prometheus(self, port, host='127.0.0.1'):
+        """http://host:port/metrics 提供 Prometheus 文本格式"""
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args): pass
+
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = telemetry.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"播放统计: http://{host}:{self._server.server_address[1]}/metrics")
+
+    def close(self):
+        self.end_session('exit')
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._listener is not None: self._listener.stop()
+
+    # --- 会话 ---
+    def start_session(self, player, url, name='', reason='switch'):
+        """reason 记录在上一个会话的结束原因里"""
+        self.end_session(reason)
+        self.player = player
+        self.session = _Session(url, name)
+        self.totals['sessions'] += 1
+        self._timer.start()
+
+    def end_session(self, reason):
+        session = self.session
+        if session is None: return
+        self._timer.stop()
+        self._sample()
+        self.session = None
+        record = session.summary(time.monotonic())
+        record['end'] = reason
+        self._write('session', record)
+        self.session_ended.emit(record)
+
+    def on_state(self, player, state):
+        session = self.session
+        if session is None or player is not self.player: return
+        elapsed = time.monotonic() - session.started
+        if state == vlc.State.Opening and session.opening is None: session.opening = elapsed
+        elif state == vlc.State.Buffering and session.buffering is None: session.buffering = elapsed
+        elif state == vlc.State.Playing and session.playing is None:
+            session.playing = elapsed
+            self._sample()
+
+    def on_first_frame(self, url, ms, warm):
+        """ChannelZapper.latency_measured: 预热命中时不会再有 Opening/Playing, 以首帧为准"""
+        session = self.session
+        if session is None or url != session.url or session.first_frame is not None: return
+        session.first_frame = round(ms, 1)
+        session.warm = warm
+        if warm and session.playing is None:    # 之后的缓冲才能算作卡顿
+            session.playing = time.monotonic() - session.started
+            self._sample()
+
+    def on_buffering(self, player, percent):
+        session = self.session
+        if session is None or player is not self.player: return
+        now = time.monotonic()
+        if session.playing is None:     # 启动阶段的缓冲不算卡顿
+            if session.buffering is None: session.buffering = now - session.started
+            return
+        if percent < 100 and session.rebuffer_since is None:
+            session.rebuffer_since = now
+            session.rebuffers += 1
+            self.totals['rebuffers'] += 1
+        elif percent >= 100 and session.rebuffer_since is not None:
+            duration = now - session.rebuffer_since
+            session.rebuffer_time += duration
+            self.totals['rebuffer_seconds'] += duration
+            session.rebuffer_since = None
+
+    def _sample(self):
+        session = self.session
+        if session is None: return
+        try: stats = media_stats(self.player)
+        except Exception: stats = None
+        if stats: session.last_stats = stats
+        record = session.summary(time.monotonic())
+        with self._lock: self._snapshot = record
+        if stats: self._write('sample', record)
+        self.sampled.emit(record)
+
+    def _write(self, kind, record):
+        if self._logger is None: return
+        self._logger.info(json.dumps(dict(record, type=kind, time=round(time.time(), 3)), ensure_ascii=False))
+
+    def prometheus_text(self):
+        with self._lock: current = dict(self._snapshot)
+        label = ''
+        if current.get('name'):
+            label = '{channel="%s"}' % current['name'].replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+        lines = [
+            '# TYPE m3u_player_sessions_total counter', f"m3u_player_sessions_total {self.totals['sessions']}",
+            '# TYPE m3u_player_rebuffers_total counter', f"m3u_player_rebuffers_total {self.totals['rebuffers']}",
+            '# TYPE m3u_player_rebuffer_seconds_total counter',
+            f"m3u_player_rebuffer_seconds_total {self.totals['rebuffer_seconds']:.3f}",
+        ]
+        gauges = (('to_opening_ms', 'start_opening_seconds', 0.001), ('to_buffering_ms', 'start_buffering_seconds', 0.001),
+                  ('to_playing_ms', 'start_playing_seconds', 0.001), ('first_frame_ms', 'first_frame_seconds', 0.001),
+                  ('input_bitrate', 'input_bitrate_kbps', 1),
+                  ('demux_bitrate', 'demux_bitrate_kbps', 1), ('lost_pictures', 'lost_pictures', 1),
+                  ('lost_abuffers', 'lost_audio_buffers', 1), ('displayed_pictures', 'displayed_pictures', 1),
+                  ('rebuffer_count', 'session_rebuffers', 1))
+        for key, name, scale in gauges:
+            if current.get(key) is None: continue
+            lines.append(f'# TYPE m3u_player_{name} gauge')
+            lines.append(f"m3u_player_{name}{label} {current[key] * scale:g}")
+        return '\n'.join(lines) + '\n'
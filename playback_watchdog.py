@@ -0,0 +1,108 @@
+import time
+import vlc
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+
+# --- 播放看门狗: 缓冲过久 / 播放时间不走 / 出错时切换到同一频道的下一个地址 ---
+class PlaybackWatchdog(QObject):
+    """状态来自 VlcEventBridge 的信号 (GUI 线程), 播放进度每 interval 毫秒轮询一次 get_time().
+    一次故障从检测到开始计时, 在 budget 秒内依次尝试候选地址; 新地址的播放时间开始前进才算恢复
+    (只进入 Playing 不算, 否则两个都会停顿的地址会来回切换)."""
+    failover = pyqtSignal(str, str)        # 请窗口改播的地址, 原因
+    recovered = pyqtSignal(str, float)     # 恢复后的地址, 从检测到故障到恢复的毫秒数
+    gave_up = pyqtSignal(str)              # 候选用完或超出时间预算, 原因
+
+    def __init__(self, parent=None, stall_timeout=8.0, open_timeout=12.0, budget=30.0, interval=500):
+        super().__init__(parent)
+        self.stall_timeout = stall_timeout      # Buffering 持续 / 播放时间不前进的上限 (秒)
+        self.open_timeout = open_timeout        # Opening 到 Playing 的上限 (秒)
+        self.budget = budget                    # 一次故障切换的总时间预算 (秒)
+        self.player = None
+        self.url = None
+        self.candidates = []
+        self.tried = set()
+        self._state = None
+        self._state_since = 0.0
+        self._last_time = -1
+        self._last_progress = 0.0
+        self._failed_at = None                  # 当前故障的检测时刻, None 表示正常
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._check)
+
+    def watch(self, player, url, candidates):
+        """开始看护新选中的频道; candidates 为该频道全部可用地址 (含 url)"""
+        self.candidates = list(dict.fromkeys(candidates))
+        self.tried = {url}
+        self._failed_at = None
+        self.follow(player, url)
+        self._timer.start()
+
+    def follow(self, player, url):
+        """窗口按 failover 信号换了地址 (可能也换了播放器) 后调用"""
+        self.player = player
+        self.url = url
+        # 预热换台时播放器已经在播放, 桥接不会再发状态事件, 以当前状态为起点; 刚调用 play() 的按 Opening 计时
+        state = player.get_state()
+        self._state = state if state in (vlc.State.Buffering, vlc.State.Playing) else vlc.State.Opening
+        self._state_since = self._last_progress = time.monotonic()
+        self._last_time = -1
+
+    def stop(self):
+        self._timer.stop()
+        self.player = None
+        self._failed_at = None
+
+    def on_state(self, player, state):
+        if player is not self.player: return
+        now = time.monotonic()
+        if state != self._state:
+            self._state = state
+            self._state_since = now
+        if state == vlc.State.Playing:
+            self._last_progress = now
+        elif state == vlc.State.Error:
+            self._fail("播放错误")
+        elif state == vlc.State.Ended:
+            self._fail("直播流意外结束")   # 直播源正常不会结束
+
+    def _check(self):
+        player = self.player
+        if player is None: return
+        now = time.monotonic()
+        state = self._state
+        if state == vlc.State.Opening and now - self._state_since > self.open_timeout:
+            self._fail(f"打开超过 {self.open_timeout:.0f} 秒")
+        elif state == vlc.State.Buffering and now - self._state_since > self.stall_timeout:
+            self._fail(f"缓冲超过 {self.stall_timeout:.0f} 秒")
+        elif state == vlc.State.Playing:
+            position = player.get_time()
+            if position != self._last_time:
+                progressed = self._last_time >= 0
+                self._last_time = position
+                self._last_progress = now
+                if progressed and self._failed_at is not None:
+                    elapsed = (now - self._failed_at) * 1000
+                    self._failed_at = None
+                    self.tried = {self.url}
+                    self.recovered.emit(self.url, elapsed)
+            elif now - self._last_progress > self.stall_timeout:
+                self._fail(f"播放停顿超过 {self.stall_timeout:.0f} 秒")
+
+    def _fail(self, reason):
+        now = time.monotonic()
+        if self._failed_at is None: self._failed_at = now
+        elif now - self._failed_at > self.budget:
+            self._give_up(f"{reason}, 超出 {self.budget:.0f} 秒切换预算")
+            return
+        url = next((u for u in self.candidates if u not in self.tried), None)
+        if url is None:
+            self._give_up(f"{reason}, 没有其它可用地址")
+            return
+        self.tried.add(url)
+        self.player = None          # 等窗口调用 follow()
+        self.failover.emit(url, reason)
+
+    def _give_up(self, reason):
+        self.stop()
+        self.gave_up.emit(reason)
@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+from channel_table import ChannelTable
+from m3u_parser import iter_m3u
+
+
+def default_cache_dir(name='playlists'):
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'm3u_player', name)
+
+
+# --- 播放列表磁盘缓存: 原始内容 + HTTP 校验信息 + 预解析的频道表, 按 URL 索引, LRU 淘汰 ---
+class PlaylistCache:
+    META_SUFFIX = '.json'
+    BODY_SUFFIX = '.m3u'
+    TABLE_SUFFIX = '.tbl'
+    PART_SUFFIX = '.part'
+    STALE_PART = 24 * 3600      # 超过这么久 (秒) 的下载临时文件视为中断遗留, 淘汰时删除
+
+    def __init__(self, directory=None, max_bytes=256 * 2**20):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, url, suffix):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key + suffix)
+
+    def lookup(self, url):
+        """返回缓存的元数据 (含 etag / last_modified), 不完整时返回 None"""
+        try:
+            with open(self._path(url, self.META_SUFFIX), 'r', encoding='utf-8') as f: meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url or not os.path.exists(self._path(url, self.BODY_SUFFIX)): return None
+        return meta
+
+    @staticmethod
+    def conditional_headers(meta):
+        headers = {}
+        if meta:
+            if meta.get('etag'): headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'): headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def load_table(self, url):
+        """读取预解析的频道表; 表文件缺失或格式不符时从原始内容重新解析并回写"""
+        meta = self.lookup(url)
+        if meta is None: return None
+        table_path = self._path(url, self.TABLE_SUFFIX)
+        try:
+            with open(table_path, 'rb') as f: table = ChannelTable.from_bytes(f.read())
+        except (OSError, ValueError) as e:
+            print(f"缓存的频道表不可用 ({e}), 从原始内容重新解析...")
+            table = ChannelTable()
+            with open(self._path(url, self.BODY_SUFFIX), 'rb') as f:
+                table.extend(iter_m3u(f, meta.get('encoding') or 'utf-8'))
+            self._write_atomic(table_path, table.to_bytes())
+        meta['last_used'] = time.time()
+        self._write_meta(url, meta)
+        return table
+
+    def body_writer(self, url):
+        """返回用于边下载边写入原始内容的临时文件, 由 store() 提交或 abort() 丢弃.
+        每次下载一个独立的文件名, 同一 URL 的新旧加载任务 (取消后重新加载、后台重新校验) 互不干扰"""
+        key = os.path.basename(self._path(url, ''))
+        return tempfile.NamedTemporaryFile('wb', dir=self.directory, prefix=key + '-', suffix=self.PART_SUFFIX, delete=False)
+
+    def store(self, url, table, body, etag=None, last_modified=None, encoding='utf-8', header=None):
+        """body 为 body_writer() 返回的 (已写完的) 临时文件"""
+        body.close()
+        os.replace(body.name, self._path(url, self.BODY_SUFFIX))
+        self._write_atomic(self._path(url, self.TABLE_SUFFIX), table.to_bytes())
+        self._write_meta(url, {
+            'url': url, 'etag': etag, 'last_modified': last_modified, 'encoding': encoding, 'header': header or {},
+            'channels': len(table), 'stored': time.time(), 'last_used': time.time(),
+        })
+        self.evict()
+
+    def abort(self, body):
+        """丢弃未完成的下载"""
+        body.close()
+        try: os.remove(body.name)
+        except OSError: pass
+
+    def evict(self):
+        """总大小超过上限时按最近使用时间从旧到新删除"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(self.PART_SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    if time.time() - os.path.getmtime(path) > self.STALE_PART: os.remove(path)
+                except OSError: pass
+                continue
+            if not name.endswith(self.META_SUFFIX): continue
+            key = name[:-len(self.META_SUFFIX)]
+            size = 0
+            for suffix in (self.META_SUFFIX, self.BODY_SUFFIX, self.TABLE_SUFFIX):
+                try: size += os.path.getsize(os.path.join(self.directory, key + suffix))
+                except OSError: pass
+            try:
+                with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f: meta = json.load(f)
+            except (OSError, ValueError):
+                meta = {}
+            entries.append((meta.get('last_used', 0), meta.get('url'), key, size))
+            total += size
+        entries.sort(key=lambda entry: entry[0])
+        for last_used, url, key, size in entries[:-1]:
+            if total <= self.max_bytes: break
+            print(f"缓存超出上限, 移除: {url}")
+            for suffix in (self.META_SUFFIX, self.BODY_SUFFIX, self.TABLE_SUFFIX):
+                try: os.remove(os.path.join(self.directory, key + suffix))
+                except OSError: pass
+            total -= size
+
+    def _write_meta(self, url, meta):
+        self._write_atomic(self._path(url, self.META_SUFFIX), json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+
+    def _write_atomic(self, path, data):
+        """临时文件名每次不同, 同一 URL 的两个加载任务同时写表或元数据时不会互相覆盖或删掉对方的临时文件"""
+        with tempfile.NamedTemporaryFile('wb', dir=self.directory, prefix=os.path.basename(path) + '-',
+                                         suffix=self.PART_SUFFIX, delete=False) as f:
+            try: f.write(data)
+            except OSError:
+                f.close()
+                os.remove(f.name)
+                raise
+        os.replace(f.name, path)
@@ -0,0 +1,170 @@
+import os
+import time
+import codecs
+import requests
+from PyQt5.QtCore import QThread, pyqtSignal
+from m3u_parser import iter_m3u, READ_CHUNK_SIZE, DEFAULT_USER_AGENT
+from channel_table import ChannelTable
+from playlist_cache import PlaylistCache
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+# --- 后台加载播放列表 (下载 + 解码 + 解析都在工作线程) ---
+class PlaylistLoader(QThread):
+    batch_ready = pyqtSignal(list)          # 一批新解析出的频道
+    table_ready = pyqtSignal(object)        # 命中缓存时整张 ChannelTable 一次送出
+    progress = pyqtSignal(int, int, int)    # 已读字节, 总字节 (-1 未知), 已解析频道数
+    header_ready = pyqtSignal(dict)         # #EXTM3U 行上的属性 (x-tvg-url 等), 在 loaded 之前送出
+    loaded = pyqtSignal(int, str)           # 完成, 频道总数, 附加说明 (如 "缓存未变化")
+    failed = pyqtSignal(str, str, str)      # 对话框标题, 对话框内容, 状态栏文字
+
+    FIRST_BATCH = 64          # 约一屏, 尽快送到界面
+    MAX_BATCH = 5000
+    BATCH_INTERVAL = 0.05     # 秒
+
+    def __init__(self, source, cache=None, parent=None, merger=None):
+        """merger 不为空时 (多个源合并加载), 每批频道先经 ChannelMerger 去重, batch_ready 只送出新频道,
+        命中缓存时也逐批送出而不是整表替换"""
+        super().__init__(parent)
+        self.source = source
+        self.cache = cache
+        self.merger = merger
+        self.note = ''
+        self.header = {}
+        self._cancelled = False
+        self._response = None
+        self._bytes_read = 0
+        self._total = -1
+        self._batch = []
+        self._count = 0
+        self._last_emit = 0.0
+        self._table = None
+
+    def cancel(self):
+        self._cancelled = True
+        response = self._response
+        if response is not None:
+            try: response.close()   # 打断阻塞中的网络读取
+            except Exception: pass
+
+    def is_url(self):
+        return self.source.startswith(('http://', 'https://'))
+
+    def run(self):
+        try:
+            if self.is_url(): count = self._load_url()
+            else: count = self._load_file()
+            if self._cancelled: return
+            if self.header: self.header_ready.emit(self.header)
+            self.loaded.emit(count, self.note)
+        except LoadCancelled:
+            pass
+        except requests.exceptions.Timeout:
+            if not self._cancelled:
+                self.failed.emit("网络错误", f"加载 URL 超时: {self.source}", "加载超时")
+        except requests.exceptions.RequestException as e:
+            if not self._cancelled:
+                self.failed.emit("网络错误", f"无法加载 URL: {self.source}\n错误: {e}", "加载失败: 网络错误")
+        except OSError as e:
+            if not self._cancelled:
+                self.failed.emit("文件错误", f"无法加载或解析文件: {self.source}\n错误: {e}", "加载失败")
+        except Exception as e:
+            if not self._cancelled:
+                self.failed.emit("未知错误", f"加载或处理时发生错误: {e}", "加载失败：未知错误")
+        finally:
+            self._response = None
+
+    def _load_file(self):
+        self._total = os.path.getsize(self.source)
+        with open(self.source, 'rb') as f:
+            read = f.read
+            return self._parse(iter(lambda: read(READ_CHUNK_SIZE), b''), 'utf-8')
+
+    def _load_url(self):
+        meta = self.cache.lookup(self.source) if self.cache else None
+        headers = {'User-Agent': DEFAULT_USER_AGENT}
+        headers.update(PlaylistCache.conditional_headers(meta))
+        try:
+            response = requests.get(self.source, timeout=15, headers=headers, stream=True)
+        except requests.exceptions.RequestException as e:
+            if meta is None or self._cancelled: raise
+            print(f"网络错误 ({e}), 使用缓存的播放列表")
+            return self._load_cached("网络错误, 使用缓存")
+        self._response = response
+        if self._cancelled: raise LoadCancelled()
+        with response:
+            if response.status_code == 304 and meta is not None:
+                return self._load_cached("缓存未变化")
+            response.raise_for_status()
+            self._total = int(response.headers.get('Content-Length') or -1)
+            encoding = response.encoding or 'utf-8'
+            try: codecs.lookup(encoding)
+            except LookupError as decode_error:
+                print(f"解码警告: {decode_error}. 尝试备用编码...")
+                encoding = 'iso-8859-1'
+            chunks = response.iter_content(chunk_size=READ_CHUNK_SIZE)
+            if self.cache is None: return self._parse(chunks, encoding)
+            # 边下载边写入缓存, 同时在工作线程里攒一份频道表用于下次直接加载
+            self._table = ChannelTable()
+            body = self.cache.body_writer(self.source)
+            try:
+                with body: count = self._parse(self._tee(chunks, body), encoding)
+            except BaseException:
+                self.cache.abort(body)
+                raise
+            self.cache.store(self.source, self._table, body, response.headers.get('ETag'),
+                             response.headers.get('Last-Modified'), encoding, self.header)
+            self._table = None
+            return count
+
+    def _load_cached(self, note):
+        table = self.cache.load_table(self.source)
+        if self._cancelled: raise LoadCancelled()
+        self.note = note
+        self.header = (self.cache.lookup(self.source) or {}).get('header') or {}
+        if self.merger is not None:
+            self._count = 0
+            for start in range(0, len(table), self.MAX_BATCH):
+                self._batch = [table.channel(row) for row in range(start, min(start + self.MAX_BATCH, len(table)))]
+                self._flush()
+            return self._count
+        self.table_ready.emit(table)
+        return len(table)
+
+    @staticmethod
+    def _tee(chunks, sink):
+        for chunk in chunks:
+            sink.write(chunk)
+            yield chunk
+
+    def _count_bytes(self, chunks):
+        for chunk in chunks:
+            if self._cancelled: raise LoadCancelled()
+            self._bytes_read += len(chunk)
+            yield chunk
+            # 上一块已解析完: 在阻塞读取下一块之前先把积压的频道送出去, 慢速服务器也能立刻看到首屏
+            if self._batch and (self._count == 0 or time.monotonic() - self._last_emit >= self.BATCH_INTERVAL):
+                self._flush()
+
+    def _parse(self, chunks, encoding):
+        self._batch = []
+        self._count = 0
+        self._last_emit = time.monotonic()
+        for channel in iter_m3u(self._count_bytes(chunks), encoding, self.header):
+            self._batch.append(channel)
+            if len(self._batch) >= (self.MAX_BATCH if self._count else self.FIRST_BATCH): self._flush()
+        if self._batch: self._flush()
+        return self._count
+
+    def _flush(self):
+        if self._cancelled: raise LoadCancelled()
+        batch, self._batch = self._batch, []
+        self._count += len(batch)
+        self._last_emit = time.monotonic()
+        if self._table is not None: self._table.extend(batch)
+        if self.merger is not None: self.merger.merge(batch, self.batch_ready.emit)
+        else: self.batch_ready.emit(batch)
+        self.progress.emit(self._bytes_read, self._total, self._count)
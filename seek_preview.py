@@ -0,0 +1,183 @@
+import os
+import ctypes
+import hashlib
+import threading
+from collections import deque
+import vlc
+from PyQt5.QtCore import Qt, QObject, QSize, pyqtSignal
+from PyQt5.QtGui import QImage
+from playlist_cache import default_cache_dir
+
+THUMB_SIZE = QSize(160, 90)
+
+
+def file_key(path):
+    """路径 + 修改时间 + 大小; 文件变了缓存自然失效"""
+    st = os.stat(path)
+    return hashlib.sha1(f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}".encode('utf-8')).hexdigest()
+
+
+# --- 拖动进度条时的预览缩略图: 后台用独立的 libvlc 播放器解码到内存, 按文件缓存到磁盘 ---
+class SeekPreview(QObject):
+    """把时长分成 slots 段, 每段一张缩略图. image(ms) 只查内存/磁盘, 未命中时排队生成并返回最近的已有缩略图;
+    生成好后 ready 通知. 队列后进先出, 拖动时总是先生成手指下的位置; 不拖动时不做任何解码."""
+    ready = pyqtSignal(int)             # slot
+
+    _loaded = pyqtSignal(str, int, object)     # 文件键, slot, QImage (工作线程 -> GUI 线程)
+
+    MAX_QUEUE = 8
+
+    def __init__(self, parent=None, slots=60, size=THUMB_SIZE, directory=None, disk_bytes=128 * 2**20):
+        super().__init__(parent)
+        self.slots = slots
+        self.size = size
+        self.directory = directory or default_cache_dir('thumbnails')
+        os.makedirs(self.directory, exist_ok=True)
+        self.disk_bytes = disk_bytes
+        self.path = None
+        self.key = None
+        self.length = 0
+        self._images = {}               # 当前文件: slot -> QImage
+        self._pending = set()
+        self._queue = deque()
+        self._unusable = set()          # 解码不出画面的文件键 (纯音频等), 不再尝试; 文件变了键也会变
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._loaded.connect(self._on_loaded, Qt.QueuedConnection)
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+        threading.Thread(target=self._prune_disk, daemon=True).start()
+
+    def open(self, path, length=0):
+        self.path = path
+        try: self.key = file_key(path)
+        except OSError: self.key = None
+        self.length = length
+        self._images = {}
+        self._pending = set()
+        with self._cond: self._queue.clear()
+
+    def set_length(self, length):
+        self.length = length
+
+    def slot(self, ms):
+        if self.length <= 0: return None
+        return min(self.slots - 1, max(0, ms * self.slots // self.length))
+
+    def image(self, ms):
+        slot = self.slot(ms)
+        if slot is None or self.key is None or self.key in self._unusable: return None
+        image = self._images.get(slot)
+        if image is not None: return image
+        if slot not in self._pending:
+            image = QImage(self._disk_path(self.key, slot))
+            if not image.isNull():
+                self._images[slot] = image
+                return image
+        for neighbor in (slot - 1, slot + 1, slot):    # 相邻的也顺带生成, 最后入队的最先处理
+            if 0 <= neighbor < self.slots and neighbor not in self._images: self._request(neighbor)
+        nearest = min(self._images, key=lambda s: abs(s - slot), default=None)
+        return self._images[nearest] if nearest is not None else None
+
+    def close(self):
+        with self._cond:
+            self._stopped = True
+            self._queue.clear()
+            self._cond.notify_all()
+        self._thread.join(3)
+
+    def _disk_path(self, key, slot):
+        return os.path.join(self.directory, f"{key}-{slot:03d}.jpg")
+
+    def _request(self, slot):
+        if slot in self._pending: return
+        self._pending.add(slot)
+        with self._cond:
+            self._queue.append((self.path, self.key, slot, self.length))
+            while len(self._queue) > self.MAX_QUEUE:
+                self._pending.discard(self._queue.popleft()[2])     # 拖过去的位置不再生成
+            self._cond.notify()
+
+    def _on_loaded(self, key, slot, image):
+        if key != self.key: return
+        self._pending.discard(slot)
+        if image is None: return
+        self._images[slot] = image
+        self.ready.emit(slot)
+
+    def _work(self):
+        width, height = self.size.width(), self.size.height()
+        buffer = ctypes.create_string_buffer(width * height * 4)
+        address = ctypes.addressof(buffer)
+        shown = threading.Event()
+
+        @vlc.CallbackDecorators.VideoLockCb
+        def lock(opaque, planes):
+            planes[0] = address
+            return None
+
+        @vlc.CallbackDecorators.VideoDisplayCb
+        def display(opaque, picture):
+            shown.set()
+
+        instance = player = None
+        opened = None
+        while True:
+            with self._cond:
+                while not self._stopped and not self._queue: self._cond.wait()
+                if self._stopped: break
+                path, key, slot, length = self._queue.pop()
+            image = None
+            if key in self._unusable:
+                self._loaded.emit(key, slot, None)
+                continue
+            try:
+                if player is None:
+                    instance = instance or vlc.Instance(['--no-audio', '--no-video-title-show', '--no-osd', '--quiet',
+                                                         '--avcodec-hw=none'])
+                    created = instance.media_player_new()
+                    created.video_set_callbacks(lock, None, display, None)
+                    created.video_set_format('RV32', width, height, width * 4)
+                    player = created
+                if opened != key:
+                    player.stop()
+                    media = instance.media_new(path)
+                    player.set_media(media)
+                    media.release()
+                    shown.clear()
+                    player.play()
+                    if not shown.wait(5):
+                        self._unusable.add(key)
+                        raise RuntimeError(f"没有解码出画面, 不再为该文件生成: {os.path.basename(path)}")
+                    player.set_pause(1)     # 暂停后 set_time 仍会解码并显示目标位置的一帧
+                    opened = key
+                shown.clear()
+                player.set_time(int(length * (slot + 0.5) / self.slots))
+                if shown.wait(3):
+                    image = QImage(buffer.raw, width, height, width * 4, QImage.Format_RGB32).copy()
+                    image.save(self._disk_path(key, slot), 'JPG', 80)
+            except Exception as e:
+                print(f"生成预览缩略图失败: {e}")
+                opened = None
+            self._loaded.emit(key, slot, image)
+        if player is not None:
+            player.stop()
+            player.release()
+        if instance is not None: instance.release()
+
+    def _prune_disk(self):
+        """磁盘缓存超过上限时删除最旧的缩略图"""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith('.jpg'): continue
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= self.disk_bytes: break
+            try: os.remove(path)
+            except OSError: pass
+            total -= size
@@ -0,0 +1,72 @@
+import os
+import json
+import zlib
+import struct
+from channel_table import ChannelTable
+from playlist_cache import default_cache_dir
+
+SESSION_MAGIC = b'SES1'
+SESSION_HEADER = struct.Struct('<4sII')     # 魔数, 压缩后的状态长度, 频道表长度 (0 为没有)
+
+
+def same_channels(a, b):
+    """两张频道表内容是否一致 (后台重新校验时判断要不要替换界面上的表)"""
+    return (a.urls == b.urls and a.names == b.names and a.logos == b.logos and a.tvg_ids == b.tvg_ids
+            and a.group_ids == b.group_ids and a.group_names == b.group_names and a.alt_urls == b.alt_urls)
+
+
+# --- 会话快照: 头部 + zlib 压缩的 JSON 状态 + CHT2 频道表, 一个文件原子替换 ---
+class SessionStore:
+    """状态 (播放列表来源、音量、滚动位置、最后播放的频道) 很小, 启动时先只读它就能开始播放;
+    频道表放在文件尾部, load_table() 时才读取解码."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(default_cache_dir('session'), 'session.bin')
+        self._table_offset = None
+        self._table_size = 0
+        self._alt_urls = {}
+
+    def save(self, state, table=None):
+        state = dict(state)
+        table_bytes = b''
+        if table is not None and len(table):
+            table_bytes = table.to_bytes()
+            state['alt_urls'] = {str(row): urls for row, urls in table.alt_urls.items()}   # CHT2 不含备用地址
+        state_bytes = zlib.compress(json.dumps(state, ensure_ascii=False).encode('utf-8'), 1)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(SESSION_HEADER.pack(SESSION_MAGIC, len(state_bytes), len(table_bytes)))
+            f.write(state_bytes)
+            f.write(table_bytes)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """只读头部和状态; 文件不存在或损坏时返回 None"""
+        self._table_offset = None
+        try:
+            with open(self.path, 'rb') as f:
+                magic, state_size, table_size = SESSION_HEADER.unpack(f.read(SESSION_HEADER.size))
+                if magic != SESSION_MAGIC: raise ValueError("会话快照格式不匹配")
+                state = json.loads(zlib.decompress(f.read(state_size)).decode('utf-8'))
+        except (OSError, ValueError, struct.error, zlib.error) as e:
+            if not isinstance(e, FileNotFoundError): print(f"会话快照不可用: {e}")
+            return None
+        if table_size:
+            self._table_offset = SESSION_HEADER.size + state_size
+            self._table_size = table_size
+        self._alt_urls = state.pop('alt_urls', {})
+        return state
+
+    def load_table(self):
+        """读取 load() 之后的频道表; 没有或损坏时返回 None"""
+        if self._table_offset is None: return None
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self._table_offset)
+                table = ChannelTable.from_bytes(f.read(self._table_size))
+        except (OSError, ValueError, struct.error, zlib.error) as e:
+            print(f"会话快照里的频道表不可用: {e}")
+            return None
+        table.alt_urls = {int(row): urls for row, urls in self._alt_urls.items() if int(row) < len(table)}
+        return table
@@ -0,0 +1,166 @@
+"""并发检测播放列表中每个频道地址是否可用.
+
+命令行用法:
+    python stream_health.py playlist.m3u [--workers 64] [--per-host 4] [--timeout 8] [--sort latency] [--json out.jsonl]
+"""
+import sys
+import json
+import time
+import argparse
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from m3u_parser import iter_m3u, open_source, READ_CHUNK_SIZE, DEFAULT_USER_AGENT
+
+STATUS_OK = 'ok'
+STATUS_DEAD = 'dead'
+STATUS_UNSUPPORTED = 'unsupported'   # rtp/udp/rtmp 等无法用 HTTP 探测的地址
+
+PROBE_BYTES = 64 * 1024
+
+
+def is_hls(url, content_type, head):
+    return (urlsplit(url).path.lower().endswith('.m3u8') or 'mpegurl' in (content_type or '').lower()
+            or head.lstrip().startswith(b'#EXTM3U'))
+
+
+def validate_hls(head):
+    """只看开头的一段: 必须以 #EXTM3U 开头, 并且是媒体播放列表或多码率主列表"""
+    text = head.lstrip(b'\xef\xbb\xbf').lstrip()
+    if not text.startswith(b'#EXTM3U'): return False
+    return any(tag in text for tag in (b'#EXTINF', b'#EXT-X-STREAM-INF', b'#EXT-X-TARGETDURATION'))
+
+
+# --- 并发探测: 线程池 + 连接池 + 每个主机的并发上限 ---
+class HealthChecker:
+    def __init__(self, workers=64, per_host=4, timeout=8.0):
+        self.workers = workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=per_host, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = DEFAULT_USER_AGENT
+        self._host_limits = {}
+        self._lock = threading.Lock()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def close(self):
+        self.session.close()
+
+    def _host_limit(self, host):
+        with self._lock:
+            limit = self._host_limits.get(host)
+            if limit is None: limit = self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return limit
+
+    def probe(self, url):
+        """返回 {'status', 'http_status', 'latency_ms', 'hls', 'error'}; 已取消时返回 None"""
+        result = {'status': STATUS_DEAD, 'http_status': None, 'latency_ms': None, 'hls': None, 'error': None}
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            result['status'] = STATUS_UNSUPPORTED
+            return result
+        with self._host_limit(parts.netloc):
+            if self._cancelled: return None
+            start = time.perf_counter()
+            try:
+                with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                    result['http_status'] = response.status_code
+                    head = b''
+                    if response.ok:
+                        for chunk in response.iter_content(chunk_size=READ_CHUNK_SIZE):
+                            head += chunk
+                            if len(head) >= PROBE_BYTES: break
+                    result['latency_ms'] = round((time.perf_counter() - start) * 1000, 1)
+                    if not response.ok:
+                        result['error'] = f"HTTP {response.status_code}"
+                    elif not head:
+                        result['error'] = '无数据'
+                    elif is_hls(url, response.headers.get('Content-Type'), head[:4096]):
+                        result['hls'] = validate_hls(head)
+                        if result['hls']: result['status'] = STATUS_OK
+                        else: result['error'] = 'HLS 清单无效'
+                    else:
+                        result['status'] = STATUS_OK
+            except requests.exceptions.RequestException as e:
+                result['error'] = type(e).__name__
+        return result
+
+    def check(self, urls):
+        """按完成顺序 yield (序号, url, 结果). 提交顺序按主机轮转, 避免线程都堵在同一个主机上"""
+        by_host = {}
+        for i, url in enumerate(urls):
+            by_host.setdefault(urlsplit(url).netloc, []).append(i)
+        order = []
+        queues = [iter(q) for q in by_host.values()]
+        while queues:
+            alive = []
+            for q in queues:
+                i = next(q, None)
+                if i is not None:
+                    order.append(i)
+                    alive.append(q)
+            queues = alive
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.probe, urls[i]): i for i in order}
+            for future in as_completed(futures):
+                i = futures[future]
+                result = future.result()
+                if result is not None: yield i, urls[i], result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="并发检测 M3U 播放列表中的频道是否可用")
+    parser.add_argument('playlist', help="本地 M3U 文件或 http(s) URL")
+    parser.add_argument('--workers', type=int, default=64)
+    parser.add_argument('--per-host', type=int, default=4)
+    parser.add_argument('--timeout', type=float, default=8.0)
+    parser.add_argument('--sort', choices=('none', 'latency'), default='none')
+    parser.add_argument('--json', help="把每个频道的结果写入 JSONL 文件")
+    args = parser.parse_args(argv)
+
+    chunks, encoding = open_source(args.playlist)
+    channels = list(iter_m3u(chunks, encoding))
+    print(f"解析到 {len(channels)} 个频道, 开始检测...", file=sys.stderr)
+    checker = HealthChecker(args.workers, args.per_host, args.timeout)
+    results = [None] * len(channels)
+    start = time.perf_counter()
+    counts = {}
+    try:
+        for done, (i, url, result) in enumerate(checker.check([c['url'] for c in channels]), 1):
+            results[i] = result
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+            if done % 100 == 0 or done == len(channels):
+                print(f"\r已检测 {done}/{len(channels)}  {counts}", end='', file=sys.stderr)
+    except KeyboardInterrupt:
+        checker.cancel()
+        print("\n已中断", file=sys.stderr)
+    finally:
+        checker.close()
+    print(f"\n耗时 {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    rows = [(c, r) for c, r in zip(channels, results) if r is not None]
+    if args.sort == 'latency':
+        rows.sort(key=lambda item: (item[1]['status'] != STATUS_OK, item[1]['latency_ms'] or float('inf')))
+    out = open(args.json, 'w', encoding='utf-8') if args.json else None
+    try:
+        for channel, result in rows:
+            record = dict(channel, **result)
+            if out: out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            else:
+                latency = f"{result['latency_ms']:.0f} ms" if result['latency_ms'] is not None else '-'
+                print(f"{result['status']:<12}{latency:>10}  {channel['name']}  {channel['url']}")
+    finally:
+        if out: out.close()
+    return 0 if counts.get(STATUS_DEAD, 0) == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import fnmatch
+from urllib.parse import urlsplit
+from playlist_cache import default_cache_dir
+from m3u_parser import DEFAULT_USER_AGENT
+
+DEFAULT_PROFILE = {'network_caching': 'auto', 'user_agent': DEFAULT_USER_AGENT, 'referrer': None, 'hw_decode': None, 'options': []}
+START_CACHING = 1500        # 没有历史时的缓存 (毫秒), 即原来写死的 --network-caching
+MIN_CACHING = 200
+MAX_CACHING = 10000
+CLEAN_SESSION = 60.0        # 连续播放这么久 (秒) 没有卡顿才缩短缓存
+SLOW_START = 3.0            # 启动耗时 (平滑后) 超过缓存的这么多倍时, 时间主要花在连接和首个分片上, 缓存只慢慢缩短
+MAX_HOSTS = 1000
+
+
+def default_config_path():
+    base = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(base, 'm3u_player', 'profiles.json')
+
+
+def host_of(url):
+    try: return (urlsplit(url).hostname or '').lower()
+    except ValueError: return ''
+
+
+# --- 按频道 / 主机的播放参数, 以及按主机自适应的网络缓存 (不依赖 Qt) ---
+class StreamProfiles:
+    """配置文件 (JSON, 手工编辑, 修改后下次播放时自动重新读取):
+        {"default": {...}, "hosts": {"239.*": {"network_caching": 300}, "*.example.com": {...}},
+         "channels": {"cctv1.cn": {"referrer": "http://..."}, "某频道名": {...}}, "adaptive": true}
+    每个配置可以有 network_caching (毫秒或 "auto"), user_agent, referrer, hw_decode (true/false/"vaapi"...), options.
+    优先级: 频道 (tvg-id, 再是名称) > 主机 (通配符, 越长越优先) > default.
+    network_caching 为 "auto" 时按主机的历史调整: 出现卡顿就加长, 长时间播放没有卡顿就缩短,
+    以尽量短的启动时间换取不卡顿. 学到的值另存在缓存目录里."""
+
+    def __init__(self, path=None, state_path=None, user_agent=None):
+        self.path = path or default_config_path()
+        self.state_path = state_path or os.path.join(default_cache_dir('profiles'), 'adaptive.json')
+        self.defaults = dict(DEFAULT_PROFILE, user_agent=user_agent or DEFAULT_USER_AGENT)
+        self.config = {}
+        self._mtime = None
+        self.learned = {}       # 主机 -> {'caching', 'start_ms', 'stalls', 'clean', 'seen'}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f: self.learned = json.load(f)
+        except (OSError, ValueError):
+            pass
+        self._reload()
+
+    def _reload(self):
+        try: mtime = os.stat(self.path).st_mtime
+        except OSError: mtime = None
+        if mtime == self._mtime: return
+        self._mtime = mtime
+        self.config = {}
+        if mtime is None: return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f: self.config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"无法读取播放配置 {self.path}: {e}")
+
+    def profile(self, url, channel=None):
+        self._reload()
+        merged = dict(self.defaults)
+        merged.update(self.config.get('default') or {})
+        host = host_of(url)
+        hosts = self.config.get('hosts') or {}
+        for pattern in sorted((p for p in hosts if fnmatch.fnmatch(host, p.lower())), key=len):
+            merged.update(hosts[pattern])
+        channels = self.config.get('channels') or {}
+        if channel:
+            for key in (channel.get('name'), channel.get('tvg_id')):    # tvg-id 后合并, 优先
+                if key and key in channels: merged.update(channels[key])
+        if merged['network_caching'] == 'auto':
+            learned = self.learned.get(host) if self.config.get('adaptive', True) else None
+            merged['network_caching'] = learned['caching'] if learned else START_CACHING
+        return merged
+
+    def media_options(self, url, channel=None):
+        """给 Media.add_option 的参数列表"""
+        profile = self.profile(url, channel)
+        options = [f"network-caching={int(profile['network_caching'])}"]
+        if profile['user_agent']: options.append(f"http-user-agent={profile['user_agent']}")
+        if profile['referrer']: options.append(f"http-referrer={profile['referrer']}")
+        hw = profile['hw_decode']
+        if hw is not None: options.append(f"avcodec-hw={'any' if hw is True else 'none' if hw is False else hw}")
+        options.extend(profile['options'] or [])
+        return options
+
+    def record(self, session):
+        """PlaybackTelemetry 的会话汇总: 按卡顿次数、播放时长和启动耗时调整该主机的缓存"""
+        start = session.get('first_frame_ms') or session.get('to_playing_ms')
+        if start is None or session.get('warm'): return    # 没播起来或预热命中, 不反映缓存大小
+        host = host_of(session['url'])
+        state = self.learned.setdefault(host, {'caching': START_CACHING, 'start_ms': start, 'stalls': 0, 'clean': 0})
+        state['start_ms'] = round(state['start_ms'] * 0.7 + start * 0.3, 1)
+        state['seen'] = time.time()
+        before = state['caching']
+        stalls = session.get('rebuffer_count', 0) + (session.get('end') == 'failover')
+        if stalls:
+            state['stalls'] += stalls
+            state['clean'] = 0
+            state['caching'] = min(MAX_CACHING, int(before * (1.5 if stalls == 1 else 2)))
+        elif session.get('duration_s', 0) >= CLEAN_SESSION:
+            state['clean'] += 1
+            # 缓存占启动耗时的大头时缩短才能明显加快启动; 否则缩短的收益小, 只降一点, 少冒卡顿的风险
+            factor = 0.95 if state['start_ms'] > before * SLOW_START else 0.85
+            state['caching'] = max(MIN_CACHING, int(before * factor))
+        if state['caching'] != before:
+            print(f"自适应缓存: {host} {before} -> {state['caching']} ms (卡顿 {stalls}, 启动 {start:.0f} ms)")
+        self.save()
+
+    def save(self):
+        if len(self.learned) > MAX_HOSTS:
+            keep = sorted(self.learned.items(), key=lambda item: item[1].get('seen', 0))[-MAX_HOSTS:]
+            self.learned = dict(keep)
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            with open(self.state_path + '.tmp', 'w', encoding='utf-8') as f: json.dump(self.learned, f, ensure_ascii=False)
+            os.replace(self.state_path + '.tmp', self.state_path)
+        except OSError as e:
+            print(f"无法保存自适应缓存: {e}")
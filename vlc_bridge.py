@@ -0,0 +1,118 @@
+import time
+import threading
+import vlc
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+STATE_EVENTS = (
+    vlc.EventType.MediaPlayerOpening, vlc.EventType.MediaPlayerBuffering,
+    vlc.EventType.MediaPlayerPlaying, vlc.EventType.MediaPlayerPaused,
+    vlc.EventType.MediaPlayerStopped, vlc.EventType.MediaPlayerEndReached,
+    vlc.EventType.MediaPlayerEncounteredError,
+)
+TIME_EVENTS = (vlc.EventType.MediaPlayerTimeChanged, vlc.EventType.MediaPlayerLengthChanged)
+
+
+# --- 把 libvlc 事件线程上的回调搬到 Qt GUI 线程, 并合并突发事件 ---
+class VlcEventBridge(QObject):
+    """libvlc 回调里只做记录 (持锁写一个字典), 然后最多每帧在 GUI 线程派发一次:
+    每个播放器只发最新的状态 (且只在状态真正变化时发), 缓冲百分比只保留最后一个值.
+    绑定了 TIME_EVENTS 时, 播放时间每个播放器最多每 time_interval 秒发一次, 最后一个值不会丢."""
+    state_changed = pyqtSignal(object, object)   # 播放器, vlc.State
+    buffering = pyqtSignal(object, float)        # 播放器, 缓冲百分比
+    error = pyqtSignal(object)                   # 播放器 (期间收到过 EncounteredError)
+    time_changed = pyqtSignal(object, int)       # 播放器, 毫秒
+    length_changed = pyqtSignal(object, int)     # 播放器, 毫秒
+
+    _wake = pyqtSignal()
+
+    def __init__(self, parent=None, interval_ms=16, time_interval=0.25):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.time_interval = time_interval
+        self._lock = threading.Lock()
+        self._pending = {}          # id(播放器) -> [播放器, 缓冲百分比, 是否出错, 播放时间, 时长] (没有的为 None)
+        self._scheduled = False
+        self._last_state = {}
+        self._last_buffering = {}
+        self._time_due = {}         # id(播放器) -> 下一次可以发 time_changed 的时刻
+        self._attached = {}         # id(播放器) -> [(EventManager, 事件类型)], 解绑要用绑定时的同一个 EventManager
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._flush)
+        self._wake.connect(self._schedule, Qt.QueuedConnection)
+
+    def attach(self, player, event_types=STATE_EVENTS):
+        manager = player.event_manager()
+        with self._lock: attached = self._attached.setdefault(id(player), [])
+        for event_type in event_types:
+            try:
+                manager.event_attach(event_type, self._on_vlc_event, player)
+                attached.append((manager, event_type))
+            except Exception as e:
+                print(f"警告: 无法绑定 VLC 事件 {event_type}. 错误: {e}")
+
+    def forget(self, player):
+        """在 player.release() 之前调用: 解绑事件并丢掉还没派发的记录, 之后不会再访问这个播放器"""
+        with self._lock:
+            attached = self._attached.pop(id(player), ())
+            self._pending.pop(id(player), None)
+            self._last_state.pop(id(player), None)
+            self._last_buffering.pop(id(player), None)
+            self._time_due.pop(id(player), None)
+        for manager, event_type in attached:
+            try: manager.event_detach(event_type)
+            except Exception as e: print(f"警告: 无法解绑 VLC 事件 {event_type}. 错误: {e}")
+
+    def _on_vlc_event(self, event, player):
+        # libvlc 事件线程: 不碰任何 Qt 控件
+        with self._lock:
+            if id(player) not in self._attached: return     # 已经 forget, 播放器可能马上被释放
+            entry = self._pending.get(id(player))
+            if entry is None: entry = self._pending[id(player)] = [player, None, False, None, None]
+            urgent = True
+            if event.type == vlc.EventType.MediaPlayerTimeChanged:
+                entry[3] = event.u.new_time
+                urgent = time.monotonic() >= self._time_due.get(id(player), 0)   # 没到时间的由定时器补发
+            elif event.type == vlc.EventType.MediaPlayerLengthChanged: entry[4] = event.u.new_length
+            elif event.type == vlc.EventType.MediaPlayerBuffering: entry[1] = event.u.new_cache
+            elif event.type == vlc.EventType.MediaPlayerEncounteredError: entry[2] = True
+            wake = urgent and not self._scheduled
+            self._scheduled = True
+        if wake: self._wake.emit()
+
+    def _schedule(self):
+        if not self._timer.isActive() or self._timer.remainingTime() > self.interval_ms: self._timer.start(self.interval_ms)
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+        now = time.monotonic()
+        deferred = []
+        wait = None
+        for key, (player, percent, failed, position, length) in pending.items():
+            if key not in self._attached: continue
+            state = player.get_state()
+            if self._last_state.get(key) != state:
+                self._last_state[key] = state
+                self.state_changed.emit(player, state)
+            if percent is not None and int(percent) != self._last_buffering.get(key):
+                self._last_buffering[key] = int(percent)
+                self.buffering.emit(player, percent)
+            if failed: self.error.emit(player)
+            if length is not None: self.length_changed.emit(player, length)   # 换了媒体时长可能相同, 不去重
+            if position is not None:
+                due = self._time_due.get(key, 0)
+                if due > now: deferred.append((key, player, position))
+                else:
+                    with self._lock: self._time_due[key] = due = now + self.time_interval
+                    self.time_changed.emit(player, position)
+                wait = min(wait, due - now) if wait is not None else due - now
+        if deferred:
+            with self._lock:    # 还没到发送时间的播放时间放回去, 到时再发
+                for key, player, position in deferred:
+                    entry = self._pending.get(key)
+                    if entry is None: entry = self._pending[key] = [player, None, False, None, None]
+                    if entry[3] is None: entry[3] = position
+        # 发过播放时间后到期再检查一次: 期间 libvlc 送来的时间不唤醒 GUI 线程, 由这里补发最后一个值
+        if wait is not None and not self._timer.isActive(): self._timer.start(int(wait * 1000) + 1)